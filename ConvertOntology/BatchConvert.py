@@ -0,0 +1,195 @@
+# $Id: BatchConvert.py $
+#
+# Convert a directory tree of vocabulary CSV files
+#
+"""
+Batch conversion of all the vocabulary CSV files in a directory tree,
+using a pool of worker processes so that several files are converted at
+once in a single run of the program.
+
+Each input file "dir/name.csv" is converted to each selected output format,
+written to "dir/name"+FORMAT_SUFFIXES[format], or to the corresponding place
+in a separate output directory tree.  A failure converting one file is
+reported in the results for that file, and does not affect the others:
+
+  results = batchConvert("vocabs", options, workers=4)
+  writeBatchSummary(results, sys.stdout)
+"""
+
+import sys
+import os
+import re
+import copy
+import time
+import StringIO
+import traceback
+
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
+try:
+    from MiscLib.ScanFiles import CollectFiles
+except ImportError:
+    # MiscLib is alongside this program's directory when not installed
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from MiscLib.ScanFiles import CollectFiles
+
+from ConvertOntology import convertOntology, getOutputFormats
+from MappedInput import mapInput
+
+# Pattern for names of files to be converted
+CSV_PATTERN = re.compile(r'^.+\.csv$', re.IGNORECASE)
+
+# Output file name suffix for each format
+FORMAT_SUFFIXES = {
+    "rdf":       ".owl",
+    "mediawiki": ".wiki",
+    "basecamp":  ".basecamp",
+    "n3":        ".n3",
+    "nt":        ".nt",
+    }
+
+def collectVocabularies(srcdir, recursive=True):
+    """
+    Return a sorted list of paths of CSV files in a directory tree.
+    """
+    files = CollectFiles(srcdir, CSV_PATTERN, recursive)
+    return sorted([ os.path.join(d, n) for (d, n) in files ])
+
+def makeBatchJobs(srcdir, options, outdir=None):
+    """
+    Return a list of (csvpath, options) jobs to convert each CSV file in the
+    supplied directory tree to the formats selected by the supplied options.
+    The options for each job name the output file for every format.
+    """
+    formats = [ fmt for (fmt, filename) in getOutputFormats(options) ]
+    jobs    = []
+    for csvpath in collectVocabularies(srcdir):
+        base = os.path.splitext(csvpath)[0]
+        if outdir:
+            base = os.path.join(outdir, os.path.relpath(base, srcdir))
+        o = copy.copy(options)
+        for fmt in FORMAT_SUFFIXES:
+            setattr(o, fmt, False)
+        o.formats = [ (fmt, base+FORMAT_SUFFIXES[fmt]) for fmt in formats ]
+        # Named so that imported files are found; these are read in the
+        # worker process, as files are already converted in parallel
+        o.inp_file = csvpath
+        o.jobs     = 1
+        jobs.append((csvpath, o))
+    return jobs
+
+def makeOutputDirs(jobs):
+    """
+    Create the directories for the output files of a list of jobs, as
+    returned by makeBatchJobs, before they are converted;  each directory
+    is created once, so that worker processes do not race to create it.
+    A directory that cannot be created is left for the conversion of each
+    file to be written there to report.
+    """
+    dirs = set([ os.path.dirname(filename) for (csvpath, options) in jobs
+                 for (fmt, filename) in options.formats ])
+    for d in sorted(dirs):
+        if d and not os.path.isdir(d):
+            try:
+                os.makedirs(d)
+            except OSError:
+                pass
+    return
+
+def convertFile(job):
+    """
+    Convert one CSV file, as described by a (csvpath, options) job.
+
+    Returns a tuple (csvpath, status, elapsed, message), where status is 0
+    for success or 1 for failure, elapsed is the time taken in seconds, and
+    message is any error output from the conversion.  Exceptions are caught
+    and reported in the message, so one bad file does not stop a batch.
+    """
+    (csvpath, options) = job
+    t0     = time.time()
+    stderr = sys.stderr
+    sys.stderr = StringIO.StringIO()
+    try:
+        try:
+            ipstr = open(csvpath, "rb")
+            if getattr(options, "mmap_input", False):
+                ipstr = mapInput(ipstr)
+            try:
+                status = convertOntology(ipstr, StringIO.StringIO(), options)
+            finally:
+                ipstr.close()
+        except Exception, e:
+            traceback.print_exc(None, sys.stderr)
+            status = 1
+        message = sys.stderr.getvalue()
+    finally:
+        sys.stderr = stderr
+    return (csvpath, status, time.time()-t0, message)
+
+def batchConvert(srcdir, options, workers=None, outdir=None):
+    """
+    Convert all CSV files in the supplied directory tree to the formats
+    selected by the supplied options, using the indicated number of worker
+    processes (defaults to the number of CPUs).  With one worker, or if
+    the multiprocessing module is not available, files are converted in
+    this process.
+
+    Returns a list of (csvpath, status, elapsed, message) results, as
+    returned by convertFile, in the order of the input file paths.
+    """
+    jobs = makeBatchJobs(srcdir, options, outdir)
+    makeOutputDirs(jobs)
+    if multiprocessing == None or workers == 1 or len(jobs) <= 1:
+        return map(convertFile, jobs)
+    pool = multiprocessing.Pool(workers)
+    try:
+        results = pool.map(convertFile, jobs, 1)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+def writeBatchSummary(results, opstr, elapsed=None):
+    """
+    Write a summary of the results from batchConvert to the supplied stream,
+    showing the time taken for each file, and any error messages.
+    """
+    failed = 0
+    total  = 0.0
+    for (csvpath, status, t, message) in results:
+        flag = "ok"
+        if status != 0:
+            flag = "FAILED"
+            failed += 1
+        total += t
+        opstr.write("%8.3fs  %-6s  %s\n"%(t, flag, csvpath))
+        for line in message.splitlines():
+            opstr.write("          %s\n"%(line))
+    opstr.write("%d files converted, %d failed, %.3fs total conversion time"%
+                (len(results)-failed, failed, total))
+    if elapsed != None:
+        opstr.write(", %.3fs elapsed"%(elapsed))
+    opstr.write("\n")
+    return
+
+def convertBatch(srcdir, opstr, options):
+    """
+    Convert the CSV files in a directory tree as selected by the supplied
+    command line options, and write a summary to the supplied stream.
+
+    Returns:
+      0 - success
+      1 - error in one or more files
+    """
+    t0      = time.time()
+    results = batchConvert(srcdir, options,
+                           workers=(options.jobs or None), outdir=(options.batch_output or None))
+    writeBatchSummary(results, opstr, time.time()-t0)
+    if [ r for r in results if r[1] != 0 ]:
+        return 1
+    return 0
+
+# End.
@@ -0,0 +1,68 @@
+# $Id: BufferedWriter.py $
+#
+# Buffered output stream for vocabulary emitters
+#
+"""
+Output stream wrapper that collects the many small fragments written by
+the emitters and passes them to the underlying stream in large blocks,
+so that a conversion makes a few large writes rather than one write per
+template fragment:
+
+  w = BufferedWriter(sys.stdout, 65536)
+  w.write(...)
+  ...
+  w.flush()
+
+A buffer size of 0 passes each fragment straight to the underlying stream.
+"""
+
+# Default buffer size in bytes
+DEFAULT_BUFFER_SIZE = 65536
+
+class BufferedWriter(object):
+    """
+    Write-only stream that buffers output for another stream.
+    """
+    def __init__(self, opstr, bufsize=DEFAULT_BUFFER_SIZE):
+        self._opstr   = opstr
+        self._bufsize = bufsize
+        self._chunks  = []
+        self._size    = 0       # Bytes in buffer
+        self._written = 0       # Bytes passed to underlying stream
+        if bufsize <= 0:
+            self.write = self.writeDirect
+
+    def getStream(self):
+        return self._opstr
+
+    def getBufferSize(self):
+        return self._bufsize
+
+    def getBytesWritten(self):
+        """
+        Return the number of bytes written, including any still buffered.
+        """
+        return self._written + self._size
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self._bufsize:
+            self.flush()
+
+    def writeDirect(self, text):
+        self._opstr.write(text)
+        self._written += len(text)
+
+    def flush(self):
+        """
+        Pass any buffered output to the underlying stream.  The underlying
+        stream itself is not flushed.
+        """
+        if self._chunks:
+            self._opstr.write("".join(self._chunks))
+            self._written += self._size
+            self._chunks = []
+            self._size   = 0
+
+# End.
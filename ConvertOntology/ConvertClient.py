@@ -0,0 +1,114 @@
+# $Id: ConvertClient.py $
+#
+# Command line client for the vocabulary conversion service
+#
+"""
+Client for a conversion service started with "ConvertOntology.py --serve
+PORT" (see ConvertServer).  The CSV file is uploaded, or with --path the
+server is asked to read it, and the converted vocabulary is written to
+the output file (default stdout):
+
+  python ConvertClient.py --port 8642 -f rdf vocab.csv >vocab.owl
+
+This module uses only the standard library, and does not load the
+converter itself, so it starts quickly.
+
+Returns exit status 0 if the conversion succeeded, otherwise 1 with the
+server's message written to stderr.
+"""
+
+import sys
+import os
+import urllib
+import httplib
+import optparse
+
+DEFAULT_PORT = 8642
+
+def requestConversion(data, fmt, host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Upload CSV content for conversion to the indicated format, and return
+    a tuple (status, cache, body) where status is the HTTP status code,
+    cache is the X-Vocab-Cache header value ("hit" or "miss", or None) and
+    body is the converted vocabulary or an error message.
+    """
+    return sendRequest(host, port, "POST", "/convert?"+urllib.urlencode({"format": fmt}), data)
+
+def requestPathConversion(path, fmt, host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Ask the server to convert the CSV file with the supplied path, which
+    is made absolute;  returns a tuple as for requestConversion.
+    """
+    query = urllib.urlencode({"format": fmt, "path": os.path.abspath(path)})
+    return sendRequest(host, port, "GET", "/convert?"+query)
+
+def requestStatus(host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Return a dictionary of the request and cache counts reported by the server.
+    """
+    (status, cache, body) = sendRequest(host, port, "GET", "/status")
+    return dict([ (k, int(v)) for (k, v) in [ l.split() for l in body.splitlines() ] ])
+
+def sendRequest(host, port, method, uri, body=None):
+    conn = httplib.HTTPConnection(host, port)
+    try:
+        headers = {}
+        if body != None:
+            headers["Content-Type"] = "text/csv"
+        conn.request(method, uri, body, headers)
+        resp = conn.getresponse()
+        return (resp.status, resp.getheader("X-Vocab-Cache"), resp.read())
+    finally:
+        conn.close()
+
+def getOptions(argv):
+    parser = optparse.OptionParser(usage="%prog [options] -f FORMAT input")
+    parser.add_option("-f", "--format",
+                      dest="format",
+                      default="",
+                      help="Output format (mediawiki, basecamp, rdf, n3 or nt)")
+    parser.add_option("--host",
+                      dest="host",
+                      default="127.0.0.1",
+                      help="Host name of the conversion service (default %default)")
+    parser.add_option("--port",
+                      type="int", dest="port",
+                      default=DEFAULT_PORT,
+                      help="Port of the conversion service (default %default)")
+    parser.add_option("--path",
+                      action="store_true", dest="path",
+                      default=False,
+                      help="Send the input file path for the server to read, rather "\
+                           "than uploading the file")
+    parser.add_option("-o", "--output",
+                      dest="out_file",
+                      default="",
+                      help="Output file name (defaults to stdout)")
+    (options, args) = parser.parse_args(argv)
+    if len(args) != 1: parser.error("One input file must be given")
+    if not options.format: parser.error("No output format selected")
+    return (options, args[0])
+
+if __name__ == "__main__":
+    (options, inp_file) = getOptions(sys.argv[1:])
+    try:
+        if options.path:
+            (status, cache, body) = requestPathConversion(inp_file, options.format,
+                                                          options.host, options.port)
+        else:
+            (status, cache, body) = requestConversion(open(inp_file, "rb").read(), options.format,
+                                                      options.host, options.port)
+    except (IOError, httplib.HTTPException), e:
+        sys.stderr.write("Conversion request failed: %s\n"%(str(e)))
+        sys.exit(1)
+    if status != 200:
+        sys.stderr.write(body)
+        sys.exit(1)
+    opstr = sys.stdout
+    if options.out_file:
+        opstr = open(options.out_file, "wb")
+    opstr.write(body)
+    opstr.close()
+    sys.exit(0)
+
+# End.
@@ -6,25 +6,77 @@
 #
 
 import sys
-import optparse
+import re
 import logging
 import csv
-import StringIO
-import re
+import cStringIO
+
+# Modules needed only by some options (optparse, urlparse, StringIO, 
+# VocabCache, PhaseStats, MappedInput) are imported where they are used,
+# so that starting the program, or importing this module as a library,
+# does not pay for them (see RunConvert.py)
+from VocabLexer import *
+from BufferedWriter import BufferedWriter, DEFAULT_BUFFER_SIZE
+from VocabTemplates import TemplateSet, templatesFromClass, loadTemplates, writeTemplates
+from OwlTriples import *
+
+# Converter version.  Cached vocabularies are keyed by this and CACHE_FORMAT,
+# which must be changed whenever the reader or model classes change in a way
+# that affects the parsed Vocabulary value.
+VERSION      = "$Rev: 1024 $"
+CACHE_FORMAT = 3
+
+# Loggers for tracing the model classes and reader, bound once.  Trace calls
+# in these hot paths are guarded by TRACE, so unless tracing is enabled (see
+# setTracing) they cost one global lookup: no arguments are formatted and no
+# log records are created.
+log_uri  = logging.getLogger("ConvertOntology.VocabUri")
+log_node = logging.getLogger("ConvertOntology.VocabNode")
+log_read = logging.getLogger("ConvertOntology.readVocabulary")
+TRACE    = False
+
+def setTracing(enabled):
+    """
+    Enable or disable debug tracing of individual rows, URIs and nodes.
+    """
+    global TRACE
+    TRACE = enabled
 
 # ----------
 # Vocabulary
 # ----------
 
+# Property that declares a subclass, for Vocabulary.getSubclasses
+RDFS_SUBCLASSOF_URI = "http://www.w3.org/2000/01/rdf-schema#subClassOf"
+
 class Vocabulary:
     """
     Represents a full vocabulary as read from a CSV file.
+
+    Classes, slots and attributes can be looked up by full URI without
+    searching the lists of classes (see getClassByUri, getSlotsByProperty,
+    getAttrsByProperty, getSlotsByValueType, getClassesByValueType and
+    getSubclasses).  The indexes used are built by the first lookup, so 
+    that reading a vocabulary that is only converted does not pay for 
+    them, and are then kept up to date as classes, slots and attributes
+    are added.
     """
     def __init__(self):
         self._headings = None
         self._sequence = []
         self._prefixes = []
+        self._prefixindex = {}
         self._classes  = []
+        self._imports  = []
+        self._uricache  = {}
+        self._nodecache = {}
+        # Cross-reference indexes, built by buildIndexes
+        self._indexed       = False
+        self._classindex    = {}    # class URI -> first VocabClass
+        self._slotindex     = {}    # property URI -> [(VocabClass, VocabSlot)]
+        self._attrindex     = {}    # property URI -> [(VocabClass, VocabAttr)]
+        self._valtypeindex  = {}    # value type URI -> [(VocabClass, VocabSlot)]
+        self._subclassindex = {}    # superclass URI -> [subclass URI]
 
     def addSequenceItem(self, item):
         """
@@ -42,14 +94,22 @@ class Vocabulary:
         h = VocabHeadings(headings)
         self._headings = h
         self.addSequenceItem(h)    
+        return h
 
     def getHeadings(self):
         return self._headings.getHeadings()
 
     def addPrefix(self, prefix, namespaceUri, label, descr, comment):
+        """
+        Add a prefix declaration.  If a prefix is declared more than once, 
+        the first declaration is used to resolve qnames.
+        """
         p = VocabPrefix(prefix, namespaceUri, label, descr, comment)
         self._prefixes.append(p)
+        if prefix not in self._prefixindex:
+            self._prefixindex[prefix] = p
         self.addSequenceItem(p)
+        return p
 
     def getPrefixes(self):
         return self._prefixes
@@ -57,9 +117,118 @@ class Vocabulary:
     def getPrefix(self, idx):
         return self._prefixes[idx]
 
+    def getPrefixIndex(self):
+        """
+        Return a dictionary of VocabPrefix values keyed by prefix string,
+        used for resolving qnames.
+        """
+        return self._prefixindex
+
+    def lookupPrefix(self, prefix):
+        """
+        Return the VocabPrefix for the supplied prefix string, or None.
+        """
+        return self._prefixindex.get(prefix, None)
+
+    def importPrefixes(self, prefixes):
+        """
+        Use the supplied VocabPrefix values, declared by imported vocabulary
+        files, to resolve qnames.  They are not added to this vocabulary's
+        own prefix declarations, and take precedence over them.
+        """
+        for p in prefixes:
+            if p.getPrefix() not in self._prefixindex:
+                self._prefixindex[p.getPrefix()] = p
+        return
+
+    def addImport(self, path, label, descr, comment):
+        """
+        Record an import of another vocabulary file (see VocabLoader).
+        """
+        i = VocabImport(path, label, descr, comment)
+        self._imports.append(i)
+        return i
+
+    def getImports(self):
+        return self._imports
+
+    def mergeVocabulary(self, other):
+        """
+        Add the prefix declarations, classes and blank rows of another 
+        vocabulary after those already present, as if its CSV rows had
+        been read here;  its column headings are used only if this 
+        vocabulary has none.  Items are shared with the other vocabulary,
+        not copied.
+
+        A prefix already declared here for the same namespace is not added
+        again, and a ValueError is raised if the other vocabulary declares
+        it for a different namespace.
+        """
+        for item in other.getSequence():
+            if item == None:
+                self.addSequenceItem(None)
+            elif isinstance(item, VocabHeadings):
+                if self._headings == None:
+                    self._headings = item
+                    self.addSequenceItem(item)
+            elif isinstance(item, VocabPrefix):
+                p = self._prefixindex.get(item.getPrefix(), None)
+                if p == None:
+                    self._prefixes.append(item)
+                    self._prefixindex[item.getPrefix()] = item
+                    self.addSequenceItem(item)
+                elif p.getUri() != item.getUri():
+                    raise ValueError, ( "Prefix '%s:' declared as <%s>, already declared as <%s>"%
+                                        (item.getPrefix(), item.getUri(), p.getUri()) )
+            else:
+                self.addClass(item)
+        self._imports.extend(other.getImports())
+        for (cache, othercache) in [(self._uricache, other._uricache),
+                                    (self._nodecache, other._nodecache)]:
+            for (txt, u) in othercache.iteritems():
+                if txt not in cache: cache[txt] = u
+        return
+
+    def internUri(self, uritxt):
+        """
+        Return a VocabUri for the supplied qname or <uri> text, resolved using
+        this vocabulary's prefixes.  Identical text returns the same shared
+        VocabUri value, which must not be modified.
+        """
+        u = self._uricache.get(uritxt, None)
+        if u == None:
+            u = VocabUri(self._prefixindex, uritxt)
+            self._uricache[uritxt] = u
+        return u
+
+    def internNode(self, valtxt):
+        """
+        Return a VocabNode for the supplied qname, <uri> or literal text;
+        as for internUri, identical text returns the same shared value.
+        """
+        n = self._nodecache.get(valtxt, None)
+        if n == None:
+            n = VocabNode(self._prefixindex, valtxt)
+            self._nodecache[valtxt] = n
+        return n
+
+    def trimInterned(self, limit):
+        """
+        Forget the shared values returned by internUri and internNode if
+        there are more than 'limit' of them, so that a vocabulary whose 
+        classes are not kept (see readVocabularySequence) does not keep 
+        every URI read.  Text that is used again is interned again.
+        """
+        if len(self._uricache)+len(self._nodecache) > limit:
+            self._uricache.clear()
+            self._nodecache.clear()
+        return
+
     def addClass(self,vclass):
         self._classes.append(vclass)
         self.addSequenceItem(vclass)
+        if self._indexed:
+            self.indexClass(vclass)
 
     def getClasses(self):
         return self._classes
@@ -67,49 +236,158 @@ class Vocabulary:
     def getClass(self, idx):
         return self._classes[idx]
 
+    def buildIndexes(self):
+        """
+        Index the classes added so far, and any added later.
+        """
+        if not self._indexed:
+            self._indexed = True
+            for c in self._classes:
+                self.indexClass(c)
+        return
+
+    def indexClass(self, vclass):
+        """
+        Index a class, and its slots and attributes including any added later.
+        """
+        uri = vclass.getUri()
+        if uri not in self._classindex:
+            self._classindex[uri] = vclass
+        vclass.setVocabulary(self)
+
+    def indexSlot(self, vclass, slot):
+        """
+        Index a slot of a class in this vocabulary (called by VocabClass.addSlot).
+        """
+        entry = (vclass, slot)
+        self._slotindex.setdefault(slot.getUri(), []).append(entry)
+        self._valtypeindex.setdefault(slot.getValTypeUri(), []).append(entry)
+
+    def indexAttr(self, vclass, attr):
+        """
+        Index an attribute of a class in this vocabulary (called by VocabClass.addAttr).
+        """
+        uri = attr.getUri()
+        self._attrindex.setdefault(uri, []).append((vclass, attr))
+        if uri == RDFS_SUBCLASSOF_URI and attr.isUriValue():
+            # "^ rdfs:subClassOf" declares the value to be a subclass of the class
+            if attr.isInverse():
+                (sub, sup) = (attr.getValueUri(), vclass.getUri())
+            else:
+                (sub, sup) = (vclass.getUri(), attr.getValueUri())
+            self._subclassindex.setdefault(sup, []).append(sub)
+
+    def getClassByUri(self, uri):
+        """
+        Return the first class with the supplied URI, or None.
+        """
+        self.buildIndexes()
+        return self._classindex.get(uri, None)
+
+    def getSlotsByProperty(self, uri):
+        """
+        Return a list of (VocabClass, VocabSlot) pairs for the slots using
+        the property with the supplied URI, in the order they were added.
+        """
+        self.buildIndexes()
+        return self._slotindex.get(uri, [])
+
+    def getAttrsByProperty(self, uri):
+        """
+        Return a list of (VocabClass, VocabAttr) pairs for the attributes
+        using the property with the supplied URI, in the order they were added.
+        """
+        self.buildIndexes()
+        return self._attrindex.get(uri, [])
+
+    def getSlotsByValueType(self, uri):
+        """
+        Return a list of (VocabClass, VocabSlot) pairs for the slots whose
+        values have the type with the supplied URI.
+        """
+        self.buildIndexes()
+        return self._valtypeindex.get(uri, [])
+
+    def getClassesByValueType(self, uri):
+        """
+        Return a list of the classes with slots whose values have the type
+        with the supplied URI, each listed once.
+        """
+        return uniqueItems([ c for (c, s) in self.getSlotsByValueType(uri) ])
+
+    def getSubclasses(self, uri):
+        """
+        Return a list of the URIs of the direct subclasses of the class with
+        the supplied URI, as declared by rdfs:subClassOf attributes of either
+        class, each listed once.
+        """
+        self.buildIndexes()
+        return uniqueItems(self._subclassindex.get(uri, []))
+
+def uniqueItems(items):
+    """
+    Return a list of the supplied items without repeats, in order.
+    """
+    seen   = set()
+    unique = []
+    for i in items:
+        if i not in seen:
+            seen.add(i)
+            unique.append(i)
+    return unique
+
 # --------
 # VocabUri
 # --------
 
 class VocabUri(object):
     """
-    URI used by a vocabulary: preserve qname components and full URI
+    URI used by a vocabulary: preserve qname components and full URI.
+    Values are not changed once set, so they may be shared between vocabulary
+    elements (see Vocabulary.internUri).
+
+    prefixindex is a dictionary of VocabPrefix values keyed by prefix, 
+    as returned by Vocabulary.getPrefixIndex(), or None if qnames are 
+    not allowed.
     """
-    def __init__(self, prefixtable, uritxt):
-        self._base   = None
+    __slots__ = ("_prefix", "_local", "_uri")
+
+    def __init__(self, prefixindex, uritxt):
         self._prefix = None
         self._local  = None
         self._uri    = None
         if uritxt != None:
-            self.setUri(prefixtable, uritxt)
+            self.setUri(prefixindex, uritxt)
         return
 
-    def setUri(self, prefixtable, uritxt):
-        log = logging.getLogger("ConvertOntology.VocabUri")
-        log.debug("setUri '%s;", uritxt)
-        qname_pattern = re.compile("([-.\w]+):([-.\w]+)")
-        uri_pattern   = re.compile("<([^>]*)>")
-        mqname = qname_pattern.match(uritxt)
-        if mqname:
-            if prefixtable:
-                pre = mqname.group(1)
-                loc = mqname.group(2)
-                for p in prefixtable:
-                    log.debug("setUri prefix %s, uri %s", p.getPrefix(), p.getUri())
-                    if pre == p.getPrefix():
-                        self._base   = p.getUri()
-                        self._prefix = pre
-                        self._local  = loc
-                        self._uri    = self._base+self._local
-                        return
+    def setUri(self, prefixindex, uritxt):
+        if TRACE: log_uri.debug("setUri '%s;", uritxt)
+        if self._uri != None:
+            raise ValueError, "URI already set: '%s'"%(self._uri)
+        self.setUriToken(prefixindex, lexUriCell(uritxt), uritxt)
+
+    def setUriToken(self, prefixindex, token, uritxt):
+        """
+        Set URI from a token returned by VocabLexer.lexUriCell or lexNodeCell
+        for the cell text 'uritxt'.
+        """
+        if token == None or token[0] == TOK_LITERAL:
+            raise ValueError, "Expected <uri> or qname, got '%s'"%(uritxt)
+        (kind, val, loc) = token
+        if kind == TOK_QNAME:
+            if prefixindex:
+                p = prefixindex.get(val, None)
+                if p:
+                    if TRACE: log_uri.debug("setUri prefix %s, uri %s", val, p.getUri())
+                    self._prefix = val
+                    self._local  = loc
+                    self._uri    = p.getUri()+loc
+                    return
                 raise ValueError, "Prefix for '%s' not defined"%(uritxt)
             else:
                 raise ValueError, "Expected <uri>, got qname '%s'"%(uritxt)
-        muri = uri_pattern.match(uritxt)
-        if muri:
-            self._uri = muri.group(1)
-            return
-        raise ValueError, "Expected <uri> or qname, got '%s'"%(uritxt)
+        self._uri = val
+        return
 
     def isUri(self):
         return True
@@ -122,6 +400,16 @@ class VocabUri(object):
     def haveNamePair(self):
         return self._prefix and self._local
 
+    def isResolvedBy(self, prefixindex):
+        """
+        True if this URI's text would be resolved to the same URI using the 
+        supplied prefix index (which may be that of another vocabulary).
+        """
+        if self._prefix == None:
+            return True
+        p = prefixindex and prefixindex.get(self._prefix, None)
+        return bool(p) and p.getUri()+self._local == self._uri
+
     def getUriXml(self):
         if self.haveNamePair():
             return "&%s;%s"%(self._prefix, self._local)
@@ -130,7 +418,7 @@ class VocabUri(object):
     def getQName(self):
         if self.haveNamePair():
             return "%s:%s"%(self._prefix, self._local)
-        raise ValueError, "No prefix defined to form QName: %s"(self._uri)
+        raise ValueError, "No prefix defined to form QName: %s"%(self._uri)
 
     def getQNameOrUri(self):
         if self.haveNamePair():
@@ -138,8 +426,7 @@ class VocabUri(object):
         return "<%s>"%(self.getUri())
 
     def getEscapedQNameOrUri(self):
-        log = logging.getLogger("ConvertOntology.VocabUri")
-        log.debug("getEscapedQNameOrUri: return node uri: %s", self._uri)
+        if TRACE: log_uri.debug("getEscapedQNameOrUri: return node uri: %s", self._uri)
         if self.haveNamePair():
             return "%s:%s"%(self._prefix, self._local)
         return "&lt;%s&gt;"%(self.getUri())
@@ -147,7 +434,7 @@ class VocabUri(object):
     def getPrefix(self):
         if self.haveNamePair():
             return self._prefix
-        raise ValueError, "No prefix defined : %s"(self._uri)
+        raise ValueError, "No prefix defined : %s"%(self._uri)
 
 # ---------
 # VocabNode
@@ -157,25 +444,25 @@ class VocabNode(VocabUri):
     """
     RDF node; URI or literal
     """
-    def __init__(self, prefixtable, valtxt):
+    __slots__ = ("_nodevalue",)
+
+    def __init__(self, prefixindex, valtxt):
         super(VocabNode,self).__init__(None, None)
         self._nodevalue = None
-        self.setUri(prefixtable, valtxt)
+        self.setUri(prefixindex, valtxt)
         return
 
-    def setUri(self, prefixtable, valtxt):
-        log = logging.getLogger("ConvertOntology.VocabNode")
-        log.debug("setUri: '%s'", valtxt)
-        qname_pattern = re.compile("(\w+):(\w+)")
-        uri_pattern   = re.compile("<([^>]*)>")
-        mqname = qname_pattern.match(valtxt)
-        muri   = uri_pattern.match(valtxt)
-        if (not mqname) and (not muri):
-            log.debug("Setting node value: '%s'", valtxt)
+    def setUri(self, prefixindex, valtxt):
+        if TRACE: log_node.debug("setUri: '%s'", valtxt)
+        if self._uri != None or self._nodevalue != None:
+            raise ValueError, "Node value already set: '%s'"%(self.getValue())
+        token = lexNodeCell(valtxt)
+        if token[0] == TOK_LITERAL:
+            if TRACE: log_node.debug("Setting node value: '%s'", valtxt)
             self._nodevalue = valtxt
             return
-        log.debug("Setting node uri: '%s'", valtxt)
-        super(VocabNode,self).setUri(prefixtable, valtxt)
+        if TRACE: log_node.debug("Setting node uri: '%s'", valtxt)
+        self.setUriToken(prefixindex, token, valtxt)
 
     def isUri(self):
         return (self._nodevalue == None)
@@ -184,29 +471,26 @@ class VocabNode(VocabUri):
         return (self._nodevalue == None) and (not self.haveNamePair())
 
     def getValue(self):
-        log = logging.getLogger("ConvertOntology.VocabNode")
         if self._nodevalue != None:
-            log.debug("getValue: return node value '%s'", self._nodevalue)
+            if TRACE: log_node.debug("getValue: return node value '%s'", self._nodevalue)
             return self._nodevalue
-        log.debug("getValue: return node uri '%s'", self._uri)
+        if TRACE: log_node.debug("getValue: return node uri '%s'", self._uri)
         return self.getQNameOrUri()
 
     def getValueXml(self):
-        log = logging.getLogger("ConvertOntology.VocabNode")
         if self._nodevalue != None:
-            log.debug("getValueXml: return node value '%s'", self._nodevalue)
+            if TRACE: log_node.debug("getValueXml: return node value '%s'", self._nodevalue)
             if self._nodevalue[0] == '"' and self._nodevalue[-1] == '"':
                 return self._nodevalue[1:-1]
             return self._nodevalue
-        log.debug("getValueXml: return node uri '%s'", self._uri)
+        if TRACE: log_node.debug("getValueXml: return node uri '%s'", self._uri)
         return self.getUriXml()
 
     def getEscapedValue(self):
-        log = logging.getLogger("ConvertOntology.VocabNode")
         if self._nodevalue != None:
-            log.debug("getEscapedValue: return node value '%s'", self._nodevalue)
+            if TRACE: log_node.debug("getEscapedValue: return node value '%s'", self._nodevalue)
             return self._nodevalue
-        log.debug("getEscapedValue: return node uri '%s'", self._uri)
+        if TRACE: log_node.debug("getEscapedValue: return node uri '%s'", self._uri)
         return self.getEscapedQNameOrUri()
 
 # -------------------
@@ -217,12 +501,17 @@ class VocabCommonElements(object):
     """
     Common elements for several vocabulary items
     """
+    __slots__ = ("_new", "_uri", "_label", "_descr", "_comment")
+
     def __init__(self, vocab, new, uri, label=None, descr=None, comment=None):
         self._new     = new
-        self._uri     = VocabUri(vocab and vocab.getPrefixes(), uri)
+        if vocab:
+            self._uri = vocab.internUri(uri)
+        else:
+            self._uri = VocabUri(None, uri)
         self._label   = label
         self._descr   = descr
-        self._comment = []
+        self._comment = None    # List allocated when first comment is added
         self.addComment(comment)
 
     def isNew(self):
@@ -251,16 +540,21 @@ class VocabCommonElements(object):
 
     def addComment(self, comment):
         if comment:
-            self._comment.append(comment)
+            if self._comment == None:
+                self._comment = [comment]
+            else:
+                self._comment.append(comment)
 
     def getComment(self):
-        return self._comment
+        return self._comment or []
 
 # -------------
 # VocabHeadings
 # -------------
 
 class VocabHeadings(object):
+    __slots__ = ("_headings",)
+
     def __init__(self, headings):
         self._headings = headings
 
@@ -275,6 +569,7 @@ class VocabHeadings(object):
 # -----------
 
 class VocabPrefix(VocabCommonElements):
+    __slots__ = ("_prefix",)
 
     def __init__(self, prefix, namespaceUri, label=None, descr=None, comment=None):
         super(VocabPrefix,self).__init__(None, True, namespaceUri, label, descr, comment)
@@ -283,6 +578,34 @@ class VocabPrefix(VocabCommonElements):
     def getPrefix(self):
         return self._prefix
 
+# -----------
+# VocabImport
+# -----------
+
+class VocabImport(object):
+    """
+    Import of another vocabulary file, named relative to the importing file.
+    """
+    __slots__ = ("_path", "_label", "_descr", "_comment")
+
+    def __init__(self, path, label=None, descr=None, comment=None):
+        self._path    = path
+        self._label   = label
+        self._descr   = descr
+        self._comment = comment
+
+    def getPath(self):
+        return self._path
+
+    def getLabel(self):
+        return self._label or ""
+
+    def getDescription(self):
+        return self._descr or ""
+
+    def getComment(self):
+        return (self._comment and [self._comment]) or []
+
 # ----------
 # VocabClass
 # ----------
@@ -291,13 +614,29 @@ class VocabClass(VocabCommonElements):
     """
     Represents a vocabulary class or frame
     """
+    __slots__ = ("_attrs", "_slots", "_vocab")
+
     def __init__(self, vocab, newClass, classURI, label=None, descr=None, comment=None):
         super(VocabClass,self).__init__(vocab, newClass, classURI, label, descr, comment)
         self._attrs   = []
         self._slots   = []
+        self._vocab   = None    # Vocabulary indexing this class, if any
+
+    def setVocabulary(self, vocab):
+        """
+        Record the vocabulary that indexes this class, and index the slots 
+        and attributes of the class there, now and as they are added.
+        """
+        self._vocab = vocab
+        for a in self._attrs:
+            vocab.indexAttr(self, a)
+        for s in self._slots:
+            vocab.indexSlot(self, s)
 
     def addAttr(self, attr):
         self._attrs.append(attr)
+        if self._vocab is not None:
+            self._vocab.indexAttr(self, attr)
 
     def getAttrs(self):
         return self._attrs
@@ -307,6 +646,8 @@ class VocabClass(VocabCommonElements):
 
     def addSlot(self, slot):
         self._slots.append(slot)
+        if self._vocab is not None:
+            self._vocab.indexSlot(self, slot)
 
     def getSlots(self):
         return self._slots
@@ -322,10 +663,15 @@ class VocabAttr(VocabCommonElements):
     """
     Represents an attribute of a vocabulary class; i.e. a schema assertion about that class
     """
+    __slots__ = ("_inverse", "_value")
+
     def __init__(self, vocab, newAttr, inverseAttr, attrURI, value, label=None, descr=None, comment=None):
         super(VocabAttr,self).__init__(vocab, newAttr, attrURI, label, descr, comment)
         self._inverse = inverseAttr
-        self._value   = VocabNode(vocab and vocab.getPrefixes(), value) # URI or literal
+        if vocab:
+            self._value = vocab.internNode(value)   # URI or literal
+        else:
+            self._value = VocabNode(None, value)
         return
     
     def isInverse(self):
@@ -340,6 +686,9 @@ class VocabAttr(VocabCommonElements):
     def getValue(self):
         return self._value.getValue()
 
+    def getValueOrUri(self):
+        return self._value.getValue()
+
     def getValueUri(self):
         return self._value.getUri()
 
@@ -364,14 +713,16 @@ class VocabSlot(VocabCommonElements):
     Represents a slot of a vocabulary class; i.e. a property that is expected to be associated with 
     an instance of the class, along with cardinality and property value type constraints.
     """
+    __slots__ = ("_inverse", "_mincard", "_maxcard", "_valtype", "_asserts")
+
     def __init__(self, vocab, newSlot, inverseProp, propURI, mincard, maxcard, valtype, 
                  label=None, descr=None, comment=None):
         super(VocabSlot,self).__init__(vocab, newSlot, propURI, label, descr, comment)
         self._inverse = inverseProp
         self._mincard = mincard
         self._maxcard = maxcard
-        self._valtype = VocabUri(vocab.getPrefixes(), valtype)
-        self._asserts = []
+        self._valtype = vocab.internUri(valtype)
+        self._asserts = None    # List allocated when first assertion is added
 
     def isInverse(self):
         return self._inverse
@@ -402,13 +753,17 @@ class VocabSlot(VocabCommonElements):
 
     def addAssertion(self, vocab, relation, value, label, descr, comment):
         a = SlotAssertion(vocab, relation, value, label, descr, comment)
-        self._asserts.append(a)
+        if self._asserts == None:
+            self._asserts = [a]
+        else:
+            self._asserts.append(a)
+        return a
 
     def getAssertions(self):
-        return self._asserts
+        return self._asserts or []
 
     def getAssertion(self, idx):
-        return self._asserts[idx]
+        return self.getAssertions()[idx]
 
 # -------------
 # SlotAssertion
@@ -419,9 +774,20 @@ class SlotAssertion(VocabCommonElements):
     Represents an assertion about the property for a slot; 
     e.g. that it is a subproperty of some other property.
     """
+    __slots__ = ("_value",)
+
     def __init__(self, vocab, relation, value, label=None, descr=None, comment=None):
         super(SlotAssertion,self).__init__(vocab, False, relation, label, descr, comment)
-        self._value   = VocabNode(vocab and vocab.getPrefixes(), value) # URI or literal
+        if vocab:
+            self._value = vocab.internNode(value)   # URI or literal
+        else:
+            self._value = VocabNode(None, value)
+
+    def isUriValue(self):
+        return self._value.isUri()
+
+    def isFullUriValue(self):
+        return self._value.isFullUri()
 
     def getValueOrUri(self):
         return self._value.getValue()
@@ -441,36 +807,84 @@ class SlotAssertion(VocabCommonElements):
     def getEscapedValueQnameOrUri(self):
         return self._value.getEscapedQNameOrUri()
 
+    def getEscapedValueQNameOrUri(self):
+        return self._value.getEscapedValue()
+
 # -------------------------------
 # Vocabulary processing functions
 # -------------------------------
 
-def readVocabulary(csvreader):
+# Maximum number of URI and node values kept for sharing while a vocabulary
+# sequence is streamed;  enough for the terms used by each class, and those
+# repeated throughout, to be resolved once
+STREAM_INTERN_LIMIT = 4096
+
+# Event types returned by readVocabularyEvents
+EV_HEADINGS    = "headings"
+EV_PREFIX      = "prefix"
+EV_IMPORT      = "import"
+EV_BLANK       = "blank"
+EV_CLASS_START = "class-start"
+EV_ATTR        = "attr"
+EV_SLOT        = "slot"
+EV_ASSERTION   = "assertion"
+EV_CLASS_END   = "class-end"
+
+# Message for a property, superproperty or comment row with nothing to apply to
+ROW_NOT_APPLICABLE = "Row does not follow a class or slot that it applies to"
+
+def readVocabularyEvents(csvreader, vocab=None, errors=None):
     """
-    Read vocabulary details from the CSV reader, and return a 
-    VocabClass object reflecting what was there.
+    Read vocabulary details from the CSV reader, and return a generator of
+    (event, item, line) tuples as the input rows are consumed, where 'event' is
+    one of the EV_* values above, 'item' is the vocabulary element concerned
+    (None for EV_BLANK) and 'line' is the CSV input line number.
+
+    Prefix declarations and column headings are recorded in the supplied
+    Vocabulary (a new one is created if none is supplied), as they are needed
+    to resolve qnames in later rows, as are imports of other files (rows 
+    '"@","import",filename', which are not otherwise acted on here; see 
+    VocabLoader);  classes are not added, so the caller decides whether to 
+    keep them.
+
+    Comments on subsequent rows may still be added to an element after it has
+    been returned, so consumers should regard a class and its attributes,
+    slots and assertions as complete only when EV_CLASS_END is returned for it.
+    csv.Error exceptions are passed back to the caller.
+
+    A row that cannot be read, including a property row before the first
+    class or a superproperty row that does not follow a slot, raises a 
+    ValueError.  If a list is supplied as 'errors', such a row is skipped,
+    and a pair (line, message) appended to the list instead (see 
+    VocabValidator).
     """
-    log = logging.getLogger("ConvertOntology.readVocabulary")
-    v = Vocabulary()
-    try:
-        # Column headings
-        v.setHeadings(csvreader.next())
-        # Table body
-        for row in csvreader:
-            row = (row+['','','','','','',''])[:7]
-            log.debug("read row '%s'", str(row))
+    v = vocab
+    if v == None: v = Vocabulary()
+    # Column headings
+    yield (EV_HEADINGS, v.setHeadings(csvreader.next()), csvreader.line_num)
+    # Table body
+    c = None
+    p = None
+    r_prevprop = ''
+    for row in csvreader:
+        row = (row+['','','','','','',''])[:7]
+        if TRACE: log_read.debug("read row '%s'", str(row))
+        try:
             (r_flag,r_class,r_prop,r_value,r_label,r_descr,r_comment) = row
             if r_flag == '@' and r_class == 'prefix':
-                #TODO: move re.compiles out of loop
-                pref_pattern = re.compile("\s*([^:]*):?")
-                mpref = pref_pattern.match(row[2])
-                v.addPrefix(mpref.group(1), row[3], r_label, r_descr, r_comment)
+                pfx = v.addPrefix(lexPrefixCell(r_prop), r_value, r_label, r_descr, r_comment)
+                yield (EV_PREFIX, pfx, csvreader.line_num)
+            elif r_flag == '@' and r_class == 'import':
+                imp = v.addImport(r_prop, r_label, r_descr, r_comment)
+                yield (EV_IMPORT, imp, csvreader.line_num)
             elif r_class == '' and r_prop == '' and r_value == '' and r_label == '' and r_descr == '' and r_comment == '':
-                v.addSequenceItem(None)
+                yield (EV_BLANK, None, csvreader.line_num)
             elif r_flag != '#':
                 if r_class != '':
+                    if c != None:
+                        yield (EV_CLASS_END, c, csvreader.line_num)
                     c = VocabClass(v, r_flag == '+', r_class, r_label, r_descr, r_comment)
-                    v.addClass(c)
+                    yield (EV_CLASS_START, c, csvreader.line_num)
                     p = None
                     r_label    = ''
                     r_descr    = ''
@@ -482,43 +896,99 @@ def readVocabulary(csvreader):
                     else:
                         r_prop = r_prevprop
                 if r_prop != '':
-                    #TODO: move re.compiles out of loop
-                    prop_pattern = re.compile("\s*(\^)?\s*(.*)")
-                    mprop = prop_pattern.match(r_prop)
                     pnew  = r_flag == '+'
-                    pinv  = mprop.group(1) == '^'
-                    puri  = mprop.group(2)
-                    #TODO: move re.compiles out of loop
-                    slot_pattern = re.compile("\s*(([?1*+])\s*::)?\s*(<=)?\s*(.*)")
-                    mslot = slot_pattern.match(r_value)
-                    prel  = mslot.group(3)
-                    sval  = mslot.group(4)
-                    if mslot.group(1) != None:
-                        card  = mslot.group(2)
-                        cmin  = 0
-                        cmax  = sys.maxint
-                        if card in "1+": cmin = 1
-                        if card in "1?": cmax = 1
+                    (pinv, puri) = lexPropertyCell(r_prop)
+                    (vkind, cmin, cmax, sval) = lexValueCell(r_value)
+                    if c == None or (vkind == VAL_SUBPROP and not isinstance(p, VocabSlot)):
+                        raise ValueError, ROW_NOT_APPLICABLE
+                    if vkind == VAL_SLOT:
                         p = VocabSlot(v, pnew, pinv, puri, cmin, cmax, sval, r_label, r_descr, r_comment)
                         c.addSlot(p)
-                    elif mslot.group(3) == '<=':
+                        yield (EV_SLOT, p, csvreader.line_num)
+                    elif vkind == VAL_SUBPROP:
                         rel = "rdfs:subPropertyOf"
-                        p.addAssertion(v, rel, sval, r_label, r_descr, r_comment)
+                        a = p.addAssertion(v, rel, sval, r_label, r_descr, r_comment)
+                        yield (EV_ASSERTION, a, csvreader.line_num)
                     else:
                         p = VocabAttr(v, pnew, pinv, puri, sval, r_label, r_descr, r_comment)
                         c.addAttr(p)
+                        yield (EV_ATTR, p, csvreader.line_num)
                     r_value   = None
                     r_label   = None
                     r_descr   = None
                     r_comment = None
                 if r_comment != None and r_comment != '':
+                    if c == None:
+                        raise ValueError, ROW_NOT_APPLICABLE
                     if r_class != '' or p == None:
                         c.addComment(r_comment)
                     else:
                         p.addComment(r_comment)
+        except ValueError, e:
+            if errors == None: raise
+            errors.append((csvreader.line_num, str(e)))
+    if c != None:
+        yield (EV_CLASS_END, c, csvreader.line_num)
+    return
+
+def readVocabularySequence(csvreader, vocab=None):
+    """
+    Read vocabulary details from the CSV reader, and return a generator of the
+    items that Vocabulary.getSequence() would contain after readVocabulary,
+    in the same order, but without retaining them.  Each VocabClass is 
+    returned only when it is complete, so emitters that walk the sequence
+    in order can run in memory proportional to the largest class rather 
+    than the whole vocabulary;  the values interned by the vocabulary are
+    limited to STREAM_INTERN_LIMIT for the same reason.
+
+    csv.Error exceptions are passed back to the caller.
+    """
+    v = vocab
+    if v == None: v = Vocabulary()
+    pending = None      # Items read while a class is still open
+    for (event, item, line) in readVocabularyEvents(csvreader, v):
+        if event == EV_CLASS_START:
+            pending = []
+        elif event == EV_CLASS_END:
+            v.trimInterned(STREAM_INTERN_LIMIT)
+            yield item
+            for i in pending:
+                yield i
+            pending = None
+        elif event in (EV_HEADINGS, EV_PREFIX, EV_BLANK):
+            if pending == None:
+                yield item
+            else:
+                pending.append(item)
+    return
+
+def readVocabulary(csvreader, vocab=None):
+    """
+    Read vocabulary details from the CSV reader, and return a 
+    VocabClass object reflecting what was there.  Details are added to
+    the supplied Vocabulary, if any, which is returned.
+
+    A CSV format error is reported on stderr, and None returned.
+    """
+    try:
+        return buildVocabulary(csvreader, vocab)
     except csv.Error, e:
         sys.stderr.write("input line %d: %s" % (csvreader.line_num, e))
         return None
+
+def buildVocabulary(csvreader, vocab=None):
+    """
+    Read vocabulary details from the CSV reader into the supplied 
+    Vocabulary, or a new one, and return it, as for readVocabulary;  
+    csv.Error and ValueError exceptions are passed back to the caller.
+    """
+    v = vocab
+    if v == None: v = Vocabulary()
+    for (event, item, line) in readVocabularyEvents(csvreader, v):
+        if event == EV_CLASS_START:
+            v.addClass(item)
+        elif event == EV_BLANK:
+            v.addSequenceItem(None)
     return v
 
 def testReadVocabulary():
@@ -550,6 +1020,7 @@ def testReadVocabulary():
         ,,,,,,
         "+","pre:c.c-c","pre:p.p-p","1 :: pre:s.s-s","c.c-c p.p-p s.s-s","class, property and slot with '.' and '-' in name"
         '''
+    import StringIO
     vstr = StringIO.StringIO(vtxt)
     vocab = readVocabulary(csv.reader(vstr, skipinitialspace=True ))
 
@@ -763,29 +1234,379 @@ def testReadVocabulary():
 def convertOntology(ipstr, opstr, options):
     """
     Convert an ontology to publishable form, using data streams and options provided.
+
+    Output is written in each format selected by the options (see 
+    getOutputFormats), from a single parse of the input, which is streamed
+    through the emitters.  If options.cache_dir names a cache directory 
+    (see getVocabCache) and options.no_cache is not set, a vocabulary cached
+    for the same input content is used instead of reading the input.  If 
+    options.stats is a PhaseStats value, the time taken by each phase of 
+    the conversion is recorded in it.
+
+    If the input is a file named by options.inp_file that imports other
+    vocabulary files, they are read as well (see VocabLoader), using up 
+    to options.jobs processes (default 1).
     
     Returns:
       0 - success
       1 - error
     """
-    csvreader = csv.reader(ipstr)
-    if options.mediawiki:
-        return convertOntologyToMediaWiki(csvreader, opstr, options)
-    elif options.basecamp:
-        return convertOntologyToBasecamp(csvreader, opstr, options)
-    elif options.rdf:
-        return convertOntologyToOwl(csvreader, opstr, options)
+    cache   = getVocabCache(options)
+    outputs = getOutputFormats(options)
+    if cache and getattr(options, "clear_cache", False):
+        cache.clear()
+        if outputs == []: return 0
+    if getattr(options, "no_cache", False):
+        cache = None
+    stats = getattr(options, "stats", None)
+    inp_file = getattr(options, "inp_file", "")
+    def convert(emitters):
+        if inp_file:
+            from VocabLoader import fileHasImports, convertWithImports
+            if fileHasImports(inp_file):
+                return convertWithImports(inp_file, emitters, options)
+        if cache:
+            return convertOntologyCached(ipstr, cache, emitters, stats)
+        return convertOntologyWithEmitters(csv.reader(ipstr), emitters, stats)
+    return convertWithOutputs(opstr, options, convert)
+
+def convertVocabulary(vocab, opstr, options):
+    """
+    Write a vocabulary that has already been read to each output format
+    selected by the options, as for convertOntology.
+    """
+    def convert(emitters):
+        emitSequence(vocab.getSequence(), emitters)
+        return 0
+    return convertWithOutputs(opstr, options, convert)
+
+def convertWithOutputs(opstr, options, convert):
+    """
+    Open the outputs selected by the options, and call convert with a list
+    of emitters for them;  the outputs are closed when it returns.
+
+    Returns the status returned by convert, or 1 if an output file cannot 
+    be opened.  A ValueError is raised if the options select no output 
+    format, or one that is not known.
+    """
+    outputs = getOutputFormats(options)
+    if outputs == []:
+        raise ValueError, "No output format selected"
+    for (fmt, filename) in outputs:
+        if fmt not in EMITTERS:
+            raise ValueError, "Unknown output format '%s'"%(fmt)
+    stats    = getattr(options, "stats", None)
+    emitters = []
+    opened   = []
+    mainstr  = BufferedWriter(opstr, getBufferSize(options))
+    writers  = [mainstr]
+    try:
+        for (fmt, filename) in outputs:
+            ostr = mainstr
+            if filename:
+                try:
+                    opened.append(open(filename, "wb"))
+                except IOError, e:
+                    sys.stderr.write("Open output file %s failed: %s"%(filename,str(e)))
+                    return 1
+                ostr = BufferedWriter(opened[-1], getBufferSize(options))
+                writers.append(ostr)
+            emitters.append(EMITTERS[fmt](ostr, options))
+        if stats:
+            instrumentEmitters(stats, [ fmt for (fmt, filename) in outputs ], emitters, writers)
+        status = convert(emitters)
+        if stats:
+            stats.count("bytes written", sum([ w.getBytesWritten() for w in writers ]))
+        return status
+    finally:
+        for ostr in opened:
+            ostr.close()
+
+def getOutputFormats(options):
+    """
+    Return a list of (format, filename) pairs for the outputs selected by 
+    the supplied options, where filename is "" for the main output stream.
+
+    Single-format options (e.g. options.rdf) select output to the main
+    output stream;  options.formats, if present, is a list of additional
+    (format, filename) pairs.
+    """
+    outputs = [ (fmt, "") for fmt in FORMATS if getattr(options, fmt, False) ]
+    return outputs + (getattr(options, "formats", None) or [])
+
+def getBufferSize(options):
+    """
+    Return the output buffer size given by options.buffer_size, if present.
+    """
+    return getattr(options, "buffer_size", DEFAULT_BUFFER_SIZE)
+
+def getVocabCache(options):
+    """
+    Return the VocabCache in the directory named by options.cache_dir,
+    or None if no cache directory is given.
+    """
+    cachedir = getattr(options, "cache_dir", None)
+    if not cachedir:
+        return None
+    from VocabCache import VocabCache
+    # Pickled classes are located by module name, which is "__main__" when
+    # this file is run as a program, so entries are not shared with importers
+    # (but are shared when it is run by RunConvert.py)
+    return VocabCache(cachedir, "%s %s/%d"%(__name__, VERSION, CACHE_FORMAT))
+
+def emitSequence(sequence, emitters):
+    """
+    Write a vocabulary to each of the supplied emitters, in a single 
+    traversal of its sequence of items (see Vocabulary.getSequence).
+    """
+    try:
+        for e in emitters:
+            e.writeStart()
+        for item in sequence:
+            if item == None:
+                for e in emitters: e.writeBlank()
+            elif isinstance(item, VocabHeadings):
+                for e in emitters: e.writeHeadings(item)
+            elif isinstance(item, VocabPrefix):
+                for e in emitters: e.writePrefix(item)
+            elif isinstance(item, VocabClass):
+                for e in emitters: e.writeClass(item)
+            else:
+                assert False, "Unexpected value: "+str(item)
+        for e in emitters:
+            e.writeEnd()
+    finally:
+        # Output written before any error is kept, as when unbuffered
+        for e in emitters:
+            e.flush()
+    return
+
+def convertOntologyWithEmitters(csvreader, emitters, stats=None):
+    """
+    Convert an ontology from the supplied csv reader, writing it to each of
+    the supplied emitters as it is read.  If a PhaseStats value is supplied,
+    the time taken to read the input and build the model is recorded in it.
+
+    Returns:
+      0 - success
+      1 - error
+    """
+    try:
+        if stats:
+            (csvreader, timed) = instrumentReader(stats, csvreader)
+            sequence = stats.timedIterator("model building", 
+                                           readVocabularySequence(csvreader, timed))
+            emitSequence(countSequence(stats, sequence), emitters)
+            stats.count("rows", csvreader.line_num)
+        else:
+            emitSequence(readVocabularySequence(csvreader), emitters)
+    except csv.Error, e:
+        sys.stderr.write("input line %d: %s" % (csvreader.line_num, e))
+        return 1
+    return 0
+
+def convertOntologyCached(ipstr, cache, emitters, stats=None):
+    """
+    Convert an ontology from the supplied input stream, writing it to each
+    of the supplied emitters.  If the cache holds a vocabulary for the same
+    input content, it is used without reading the input again;  otherwise
+    the input is read and the resulting vocabulary is saved in the cache.
+    If a PhaseStats value is supplied, the time taken by each step is 
+    recorded in it.
+
+    Returns:
+      0 - success
+      1 - error
+    """
+    log   = logging.getLogger("ConvertOntology.convertOntologyCached")
+    (read, makeKey, load, store) = (ipstr.read, cache.makeKey, cache.load, cache.store)
+    vocab = None
+    if stats:
+        read    = stats.timed("input read", read)
+        makeKey = stats.timed("cache key", makeKey)
+        load    = stats.timed("cache load", load)
+        store   = stats.timed("cache store", store)
+    data  = read()
+    key   = makeKey(data)
+    cached = load(key)
+    if cached == None:
+        log.info("Cache miss %s", key)
+        csvreader = csv.reader(cStringIO.StringIO(data))
+        if stats:
+            (csvreader, timed) = instrumentReader(stats, csvreader)
+            if stats.timed("model building", readVocabulary)(csvreader, timed) != None:
+                vocab = timed.vocab
+            stats.count("rows", csvreader.line_num)
+        else:
+            vocab = readVocabulary(csvreader)
+        if vocab == None: return 1
+        store(key, vocab)
     else:
-        assert False,"TODO - convertOntology other options"
-    return 1
+        log.info("Cache hit %s", key)
+        vocab = cached
+    sequence = vocab.getSequence()
+    if stats:
+        sequence = countSequence(stats, sequence)
+    emitSequence(sequence, emitters)
+    return 0
 
-def convertOntologyToOwl(csvreader, opstr, options):
+# ---------------------
+# Conversion statistics
+# ---------------------
+
+class TimedVocabulary(object):
     """
-    Convert an ontology from the supplied csv reader to OWL RDF/XML format.
+    Stand-in for a new Vocabulary, to be passed to the vocabulary readers, 
+    that records the time taken to resolve URIs and qnames in the supplied
+    PhaseStats value.  The Vocabulary read is self.vocab, which is not 
+    itself changed, so it may be saved in a cache.
+    """
+    def __init__(self, stats):
+        self.vocab      = Vocabulary()
+        self.internUri  = stats.timed("prefix resolution", self.vocab.internUri)
+        self.internNode = stats.timed("prefix resolution", self.vocab.internNode)
+
+    def __getattr__(self, name):
+        return getattr(self.vocab, name)
+
+def instrumentReader(stats, csvreader):
+    """
+    Return a CSV reader and a TimedVocabulary that record the time taken 
+    to read CSV rows and to resolve URIs and qnames in the supplied 
+    PhaseStats value.
+    """
+    from PhaseStats import TimedReader
+    return (TimedReader(csvreader, stats, "csv tokenizing"), TimedVocabulary(stats))
+
+def instrumentEmitters(stats, formats, emitters, writers):
+    """
+    Record the time taken by each method of the supplied emitters, and by
+    flushing the supplied BufferedWriters, in the supplied PhaseStats value.
+    """
+    for (fmt, e) in zip(formats, emitters):
+        for m in ("writeStart", "writeHeadings", "writePrefix", 
+                  "writeBlank", "writeClass", "writeEnd"):
+            setattr(e, m, stats.timed("%s %s"%(fmt, m), getattr(e, m)))
+    for w in writers:
+        # BufferedWriter.write calls flush through the instance
+        w.flush = stats.timed("output flush", w.flush)
+    return
+
+def countSequence(stats, sequence):
+    """
+    Return a generator of the items in a vocabulary sequence, counting the
+    prefixes, classes, attributes, slots and assertions in the supplied
+    PhaseStats value.
+    """
+    for item in sequence:
+        if isinstance(item, VocabPrefix):
+            stats.count("prefixes")
+        elif isinstance(item, VocabClass):
+            stats.count("classes")
+            stats.count("attributes", len(item.getAttrs()))
+            stats.count("slots", len(item.getSlots()))
+            for s in item.getSlots():
+                stats.count("assertions", len(s.getAssertions()))
+        yield item
+    return
+
+# --------
+# Emitters
+# --------
+
+class VocabEmitter(object):
+    """
+    Base class for output format writers.  An emitter is called by
+    emitSequence with each item of a vocabulary sequence in turn, and
+    writes its output to the supplied stream.  Methods not overridden
+    by a subclass write nothing.
+
+    Output is written through a BufferedWriter, which is flushed by 
+    emitSequence when the sequence is finished.  If the supplied stream
+    is not a BufferedWriter, it is wrapped in one with a buffer size given
+    by options.buffer_size, if present.  Emitters that share a stream 
+    should share a BufferedWriter, so their output is not reordered.
+
+    Output text is generated by the renderer functions of a TemplateSet
+    (see VocabTemplates), compiled from the class attributes whose names
+    start with template_prefix when the first emitter of the class is 
+    created.  Templates from options.templates, if present, replace the 
+    defaults; the TemplateSet compiled with them is kept for use by later 
+    emitters with the same templates.
+    """
+    template_prefix = None
+    templates       = None      # Default TemplateSet, compiled when first used
+    overridden      = {}        # TemplateSets compiled with options.templates
+
+    def __init__(self, opstr, options):
+        if not isinstance(opstr, BufferedWriter):
+            opstr = BufferedWriter(opstr, getBufferSize(options))
+        self._opstr   = opstr
+        self._options = options
+        self._render  = self.getTemplates(options)
+
+    @classmethod
+    def getDefaultTemplates(cls):
+        """
+        Return the default TemplateSet for this emitter class.
+        """
+        if cls.__dict__.get("templates") == None and cls.template_prefix:
+            cls.templates = TemplateSet(templatesFromClass(cls, cls.template_prefix))
+        return cls.templates
+
+    def getTemplates(self, options):
+        """
+        Return the TemplateSet used for output with the supplied options.
+        """
+        templates = self.getDefaultTemplates()
+        overrides = getattr(options, "templates", None)
+        if overrides and templates:
+            # Compiled once for each emitter class and set of templates, so
+            # repeated conversions (e.g. with --watch) share the renderers
+            key = (self.__class__, tuple(overrides))
+            if key not in self.overridden:
+                self.overridden[key] = templates.override(overrides)
+            return self.overridden[key]
+        return templates
+
+    def flush(self):
+        self._opstr.flush()
+
+    def writeStart(self):
+        return
+
+    def writeHeadings(self, item):
+        return
+
+    def writePrefix(self, item):
+        return
+
+    def writeBlank(self):
+        return
+
+    def writeClass(self, item):
+        return
+
+    def writeEnd(self):
+        return
+
+class OwlEmitter(VocabEmitter):
+    """
+    Write vocabulary in OWL RDF/XML format.
+
+    Each section of the OWL output ranges over all prefixes or classes, so
+    these are collected as they are received, and written by writeEnd.
+
+    A property used by the slots of several classes is declared once, with
+    each of the distinct labels and descriptions of those slots, and, if
+    options.property_domains is set, with the classes as its domain (or 
+    their union).  A property used both for datatype values and for other
+    values is declared once as each kind of property.
     """
     #TODO: use qualified cardinality restrictions?
     #TODO: add RDF, RDFS, OWL, OWL2 namespaces to prefix list?
     #TODO: detect non-class values and output as instance data
+    template_prefix = "owl_"
     owl_preamble = (
         """<?xml version="1.0"?>\n\n"""
         )
@@ -911,6 +1732,22 @@ def convertOntologyToOwl(csvreader, opstr, options):
         """        <rdfs:comment\n"""
         """            >%s</rdfs:comment>\n"""
         )
+    owl_property_domain = (
+        """        <rdfs:domain rdf:resource="%s"/>\n"""
+        )
+    owl_property_domain_union_open = (
+        """        <rdfs:domain>\n"""
+        """            <owl:Class>\n"""
+        """                <owl:unionOf rdf:parseType="Collection">\n"""
+        )
+    owl_property_domain_union_value = (
+        """                    <owl:Class rdf:about="%s"/>\n"""
+        )
+    owl_property_domain_union_close = (
+        """                </owl:unionOf>\n"""
+        """            </owl:Class>\n"""
+        """        </rdfs:domain>\n"""
+        )
     owl_object_property_close = (
         """    </owl:ObjectProperty>\n\n"""
         )
@@ -921,122 +1758,186 @@ def convertOntologyToOwl(csvreader, opstr, options):
         """\n"""
         )
 
-    # Parse vocabulary details from CSV
-    try:
-        vocab = readVocabulary(csvreader)
-    except csv.Error, e:
-        sys.stderr.write("input line %d: %s" % (csvreader.line_num, e))
-        return 1
-    # Process vocabulary
-    #
-    # Write preamble
-    opstr.write(owl_preamble)
-    # Write prefix entities
-    opstr.write(owl_entity_start)
-    for p in vocab.getPrefixes():
-            opstr.write(owl_entity_prefix%(p.getPrefix(), p.getUri()))
-    opstr.write(owl_entity_end)
-    # Write rdf:RDF with prefix namespaces
-    opstr.write(owl_rdfopen_start)
-    for p in vocab.getPrefixes():
-            opstr.write(owl_rdfopen_prefix%(p.getPrefix(), p.getUri()))
-    opstr.write(owl_rdfopen_end)
-    # Write ontology header (TODO: think about how to name ontology)
-    opstr.write(owl_ontology_elem)
-    # Write out slot property descriptions, labels, etc
-    for c in [cc for cc in vocab.getClasses() if cc.isNew()]:
-        for s in c.getSlots():
-            #TODO: use URIs rather than qnames or prefix strings to isolate literal types
-            if s.getValTypeQName() == "rdfs:Literal" or s.getValTypePrefix() == "xsd":
-                opstr.write(owl_datatype_property_open%(s.getUriXml()))
-                propclose = owl_datatype_property_close
+    def __init__(self, opstr, options):
+        super(OwlEmitter,self).__init__(opstr, options)
+        self._prefixes = []
+        # Buckets for the sections of the output, filled by writeClass
+        self._props    = []     # (slot, datatype flag, labels, descriptions, domains), for property declarations
+        self._propidx  = {}     # Entries of self._props keyed by (property URI, datatype flag)
+        self._classes  = []     # (class, non-inverse attributes)
+        self._enums    = []     # (class, rdf:type enumeration values)
+        self._unions   = []     # (class, rdfs:subClassOf union values)
+        self._asserts  = []     # (class, inverse attribute)
+
+    def writePrefix(self, item):
+        self._prefixes.append(item)
+
+    def writeClass(self, item):
+        """
+        Sort the slots and attributes of a new class into the buckets for 
+        each output section, in a single pass over the class.
+        """
+        if not item.isNew(): return
+        attrs = []
+        enums = []
+        unions = []
+        for a in item.getAttrs():
+            if not a.isInverse():
+                attrs.append(a)
+                continue
+            #TODO: create function to construct a URI with reference to prefixes; e.g. vocab.mkUri("rdf:type")
+            qname = a.getQName()
+            if qname == "rdf:type":
+                enums.append(a.getValueXml())
+            elif qname == "rdfs:subClassOf":
+                unions.append(a.getValueXml())
+            # NOTE: getUri() returns a full URI, so nothing is excluded here
+            if a.getUri() != "rdf:type" and a.getUri() != "rdfs:subClassOf":
+                self._asserts.append((item, a))
+        for s in item.getSlots():
+            self.addProperty(item, s)
+        self._classes.append((item, attrs))
+        if enums != []:
+            self._enums.append((item, enums))
+        if unions != []:
+            self._unions.append((item, unions))
+
+    def addProperty(self, vclass, slot):
+        """
+        Add the property used by a class slot to those to be declared, or
+        add the slot's label, description and class to an earlier entry.
+        """
+        datatype = self.isDatatypeSlot(slot)
+        key      = (slot.getUri(), datatype)
+        entry    = self._propidx.get(key, None)
+        if entry == None:
+            entry = (slot, datatype, [], [], [])
+            self._propidx[key] = entry
+            self._props.append(entry)
+        (s, d, labels, descrs, classes) = entry
+        label = slot.getLabel()
+        if label != "" and label not in labels:
+            labels.append(label)
+        descr = slot.getDescription()
+        if descr != "" and descr not in descrs:
+            descrs.append(descr)
+        # A class's slots all precede those of the next class to be added
+        if not classes or classes[-1] != vclass.getUriXml():
+            classes.append(vclass.getUriXml())
+        return
+
+    def isDatatypeSlot(self, slot):
+        #TODO: use URIs rather than qnames or prefix strings to isolate literal types
+        return slot.getValTypeQName() == "rdfs:Literal" or slot.getValTypePrefix() == "xsd"
+
+    def writeEnd(self):
+        opstr  = self._opstr
+        render = self._render
+        # Process vocabulary
+        #
+        # Write preamble
+        opstr.write(render.owl_preamble())
+        # Write prefix entities
+        opstr.write(render.owl_entity_start())
+        for p in self._prefixes:
+                opstr.write(render.owl_entity_prefix(p.getPrefix(), p.getUri()))
+        opstr.write(render.owl_entity_end())
+        # Write rdf:RDF with prefix namespaces
+        opstr.write(render.owl_rdfopen_start())
+        for p in self._prefixes:
+                opstr.write(render.owl_rdfopen_prefix(p.getPrefix(), p.getUri()))
+        opstr.write(render.owl_rdfopen_end())
+        # Write ontology header (TODO: think about how to name ontology)
+        opstr.write(render.owl_ontology_elem())
+        # Write out slot property descriptions, labels, etc
+        domains = getattr(self._options, "property_domains", False)
+        for (s, datatype, labels, descrs, classes) in self._props:
+            if datatype:
+                opstr.write(render.owl_datatype_property_open(s.getUriXml()))
+                propclose = render.owl_datatype_property_close()
             else:
-                opstr.write(owl_object_property_open%(s.getUriXml()))
-                propclose = owl_object_property_close
-            if s.getLabel() != "":
-                opstr.write(owl_property_label%(s.getLabel()))
-            # Class description
-            if s.getDescription() != "":
-                opstr.write(owl_property_description%(s.getDescription()))
+                opstr.write(render.owl_object_property_open(s.getUriXml()))
+                propclose = render.owl_object_property_close()
+            for l in labels:
+                opstr.write(render.owl_property_label(l))
+            # Property description
+            for d in descrs:
+                opstr.write(render.owl_property_description(d))
+            # Classes with slots using the property
+            if domains and len(classes) == 1:
+                opstr.write(render.owl_property_domain(classes[0]))
+            elif domains:
+                opstr.write(render.owl_property_domain_union_open())
+                for c in classes:
+                    opstr.write(render.owl_property_domain_union_value(c))
+                opstr.write(render.owl_property_domain_union_close())
             opstr.write(propclose)
-    # Process class descriptions
-    for c in [cc for cc in vocab.getClasses() if cc.isNew()]:
-        # Class open
-        opstr.write(owl_class_open%(c.getUriXml()))
-        # Class label
-        if c.getLabel() != "":
-            opstr.write(owl_class_label%(c.getLabel()))
-        # Class description
-        if c.getDescription() != "":
-            opstr.write(owl_class_description%(c.getDescription()))
-        # Non-inverse class attributes
-        for a in [aa for aa in c.getAttrs() if not aa.isInverse()]:
-            if a.isUriValue():
-                opstr.write(owl_class_attribute%(a.getQName(), a.getValueXml()))
-            else:
-                opstr.write(owl_class_attr_lit%(a.getQName(), a.getValueXml(), a.getQName()))
-        # Class slots
-        for s in c.getSlots():
-            if s.isInverse():
-                raise ValueError, "Inverse slot property not supported"
-            #TODO: Handle repeated slot property with different types (for now, just assume closure)
-            opstr.write(owl_class_slot_type%(s.getUriXml(), s.getValTypeXml()))
-            min = s.getMinCardinality()
-            max = s.getMaxCardinality()
-            if min == max:
-                opstr.write(owl_class_slot_exactly%(s.getUriXml(), min))
-            elif min != 0:
-                opstr.write(owl_class_slot_min%(s.getUriXml(), min))
-            elif max != sys.maxint:
-                opstr.write(owl_class_slot_max%(s.getUriXml(), max))
-        # Class close
-        opstr.write(owl_class_close)
-    # Deal with enumerated indivudual values
-    for c in [cc for cc in vocab.getClasses() if cc.isNew()]:
-        #TODO: create function to construct a URI with reference to prefixes; e.g. vocab.mkUri("rdf:type")
-        vals = []
-        for a in [aa for aa in c.getAttrs() 
-                            if aa.isInverse() and 
-                               aa.getQName() == "rdf:type"]:
-            vals.append(a.getValueXml())
-        if vals != []:
-            opstr.write(owl_class_enumeration_open%(c.getUriXml()))
+        # Process class descriptions
+        for (c, attrs) in self._classes:
+            # Class open
+            opstr.write(render.owl_class_open(c.getUriXml()))
+            # Class label
+            if c.getLabel() != "":
+                opstr.write(render.owl_class_label(c.getLabel()))
+            # Class description
+            if c.getDescription() != "":
+                opstr.write(render.owl_class_description(c.getDescription()))
+            # Non-inverse class attributes
+            for a in attrs:
+                if a.isUriValue():
+                    opstr.write(render.owl_class_attribute(a.getQName(), a.getValueXml()))
+                else:
+                    opstr.write(render.owl_class_attr_lit(a.getQName(), a.getValueXml(), a.getQName()))
+            # Class slots
+            for s in c.getSlots():
+                if s.isInverse():
+                    raise ValueError, "Inverse slot property not supported"
+                #TODO: Handle repeated slot property with different types (for now, just assume closure)
+                opstr.write(render.owl_class_slot_type(s.getUriXml(), s.getValTypeXml()))
+                min = s.getMinCardinality()
+                max = s.getMaxCardinality()
+                if min == max:
+                    opstr.write(render.owl_class_slot_exactly(s.getUriXml(), min))
+                elif min != 0:
+                    opstr.write(render.owl_class_slot_min(s.getUriXml(), min))
+                elif max != sys.maxint:
+                    opstr.write(render.owl_class_slot_max(s.getUriXml(), max))
+            # Class close
+            opstr.write(render.owl_class_close())
+        # Deal with enumerated indivudual values
+        for (c, vals) in self._enums:
+            opstr.write(render.owl_class_enumeration_open(c.getUriXml()))
             for v in vals:
-                opstr.write(owl_class_enumeration_value%(v))
-            opstr.write(owl_class_enumeration_close)
-    # Deal with enumerated subclass values
-    for c in [cc for cc in vocab.getClasses() if cc.isNew()]:
-        #TODO: create function to construct a URI with reference to prefixes; e.g. vocab.mkUri("rdf:type")
-        vals = []
-        for a in [aa for aa in c.getAttrs() 
-                            if aa.isInverse() and 
-                               aa.getQName() == "rdfs:subClassOf"]:
-            vals.append(a.getValueXml())
-        if vals != []:
-            opstr.write(owl_class_union_open%(c.getUriXml()))
+                opstr.write(render.owl_class_enumeration_value(v))
+            opstr.write(render.owl_class_enumeration_close())
+        # Deal with enumerated subclass values
+        for (c, vals) in self._unions:
+            opstr.write(render.owl_class_union_open(c.getUriXml()))
             for v in vals:
-                opstr.write(owl_class_union_value%(v))
-            opstr.write(owl_class_union_close)
-    # Deal with inverse attribute assertions
-    for c in [cc for cc in vocab.getClasses() if cc.isNew()]:
-        #TODO: create function to construct a URI with reference to prefixes; e.g. vocab.mkUri("rdf:type")
-        for a in [aa for aa in c.getAttrs() 
-                            if aa.isInverse() and 
-                               aa.getUri() != "rdf:type" and 
-                               aa.getUri() != "rdfs:subClassOf"]:
-            opstr.write(owl_assertion_open%(a.getValueXml()))
-            opstr.write(owl_assertion_value%(a.getQName(), c.getUriXml()))
-            opstr.write(owl_assertion_close)
-    # Close <rdf:RDF> element
-    opstr.write(owl_rdfclose)
-    # Write file postamble
-    opstr.write(owl_postamble)
-    return 0
+                opstr.write(render.owl_class_union_value(v))
+            opstr.write(render.owl_class_union_close())
+        # Deal with inverse attribute assertions
+        for (c, a) in self._asserts:
+            opstr.write(render.owl_assertion_open(a.getValueXml()))
+            opstr.write(render.owl_assertion_value(a.getQName(), c.getUriXml()))
+            opstr.write(render.owl_assertion_close())
+        # Close <rdf:RDF> element
+        opstr.write(render.owl_rdfclose())
+        # Write file postamble
+        opstr.write(render.owl_postamble())
+        return
 
-def convertOntologyToMediaWiki(csvreader, opstr, options):
+def convertOntologyToOwl(csvreader, opstr, options):
     """
-    Convert an ontology from the supplied csv reader to mediawiki table format.
+    Convert an ontology from the supplied csv reader to OWL RDF/XML format.
     """
+    return convertOntologyWithEmitters(csvreader, [OwlEmitter(opstr, options)])
+
+class MediaWikiEmitter(VocabEmitter):
+    """
+    Write vocabulary in mediawiki table format.
+    """
+    template_prefix = "wiki_"
     wiki_preamble = (
         """== Vocabulary summary ==\n"""
         """\n"""
@@ -1069,110 +1970,91 @@ def convertOntologyToMediaWiki(csvreader, opstr, options):
     wiki_postamble = (
         """|}\n\n"""
         )
-    wiki_class = (
-        """=== Class %s ===\n"""
-        """\n%s\n\n"""
-        )
-    wiki_property = (
-        """=== Property %s ===\n"""
-        """\n%s\n\n"""
-        )
 
-    # Parse vocabulary details from CSV
-    try:
-        vocab = readVocabulary(csvreader)
-    except csv.Error, e:
-        sys.stderr.write("input line %d: %s" % (csvreader.line_num, e))
-        return 1
-    # Process vocabulary
-    opstr.write(wiki_preamble)
-    for item in vocab.getSequence():
-        if item == None:
-            opstr.write(wiki_blank)
-        elif isinstance(item, VocabHeadings):
-            opstr.write(wiki_heading%tuple(item.getHeadings()[1:6]))
-        elif isinstance(item, VocabPrefix):
-            #TODO: include label, descr, comment?
-            opstr.write(wiki_prefix%(item.getPrefix(),item.getUri()))
-        elif isinstance(item, VocabClass):
-            # Class
-            classvals = (item.getQNameOrUri(),"","",item.getLabel(),item.getDescription())
-            if item.isNew():
-                opstr.write(wiki_newentry%classvals)
+    def writeStart(self):
+        self._opstr.write(self._render.wiki_preamble())
+
+    def writeHeadings(self, item):
+        self._opstr.write(self._render.wiki_heading(*item.getHeadings()[1:6]))
+
+    def writePrefix(self, item):
+        #TODO: include label, descr, comment?
+        self._opstr.write(self._render.wiki_prefix(item.getPrefix(),item.getUri()))
+
+    def writeBlank(self):
+        self._opstr.write(self._render.wiki_blank())
+
+    def writeClass(self, item):
+        opstr  = self._opstr
+        render = self._render
+        # Class
+        classvals = (item.getQNameOrUri(),"","",item.getLabel(),item.getDescription())
+        if item.isNew():
+            opstr.write(render.wiki_newentry(*classvals))
+        else:
+            opstr.write(render.wiki_oldentry(*classvals))
+        comment   = item.getComment()
+        if comment:
+            opstr.write(render.wiki_comment("\n\n".join(comment)))
+        # Attributes
+        for attr in item.getAttrs():
+            prop = attr.getQName()
+            if attr.isInverse(): prop = "^ "+prop
+            attrvals = ("", prop, attr.getValueOrUri(), attr.getLabel(), attr.getDescription())
+            if attr.isNew():
+                opstr.write(render.wiki_newentry(*attrvals))
             else:
-                opstr.write(wiki_oldentry%classvals)
-            comment   = item.getComment()
+                opstr.write(render.wiki_oldentry(*attrvals))
+            comment   = attr.getComment()
             if comment:
-                opstr.write(wiki_comment%("\n\n".join(comment)))
-            # Attributes
-            for attr in item.getAttrs():
-                prop = attr.getQName()
-                if attr.isInverse(): prop = "^ "+prop
-                attrvals = ("", prop, attr.getValueOrUri(), attr.getLabel(), attr.getDescription())
-                if attr.isNew():
-                    opstr.write(wiki_newentry%attrvals)
+                opstr.write(render.wiki_comment("\n\n".join(comment)))
+        # Slots
+        for slot in item.getSlots():
+            prop = slot.getQName()
+            if slot.isInverse(): prop = "^ "+prop
+            if slot.getMinCardinality() == 0:
+                if slot.getMaxCardinality() == 1:
+                    flag = '?'
                 else:
-                    opstr.write(wiki_oldentry%attrvals)
-                comment   = attr.getComment()
-                if comment:
-                    opstr.write(wiki_comment%("\n\n".join(comment)))
-            # Slots
-            for slot in item.getSlots():
-                prop = slot.getQName()
-                if slot.isInverse(): prop = "^ "+prop
-                if slot.getMinCardinality() == 0:
-                    if slot.getMaxCardinality() == 1:
-                        flag = '?'
-                    else:
-                        flag = '*'
+                    flag = '*'
+            else:
+                if slot.getMaxCardinality() == 1:
+                    flag = '1'
                 else:
-                    if slot.getMaxCardinality() == 1:
-                        flag = '1'
-                    else:
-                        flag = '+'
-                styp = flag + " :: " + slot.getValTypeQName()
-                slotvals = ("", prop, styp, slot.getLabel(), slot.getDescription())
-                if slot.isNew():
-                    opstr.write(wiki_newentry%slotvals)
+                    flag = '+'
+            styp = flag + " :: " + slot.getValTypeQName()
+            slotvals = ("", prop, styp, slot.getLabel(), slot.getDescription())
+            if slot.isNew():
+                opstr.write(render.wiki_newentry(*slotvals))
+            else:
+                opstr.write(render.wiki_oldentry(*slotvals))
+            for asrt in slot.getAssertions(): 
+                prop = asrt.getQName()
+                if prop == "rdfs:subPropertyOf":
+                    prop = "<="
+                asrtvals = ("", "", prop+" "+asrt.getValueOrUri(), asrt.getLabel(), asrt.getDescription())
+                if asrt.isNew():
+                    opstr.write(render.wiki_newentry(*asrtvals))
                 else:
-                    opstr.write(wiki_oldentry%slotvals)
-                for asrt in slot.getAssertions(): 
-                    prop = asrt.getQName()
-                    if prop == "rdfs:subPropertyOf":
-                        prop = "<="
-                    asrtvals = ("", "", prop+" "+asrt.getValueOrUri(), asrt.getLabel(), asrt.getDescription())
-                    if asrt.isNew():
-                        opstr.write(wiki_newentry%asrtvals)
-                    else:
-                        opstr.write(wiki_oldentry%asrtvals)
-                comment   = slot.getComment()
-                if comment:
-                    opstr.write(wiki_comment%("\n\n".join(comment)))
-        else:
-            assert False, "Unexpected value: "+str(item)
-    opstr.write(wiki_postamble)
-    # Second pass to pick out class comments:
-    if False:
-        for item in vocab.getSequence():
-            if isinstance(item, VocabClass):
-                comment   = item.getComment()
-                if comment:
-                    opstr.write(wiki_class%(item.getUri(), "\n\n".join(comment)))
-    # Third pass to pick out slot property comments:
-    if False:
-        for item in vocab.getSequence():
-            if isinstance(item, VocabClass):
-                for slot in item.getSlots():
-                    comment   = slot.getComment()
-                    if comment:
-                        opstr.write(wiki_property%(slot.getUri(), "\n\n".join(comment)))
-    return 0
+                    opstr.write(render.wiki_oldentry(*asrtvals))
+            comment   = slot.getComment()
+            if comment:
+                opstr.write(render.wiki_comment("\n\n".join(comment)))
 
+    def writeEnd(self):
+        self._opstr.write(self._render.wiki_postamble())
 
-def convertOntologyToBasecamp(csvreader, opstr, options):
+def convertOntologyToMediaWiki(csvreader, opstr, options):
     """
-    Convert an ontology from the supplied csv reader to Basecamp table format.
+    Convert an ontology from the supplied csv reader to mediawiki table format.
     """
+    return convertOntologyWithEmitters(csvreader, [MediaWikiEmitter(opstr, options)])
+
+class BasecampEmitter(VocabEmitter):
+    """
+    Write vocabulary in Basecamp table format.
+    """
+    template_prefix = "basecamp_"
     basecamp_preamble = (
         """<h2>Vocabulary summary</h2>\n"""
         """\n"""
@@ -1237,16 +2119,8 @@ def convertOntologyToBasecamp(csvreader, opstr, options):
     basecamp_postamble = (
         """</table>\n\n"""
         )
-    basecamp_class = (
-        """h3. Class %s\n"""
-        """\n%s\n\n"""
-        )
-    basecamp_property = (
-        """h3. Property %s\n"""
-        """\n%s\n\n"""
-        )
 
-    def writeAssertion(attr, attrvals):
+    def writeAssertion(self, attr, attrvals):
         """
         Helper function to write an assertion entry, selecting an appropriate format string
         
@@ -1254,107 +2128,367 @@ def convertOntologyToBasecamp(csvreader, opstr, options):
         """
         if attr.isFullUriValue():
             if attr.isNew():
-                opstr.write(basecamp_newentry_long%tuple(attrvals))
+                self._opstr.write(self._render.basecamp_newentry_long(*attrvals))
             else:
-                opstr.write(basecamp_oldentry_long%tuple(attrvals))
+                self._opstr.write(self._render.basecamp_oldentry_long(*attrvals))
         else:
             if attr.isNew():
-                opstr.write(basecamp_newentry%tuple(attrvals))
+                self._opstr.write(self._render.basecamp_newentry(*attrvals))
             else:
-                opstr.write(basecamp_oldentry%tuple(attrvals))
+                self._opstr.write(self._render.basecamp_oldentry(*attrvals))
         return
 
-    # Parse vocabulary details from CSV
-    try:
-        vocab = readVocabulary(csvreader)
-    except csv.Error, e:
-        sys.stderr.write("input line %d: %s" % (csvreader.line_num, e))
-        return 1
-    # Process vocabulary
-    opstr.write(basecamp_preamble)
-    for item in vocab.getSequence():
-        if item == None:
-            opstr.write(basecamp_blank)
-        elif isinstance(item, VocabHeadings):
-            headings = [ h or "&nbsp;" for h in item.getHeadings()[1:6] ]
-            opstr.write(basecamp_heading%tuple(headings))
-        elif isinstance(item, VocabPrefix):
-            #TODO: include label, descr, comment?
-            opstr.write(basecamp_prefix%(item.getPrefix(),item.getUri()))
-        elif isinstance(item, VocabClass):
-            # Class
-            classvals = (item.getEscapedQNameOrUri(),item.getLabel(),item.getDescription())
-            if item.isNew():
-                opstr.write(basecamp_newclass%tuple(classvals))
-            else:
-                opstr.write(basecamp_oldclass%tuple(classvals))
-            comment   = item.getComment()
+    def writeStart(self):
+        self._opstr.write(self._render.basecamp_preamble())
+
+    def writeHeadings(self, item):
+        headings = [ h or "&nbsp;" for h in item.getHeadings()[1:6] ]
+        self._opstr.write(self._render.basecamp_heading(*headings))
+
+    def writePrefix(self, item):
+        #TODO: include label, descr, comment?
+        self._opstr.write(self._render.basecamp_prefix(item.getPrefix(),item.getUri()))
+
+    def writeBlank(self):
+        self._opstr.write(self._render.basecamp_blank())
+
+    def writeClass(self, item):
+        opstr  = self._opstr
+        render = self._render
+        # Class
+        classvals = (item.getEscapedQNameOrUri(),item.getLabel(),item.getDescription())
+        if item.isNew():
+            opstr.write(render.basecamp_newclass(*classvals))
+        else:
+            opstr.write(render.basecamp_oldclass(*classvals))
+        comment   = item.getComment()
+        if comment:
+            opstr.write(render.basecamp_comment("<br/><br/>".join(comment)))
+        # Attributes
+        for attr in item.getAttrs():
+            prop = attr.getQName()
+            if attr.isInverse(): prop = "&#94; "+prop
+            attrvals = ("", prop, attr.getEscapedValueQNameOrUri(), attr.getLabel(), attr.getDescription())
+            self.writeAssertion(attr, attrvals)
+            ###if attr.isNew():
+            ###    opstr.write(render.basecamp_newentry_long(*attrvals))
+            ###else:
+            ###    opstr.write(render.basecamp_oldentry_long(*attrvals))
+            comment   = attr.getComment()
             if comment:
-                opstr.write(basecamp_comment%("<br/><br/>".join(comment)))
-            # Attributes
-            for attr in item.getAttrs():
-                prop = attr.getQName()
-                if attr.isInverse(): prop = "&#94; "+prop
-                attrvals = ("", prop, attr.getEscapedValueQNameOrUri(), attr.getLabel(), attr.getDescription())
-                writeAssertion(attr, attrvals)
-                ###if attr.isNew():
-                ###    opstr.write(basecamp_newentry_long%tuple(attrvals))
-                ###else:
-                ###    opstr.write(basecamp_oldentry_long%tuple(attrvals))
-                comment   = attr.getComment()
-                if comment:
-                    opstr.write(basecamp_comment%("<br/><br/>".join(comment)))
-            # Slots
-            for slot in item.getSlots():
-                prop = slot.getQName()
-                if slot.isInverse(): prop = "&#94; "+prop
-                if slot.getMinCardinality() == 0:
-                    if slot.getMaxCardinality() == 1:
-                        flag = '?'
-                    else:
-                        flag = '&#42;'
+                opstr.write(render.basecamp_comment("<br/><br/>".join(comment)))
+        # Slots
+        for slot in item.getSlots():
+            prop = slot.getQName()
+            if slot.isInverse(): prop = "&#94; "+prop
+            if slot.getMinCardinality() == 0:
+                if slot.getMaxCardinality() == 1:
+                    flag = '?'
                 else:
-                    if slot.getMaxCardinality() == 1:
-                        flag = '1'
-                    else:
-                        flag = '+'
-                styp = flag + " :: " + slot.getEscapedValTypeQNameOrUri()
-                slotvals = ("", prop, styp, slot.getLabel(), slot.getDescription())
-                if slot.isNew():
-                    opstr.write(basecamp_newentry%tuple(slotvals))
+                    flag = '&#42;'
+            else:
+                if slot.getMaxCardinality() == 1:
+                    flag = '1'
                 else:
-                    opstr.write(basecamp_oldentry%tuple(slotvals))
-                for asrt in slot.getAssertions(): 
-                    prop = asrt.getQName()
-                    if prop == "rdfs:subPropertyOf":
-                        prop = "<="
-                    asrtvals = ("", "", prop+" "+asrt.getEscapedValueQNameOrUri(), asrt.getLabel(), asrt.getDescription())
-                    writeAssertion(asrt, asrtvals)
-                    ###if asrt.isNew():
-                    ###    opstr.write(basecamp_newentry%tuple(asrtvals))
-                    ###else:
-                    ###    opstr.write(basecamp_oldentry%tuple(asrtvals))
-                comment   = slot.getComment()
-                if comment:
-                    opstr.write(basecamp_comment%("<br/><br/>".join(comment)))
-        else:
-            assert False, "Unexpected value: "+str(item)
-    opstr.write(basecamp_postamble)
-    # Second pass to pick out class comments:
-    if False:
-        for item in vocab.getSequence():
-            if isinstance(item, VocabClass):
-                comment   = item.getComment()
-                if comment:
-                    opstr.write(basecamp_class%(item.getUri(), "\n\n".join(comment)))
-    # Third pass to pick out slot property comments:
-    if False:
-        for item in vocab.getSequence():
-            if isinstance(item, VocabClass):
-                for slot in item.getSlots():
-                    comment   = slot.getComment()
-                    if comment:
-                        opstr.write(basecamp_property%(slot.getUri(), "\n\n".join(comment)))
+                    flag = '+'
+            styp = flag + " :: " + slot.getEscapedValTypeQNameOrUri()
+            slotvals = ("", prop, styp, slot.getLabel(), slot.getDescription())
+            if slot.isNew():
+                opstr.write(render.basecamp_newentry(*slotvals))
+            else:
+                opstr.write(render.basecamp_oldentry(*slotvals))
+            for asrt in slot.getAssertions(): 
+                prop = asrt.getQName()
+                if prop == "rdfs:subPropertyOf":
+                    prop = "<="
+                asrtvals = ("", "", prop+" "+asrt.getEscapedValueQNameOrUri(), asrt.getLabel(), asrt.getDescription())
+                self.writeAssertion(asrt, asrtvals)
+                ###if asrt.isNew():
+                ###    opstr.write(render.basecamp_newentry(*asrtvals))
+                ###else:
+                ###    opstr.write(render.basecamp_oldentry(*asrtvals))
+            comment   = slot.getComment()
+            if comment:
+                opstr.write(render.basecamp_comment("<br/><br/>".join(comment)))
+
+    def writeEnd(self):
+        self._opstr.write(self._render.basecamp_postamble())
+
+def convertOntologyToBasecamp(csvreader, opstr, options):
+    """
+    Convert an ontology from the supplied csv reader to Basecamp table format.
+    """
+    return convertOntologyWithEmitters(csvreader, [BasecampEmitter(opstr, options)])
+
+class TurtleEmitter(VocabEmitter):
+    """
+    Write vocabulary in Turtle (Notation3) format.
+
+    The triples are those written by OwlEmitter (see OwlTriples), but are
+    written as each class is received, with the predicates for each subject 
+    grouped together.  Standard prefixes for the RDF, RDFS, OWL and XML
+    schema namespaces are always declared first, followed by the vocabulary
+    prefixes.  A vocabulary prefix that conflicts with one already declared
+    is skipped, and URIs in its namespace are written in full (see
+    declarePrefix).
+    """
+    template_prefix = "ttl_"
+    ttl_prefix = (
+        """@prefix %s: <%s> .\n"""
+        )
+    ttl_subject = (
+        """\n%s\n    %s"""
+        )
+    ttl_predicate = (
+        """ ;\n    %s"""
+        )
+    ttl_object = (
+        """ , %s"""
+        )
+    ttl_end = (
+        """ .\n"""
+        )
+
+    # Names that can be written as prefix:local
+    ttl_prefix_name = re.compile(r'^(?:[A-Za-z](?:[-\w.]*[-\w])?)?$')
+    ttl_local_name  = re.compile(r'^[A-Za-z0-9_](?:[-\w.]*[-\w])?$')
+
+    def __init__(self, opstr, options):
+        super(TurtleEmitter,self).__init__(opstr, options)
+        self._prefixes  = {}        # Namespace URI for each declared prefix
+        self._subject   = None      # Subject of unterminated statement
+        self._predicate = None      # Last predicate of unterminated statement
+        self._uritext   = {}        # Text written for each URI term
+
+    def writeStart(self):
+        for (prefix, ns) in STANDARD_PREFIXES:
+            self.declarePrefix(prefix, ns)
+        for (subj, pos) in ontologyStatements():
+            self.writeStatements(subj, pos)
+
+    def writePrefix(self, item):
+        self.declarePrefix(item.getPrefix(), item.getUri())
+
+    def writeClass(self, item):
+        for (subj, pos) in classStatements(item):
+            self.writeStatements(subj, pos)
+
+    def writeEnd(self):
+        self.endStatement()
+
+    def declarePrefix(self, prefix, ns):
+        """
+        Write a @prefix declaration, unless the prefix has already been 
+        declared or cannot be used in Turtle.  Qnames are written only for
+        URIs that they denote, so URIs using a prefix that is redeclared in
+        the vocabulary are written in full.
+        """
+        if prefix in self._prefixes or not self.ttl_prefix_name.match(prefix):
+            return
+        if self._subject != None:
+            self.endStatement()
+            self._opstr.write("\n")
+        self._prefixes[prefix] = ns
+        self._opstr.write(self._render.ttl_prefix(prefix, escapeIri(ns)))
+
+    def endStatement(self):
+        if self._subject != None:
+            self._opstr.write(self._render.ttl_end())
+            self._subject = None
+
+    def writeStatements(self, subj, pos):
+        """
+        Write (predicate, object) pairs for a subject, continuing the 
+        previous statement if it has the same subject.
+        """
+        out = []
+        if subj != self._subject:
+            self.endStatement()
+            (p, o) = pos[0]
+            out.append(self._render.ttl_subject(self.formatTerm(subj), self.formatPredicateObject(p, o, "    ")))
+            self._subject   = subj
+            self._predicate = p
+            pos = pos[1:]
+        for (p, o) in pos:
+            if p == self._predicate:
+                out.append(self._render.ttl_object(self.formatTerm(o, "    ")))
+            else:
+                out.append(self._render.ttl_predicate(self.formatPredicateObject(p, o, "    ")))
+                self._predicate = p
+        self._opstr.write("".join(out))
+
+    def formatPredicateObject(self, p, o, indent):
+        return self.formatPredicate(p)+" "+self.formatTerm(o, indent)
+
+    def formatPredicate(self, p):
+        if p == RDF_TYPE:
+            return "a"
+        return self.formatTerm(p)
+
+    def formatTerm(self, term, indent=""):
+        """
+        Return Turtle text for a term (see OwlTriples).  'indent' is the 
+        indentation of the line on which the term appears.
+        """
+        kind = term[0]
+        if kind == TERM_URI:
+            text = self._uritext.get(term, None)
+            if text == None:
+                text = self.formatUri(term)
+                self._uritext[term] = text
+            return text
+        if kind == TERM_LITERAL:
+            (kind, text, datatype) = term
+            if datatype:
+                return '"%s"^^%s'%(escapeLiteral(text), self.formatTerm(datatype))
+            return '"%s"'%(escapeLiteral(text))
+        if kind == TERM_BNODE:
+            inner = indent+"    "
+            pos   = [ inner+self.formatPredicateObject(p, o, inner) for (p, o) in term[1] ]
+            return "[\n"+" ;\n".join(pos)+"\n"+indent+"]"
+        if kind == TERM_LIST:
+            return "( "+" ".join([ self.formatTerm(t, indent) for t in term[1] ])+" )"
+        assert False, "Unexpected term: "+repr(term)
+
+    def formatUri(self, term):
+        (kind, uri, qname) = term
+        if qname:
+            (prefix, sep, local) = qname.partition(":")
+            ns = self._prefixes.get(prefix, None)
+            if ns != None and ns+local == uri and self.ttl_local_name.match(local):
+                return qname
+        return "<%s>"%(escapeIri(uri))
+
+def convertOntologyToTurtle(csvreader, opstr, options):
+    """
+    Convert an ontology from the supplied csv reader to Turtle format.
+    """
+    return convertOntologyWithEmitters(csvreader, [TurtleEmitter(opstr, options)])
+
+class NTriplesEmitter(VocabEmitter):
+    """
+    Write vocabulary in N-Triples format, for bulk loading.
+
+    The triples are those written by OwlEmitter (see OwlTriples), written 
+    one per line with full URIs as each class is received.  Blank nodes
+    are used for restrictions and the nodes of enumeration lists; their
+    triples are written together, immediately before the triple that 
+    refers to them.  N-Triples has no relative URI references, so 
+    options.base_uri must be set to an absolute URI against which those of
+    the vocabulary (including the empty reference used for the ontology 
+    itself) are resolved;  a ValueError is raised for a URI that is still
+    relative.
+    """
+    template_prefix = "nt_"
+    nt_triple = (
+        """%s %s %s .\n"""
+        )
+    nt_bnode = (
+        """_:b%d"""
+        )
+
+    def __init__(self, opstr, options):
+        super(NTriplesEmitter,self).__init__(opstr, options)
+        self._base    = getattr(options, "base_uri", "")
+        if self._base:
+            import urlparse
+            self._urljoin = urlparse.urljoin
+        self._bnodes  = 0           # Number of blank nodes allocated
+        self._uritext = {}          # Text written for each URI term
+
+    def writeStart(self):
+        self.writeStatements(ontologyStatements())
+
+    def writeClass(self, item):
+        self.writeStatements(classStatements(item))
+
+    def writeStatements(self, sts):
+        out = []
+        for (subj, pos) in sts:
+            s = self.formatTerm(subj, out)
+            for (p, o) in pos:
+                out.append(self._render.nt_triple(s, self.formatTerm(p, out), self.formatTerm(o, out)))
+        self._opstr.write("".join(out))
+
+    def newBlankNode(self):
+        self._bnodes += 1
+        return self._render.nt_bnode(self._bnodes)
+
+    def formatTerm(self, term, out):
+        """
+        Return N-Triples text for a term (see OwlTriples).  Triples describing 
+        a blank node or list term are added to the list 'out'.
+        """
+        kind = term[0]
+        if kind == TERM_URI:
+            text = self._uritext.get(term, None)
+            if text == None:
+                uri = term[1]
+                if self._base:
+                    uri = self._urljoin(self._base, uri)
+                if not isAbsoluteIri(uri):
+                    raise ValueError, "Relative URI <%s> in N-Triples output; use --base"%(uri)
+                text = "<%s>"%(escapeIri(uri))
+                self._uritext[term] = text
+            return text
+        if kind == TERM_LITERAL:
+            (kind, text, datatype) = term
+            if datatype:
+                return '"%s"^^%s'%(escapeLiteral(text), self.formatTerm(datatype, out))
+            return '"%s"'%(escapeLiteral(text))
+        if kind == TERM_BNODE:
+            b = self.newBlankNode()
+            for (p, o) in term[1]:
+                out.append(self._render.nt_triple(b, self.formatTerm(p, out), self.formatTerm(o, out)))
+            return b
+        if kind == TERM_LIST:
+            rest = self.formatTerm(RDF_NIL, out)
+            for t in reversed(term[1]):
+                b = self.newBlankNode()
+                out.append(self._render.nt_triple(b, self.formatTerm(RDF_FIRST, out), self.formatTerm(t, out)))
+                out.append(self._render.nt_triple(b, self.formatTerm(RDF_REST, out), rest))
+                rest = b
+            return rest
+        assert False, "Unexpected term: "+repr(term)
+
+def convertOntologyToNTriples(csvreader, opstr, options):
+    """
+    Convert an ontology from the supplied csv reader to N-Triples format.
+    """
+    return convertOntologyWithEmitters(csvreader, [NTriplesEmitter(opstr, options)])
+
+# Emitter classes for each output format, keyed by the name used for
+# the format's command line option
+EMITTERS = {
+    "rdf":       OwlEmitter,
+    "mediawiki": MediaWikiEmitter,
+    "basecamp":  BasecampEmitter,
+    "n3":        TurtleEmitter,
+    "nt":        NTriplesEmitter,
+    }
+
+# Output format names, in the order that single-format options are checked
+FORMATS = ["mediawiki", "basecamp", "rdf", "n3", "nt"]
+
+def getTemplateNames():
+    """
+    Return the names of all templates that can be replaced by a template file.
+    """
+    names = []
+    for fmt in FORMATS:
+        names.extend(EMITTERS[fmt].getDefaultTemplates().getNames())
+    return names
+
+def showTemplates(opstr, options):
+    """
+    Write the templates used for the selected output formats (or for all
+    formats, if none is selected) to the supplied stream, in the format
+    read by --templates, as a starting point for a new house style.
+    """
+    formats = [ fmt for (fmt, filename) in getOutputFormats(options) ] or FORMATS
+    overrides = getattr(options, "templates", None) or []
+    for fmt in formats:
+        writeTemplates(EMITTERS[fmt].getDefaultTemplates().override(overrides).getTemplates(), opstr)
     return 0
 
 def getOptions(prog, argv):
@@ -1366,12 +2500,13 @@ def getOptions(prog, argv):
     
     Returns a triple (input_stream,output_stream,options).
     """
+    import optparse
 
     # Get command line arguments
     parser = optparse.OptionParser(
                 usage="%prog [options] [input]\n\n"\
                       "where 'input' is an optional input file name (defaults to stdin)",
-                version="%prog $Rev: 1024 $")
+                version="%prog "+VERSION)
     # Main program options
     parser.add_option("-m", "--mediawiki", 
                       action="store_true", dest="mediawiki", 
@@ -1389,6 +2524,133 @@ def getOptions(prog, argv):
                       action="store_true", dest="n3", 
                       default=False,
                       help="Generate Notation3 schema output")
+    parser.add_option("--ntriples", 
+                      action="store_true", dest="nt", 
+                      default=False,
+                      help="Generate N-Triples schema output, for bulk loading")
+    parser.add_option("--property-domains",
+                      action="store_true", dest="property_domains", 
+                      default=False,
+                      help="In OWL RDF/XML output, declare the classes with slots using each "\
+                           "property as its domain (or their union)")
+    parser.add_option("--base",
+                      dest="base_uri", 
+                      default="",
+                      metavar="URI",
+                      help="Base URI for resolving relative URI references in N-Triples output "\
+                           "(required for nt)")
+    parser.add_option("-f", "--format",
+                      action="append", dest="formats", 
+                      default=[],
+                      metavar="FORMAT=FILE",
+                      help="Generate output in FORMAT (mediawiki, basecamp, rdf, n3 or nt) to FILE, "\
+                           "or to the output file if FILE is omitted; may be repeated to "\
+                           "generate several formats from one reading of the input")
+    parser.add_option("--cache-dir",
+                      dest="cache_dir", 
+                      default=None,
+                      metavar="DIR",
+                      help="Directory for cached parsed vocabularies; by default no cache "\
+                           "is used, and the input is converted as it is read")
+    parser.add_option("--no-cache",
+                      action="store_true", dest="no_cache", 
+                      default=False,
+                      help="Read the input without using or updating the vocabulary cache")
+    parser.add_option("--clear-cache",
+                      action="store_true", dest="clear_cache", 
+                      default=False,
+                      help="Remove all cached vocabularies before converting; with no "\
+                           "output format selected, just clear the cache")
+    parser.add_option("--batch",
+                      dest="batch_dir", 
+                      default="",
+                      metavar="DIR",
+                      help="Convert every .csv file in the directory tree DIR to the selected "\
+                           "formats, writing each output next to its input, and write a "\
+                           "summary of conversion times to the output file")
+    parser.add_option("--batch-output",
+                      dest="batch_output", 
+                      default="",
+                      metavar="DIR",
+                      help="With --batch, write outputs to the corresponding places in the "\
+                           "directory tree DIR")
+    parser.add_option("-j", "--jobs",
+                      type="int", dest="jobs", 
+                      default=0,
+                      metavar="N",
+                      help="With --batch, convert N files at a time (defaults to the number "\
+                           "of CPUs); for an input file that imports others, parse up to N "\
+                           "of them at a time (default 1)")
+    parser.add_option("--watch",
+                      action="store_true", dest="watch", 
+                      default=False,
+                      help="Keep running, and convert the input file again to the selected "\
+                           "output files each time it changes, reporting the time taken")
+    parser.add_option("--watch-interval",
+                      type="float", dest="watch_interval", 
+                      default=1.0,
+                      metavar="SECONDS",
+                      help="With --watch, check the input file every SECONDS (default %default)")
+    parser.add_option("--validate",
+                      action="store_true", dest="validate", 
+                      default=False,
+                      help="Check that the classes, datatypes and properties referred to by "\
+                           "the input are defined, instead of converting it, and report each "\
+                           "problem found with its line number (see VocabValidator.py)")
+    parser.add_option("--serve",
+                      type="int", dest="serve_port", 
+                      default=None,
+                      metavar="PORT",
+                      help="Run a conversion service on PORT, converting CSV content or files "\
+                           "sent by HTTP requests (see ConvertServer.py and ConvertClient.py)")
+    parser.add_option("--serve-host",
+                      dest="serve_host", 
+                      default="127.0.0.1",
+                      metavar="HOST",
+                      help="With --serve, listen on the interface for HOST (default %default)")
+    parser.add_option("--serve-threads",
+                      type="int", dest="serve_threads", 
+                      default=4,
+                      metavar="N",
+                      help="With --serve, handle N requests at a time (default %default)")
+    parser.add_option("--serve-cache",
+                      type="int", dest="serve_cache", 
+                      default=32,
+                      metavar="N",
+                      help="With --serve, keep up to N parsed vocabularies in memory (default %default)")
+    parser.add_option("--buffer-size",
+                      type="int", dest="buffer_size", 
+                      default=DEFAULT_BUFFER_SIZE,
+                      metavar="BYTES",
+                      help="Size of output buffer (default %default); 0 writes each "\
+                           "output fragment as it is generated")
+    parser.add_option("--templates",
+                      action="append", dest="template_files", 
+                      default=[],
+                      metavar="FILE",
+                      help="Read output templates from FILE, replacing the default templates "\
+                           "with the same names; may be repeated")
+    parser.add_option("--show-templates",
+                      action="store_true", dest="show_templates", 
+                      default=False,
+                      help="Write the templates for the selected output formats (default all) "\
+                           "to the output file, in the format read by --templates")
+    parser.add_option("--mmap",
+                      action="store_true", dest="mmap_input", 
+                      default=False,
+                      help="Read the input file through a memory map; input from a pipe "\
+                           "or terminal is read as a stream")
+    parser.add_option("--stats",
+                      action="store_true", dest="show_stats", 
+                      default=False,
+                      help="Report the wall and CPU time taken by each phase of the "\
+                           "conversion, with row and object counts, to stderr")
+    parser.add_option("--profile",
+                      dest="profile_dir", 
+                      default=None,
+                      metavar="DIR",
+                      help="As --stats, and also write cProfile statistics for each "\
+                           "phase to a file in DIR")
     parser.add_option("-v", "--verbose", 
                       action="store_true", dest="verbose", 
                       default=False,
@@ -1425,8 +2687,109 @@ def getOptions(prog, argv):
     # Parse command line now
     (options, args) = parser.parse_args(argv)
     if len(args) > 2: parser.error("Too many arguments")
+    formats = []
+    for f in options.formats:
+        (fmt, sep, filename) = f.partition("=")
+        if fmt not in FORMATS: parser.error("Unknown output format '%s'"%(fmt))
+        formats.append((fmt, filename))
+    options.formats = formats
+    if options.batch_dir:
+        if [ fmt for (fmt, filename) in formats if filename ]:
+            parser.error("Output file names cannot be given for --batch")
+        if not getOutputFormats(options):
+            parser.error("No output format selected for --batch")
+    if options.jobs < 0:
+        parser.error("Number of jobs must be positive")
+    if options.clear_cache and not options.cache_dir:
+        parser.error("--clear-cache requires --cache-dir")
+    dests = [ filename or options.out_file for (fmt, filename) in getOutputFormats(options) ]
+    if "nt" in [ fmt for (fmt, filename) in getOutputFormats(options) ]:
+        if not isAbsoluteIri(options.base_uri):
+            parser.error("N-Triples output requires an absolute --base URI")
+    if options.serve_port != None:
+        if options.batch_dir or options.watch or len(args) == 2 or options.inp_file:
+            parser.error("--serve cannot be used with --batch, --watch or an input file")
+        if options.serve_threads < 1 or options.serve_cache < 1:
+            parser.error("Number of threads and cached vocabularies must be positive")
+    if options.watch:
+        if options.batch_dir:
+            parser.error("--watch cannot be used with --batch")
+        if not (options.inp_file or len(args) == 2):
+            parser.error("An input file must be given for --watch")
+        if not dests or "" in dests:
+            parser.error("Each output format must be written to a file for --watch")
+        if options.watch_interval <= 0:
+            parser.error("Watch interval must be positive")
+    if options.validate:
+        if options.batch_dir or options.watch or options.serve_port != None:
+            parser.error("--validate cannot be used with --batch, --watch or --serve")
+    if not (dests or options.show_templates or options.serve_port != None or
+            options.validate or options.clear_cache):
+        parser.error("No output format selected (use -r, -m, -b, -n, --ntriples or -f)")
+    if len(dests) != len(set(dests)) and not options.batch_dir:
+        parser.error("Each output format must be written to a different file")
+    options.templates = []
+    for filename in options.template_files:
+        try:
+            options.templates.extend(loadTemplates(filename))
+        except (IOError, ValueError), e:
+            parser.error("Cannot read templates from %s: %s"%(filename, str(e)))
+    names = getTemplateNames()
+    for (name, text) in options.templates:
+        if name not in names: parser.error("Unknown template '%s'"%(name))
+        try:
+            for emitter in EMITTERS.values():
+                emitter.getDefaultTemplates().override([(name, text)])
+        except ValueError, e:
+            parser.error(str(e))
+
+    setupLogging(options)
 
-    # Set up logging
+    # Set up conversion statistics
+    options.stats = None
+    if options.show_stats or options.profile_dir:
+        if options.batch_dir or options.watch or options.serve_port != None:
+            parser.error("--stats and --profile cannot be used with --batch, --watch or --serve")
+        from PhaseStats import PhaseStats
+        options.stats = PhaseStats(options.profile_dir)
+
+    # Set up input and output streams
+    ipstr = sys.stdin
+    if options.batch_dir and len(args) == 2:
+        parser.error("Input file cannot be given for --batch")
+    if len(args) == 2:
+        options.inp_file = args[1]
+    if options.inp_file:
+        try:
+            openinput = open
+            if options.stats:
+                openinput = options.stats.timed("input open", open)
+            ipstr = openinput(options.inp_file,"rb")
+        except IOError, e:
+            sys.stderr.write("Open input file %s failed: %s"%(options.inp_file,str(e)))
+            return (None, None, None)
+    if options.mmap_input:
+        from MappedInput import mapInput
+        ipstr = mapInput(ipstr)
+
+    opstr = sys.stdout
+    if options.out_file and not options.watch:
+        try:
+            opstr = open(options.out_file,"wb")
+        except IOError, e:
+            sys.stderr.write("Open output file %s failed: %s"%(options.inp_file,str(e)))
+            return (None, None, None)
+    ### opstr = EncodedFile(opstr,'...','utf-8')
+
+
+    # return to process
+    return (ipstr,opstr,options)
+
+def setupLogging(options):
+    """
+    Add log handlers to the root logger for the logging options selected
+    on the command line, and enable tracing for debug output.
+    """
     log_level = logging.WARNING
     filelog_level = logging.WARNING
     if options.log_info:
@@ -1441,7 +2804,10 @@ def getOptions(prog, argv):
         logformat = logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s', "%H:%M:%S")
 
     rootlogger = logging.getLogger('')
-    rootlogger.setLevel(logging.DEBUG)  # Then filter in handlers for less.
+    # Records below this level are not created (rather than being filtered
+    # by the handlers), and tracing is enabled only for debug output
+    rootlogger.setLevel(min(log_level, filelog_level))
+    setTracing(options.log_debug)
 
     strhandler = logging.StreamHandler(sys.stdout)
     strhandler.setLevel(log_level)
@@ -1450,42 +2816,45 @@ def getOptions(prog, argv):
     
     if options.log_filename:
         # Enable logging to a file
-        fileloghandler = logging.FileHandler(options.logfilename,"w")
+        fileloghandler = logging.FileHandler(options.log_filename,"w")
         fileloghandler.setLevel(filelog_level)
         fileloghandler.setFormatter(logformat)
         rootlogger.addHandler(fileloghandler)
+    return
 
-    # Set up input and output streams
-    ipstr = sys.stdin
-    if len(args) == 2:
-        options.inp_file = args[1]
-    if options.inp_file:
-        try:
-            ipstr = open(options.inp_file,"rb")
-        except IOError, e:
-            sys.stderr.write("Open input file %s failed: %s"%(options.inp_file,str(e)))
-            return (None, None, None)
-
-    opstr = sys.stdout
-    if options.out_file:
-        try:
-            opstr = open(options.out_file,"wb")
-        except IOError, e:
-            sys.stderr.write("Open output file %s failed: %s"%(options.inp_file,str(e)))
-            return (None, None, None)
-    ### opstr = EncodedFile(opstr,'...','utf-8')
-
-
-    # return to process
-    return (ipstr,opstr,options)
+def main(argv):
+    """
+    Run the program with the supplied command line arguments, and return
+    its exit status.
+    """
+    (ipstr,opstr,options) = getOptions("ConvertOntology", argv)
+    status = 1
+    if ipstr and opstr and options and options.show_templates:
+        status  = showTemplates(opstr,options)
+    elif ipstr and opstr and options and options.batch_dir:
+        from BatchConvert import convertBatch
+        status  = convertBatch(options.batch_dir,opstr,options)
+    elif ipstr and opstr and options and options.serve_port != None:
+        from ConvertServer import serveConvert
+        status  = serveConvert(options)
+    elif ipstr and opstr and options and options.watch:
+        from WatchConvert import watchConvert
+        ipstr.close()
+        status  = watchConvert(options.inp_file,options)
+    elif ipstr and opstr and options and options.validate:
+        from VocabValidator import validateOntology
+        status  = validateOntology(ipstr,opstr,options)
+    elif ipstr and opstr and options:
+        status  = convertOntology(ipstr,opstr,options)
+        if options.stats:
+            options.stats.report(sys.stderr)
+            for f in options.stats.dumpProfiles():
+                sys.stderr.write("Profile written to %s\n"%(f))
+    return status
 
 # Program run from command line
 
 if __name__ == "__main__":
-    (ipstr,opstr,options) = getOptions("ConvertOntology", sys.argv)
-    status = 1
-    if ipstr and opstr and options:
-        status  = convertOntology(ipstr,opstr,options)
-    sys.exit(status)
+    sys.exit(main(sys.argv))
 
 # $Id: ConvertOntology.py 1024 2008-12-17 17:42:56Z graham $, end.
@@ -0,0 +1,263 @@
+# $Id: ConvertServer.py $
+#
+# Local HTTP service for converting vocabularies
+#
+"""
+HTTP service that converts vocabulary CSV files, so that tools which would
+otherwise run the converter once for each conversion can use a single
+long-running process:
+
+  server = ConvertServer(("127.0.0.1", 8642), options, threads=4, cachesize=32)
+  server.serve_forever()
+
+Requests are:
+
+  POST /convert?format=FORMAT             convert the CSV content in the body
+  GET  /convert?format=FORMAT&path=FILE   convert the named local CSV file
+  GET  /status                            report request and cache counts
+
+where FORMAT is one of the output formats accepted by -f (rdf, mediawiki,
+basecamp, n3 or nt).  The response body is the converted vocabulary, and
+the X-Vocab-Cache header is "hit" if the vocabulary was found in the cache
+or "miss" if it was read.  Errors are reported as plain text with status
+400 (bad request or vocabulary), 404 (unknown resource or file), 411
+(no content length) or 500 (any other failure).  ConvertClient.py is
+a command line client.
+
+Conversions are made by a single Converter (see VocabConverter), whose
+cache of parsed vocabularies is keyed by a hash of the CSV content, so
+converting the same content again, in any format, does not read it again.
+A named file may import other vocabulary files (see VocabLoader), which 
+are cached separately;  content posted in a request cannot.
+Requests are handled by a fixed pool of worker threads.
+
+Any file the server can read may be named in a request, so by default it
+listens only on the loopback interface.
+"""
+
+import sys
+import time
+import Queue
+import logging
+import threading
+import urlparse
+import BaseHTTPServer
+
+try:
+    from urlparse import parse_qs
+except ImportError:
+    from cgi import parse_qs
+
+from VocabConverter import Converter, ConversionError, VocabularyError
+from ConvertOntology import EMITTERS
+
+# Content type returned for each output format
+CONTENT_TYPES = {
+    "rdf":       "application/rdf+xml",
+    "mediawiki": "text/plain; charset=utf-8",
+    "basecamp":  "text/plain; charset=utf-8",
+    "n3":        "text/turtle; charset=utf-8",
+    "nt":        "text/plain; charset=utf-8",
+    }
+
+class ConvertError(Exception):
+    """
+    Error reported to the client with the indicated HTTP status.
+    """
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+class ThreadPoolMixIn:
+    """
+    Mix-in for a SocketServer server class that handles requests on a fixed
+    pool of worker threads, rather than starting a thread for each request.
+    startWorkers must be called before serving requests, and stopWorkers
+    when finished.
+    """
+    pool_size = 4
+
+    def startWorkers(self):
+        self._requests = Queue.Queue()
+        self._workers  = []
+        for i in range(self.pool_size):
+            t = threading.Thread(target=self.runWorker)
+            t.setDaemon(True)
+            t.start()
+            self._workers.append(t)
+        return
+
+    def runWorker(self):
+        while True:
+            item = self._requests.get()
+            if item == None: return
+            (request, client_address) = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            self.close_request(request)
+
+    def process_request(self, request, client_address):
+        self._requests.put((request, client_address))
+
+    def stopWorkers(self):
+        for t in self._workers:
+            self._requests.put(None)
+        for t in self._workers:
+            t.join()
+        self._workers = []
+        return
+
+class ConvertServer(ThreadPoolMixIn, BaseHTTPServer.HTTPServer):
+    """
+    HTTP server for vocabulary conversions, using the supplied options
+    (e.g. output templates) for every conversion.
+    """
+    def __init__(self, address, options, threads=4, cachesize=32):
+        BaseHTTPServer.HTTPServer.__init__(self, address, ConvertRequestHandler)
+        self.converter = Converter(templates=getattr(options, "templates", None),
+                                   base_uri=getattr(options, "base_uri", ""),
+                                   cachesize=cachesize)
+        self.cache     = self.converter.getCache()
+        self.pool_size = threads
+        self.requests  = 0
+        self._lock     = threading.Lock()
+        self.startWorkers()
+
+    def countRequest(self):
+        self._lock.acquire()
+        self.requests += 1
+        self._lock.release()
+        return
+
+    def server_close(self):
+        BaseHTTPServer.HTTPServer.server_close(self)
+        self.stopWorkers()
+
+    def convert(self, data, fmt, path=None):
+        """
+        Convert CSV content, or the named CSV file and the files it imports
+        if a path is given, to the indicated format, and return a pair
+        (text, hit), where 'hit' is True if the vocabulary was found in 
+        the cache.
+        """
+        if fmt not in EMITTERS:
+            raise ConvertError(400, "Unknown output format '%s'"%(fmt))
+        try:
+            if path:
+                (vocab, hit) = self.converter.readFile(path)
+            else:
+                (vocab, hit) = self.converter.readCached(data)
+            return (self.converter.convertVocabulary(vocab, fmt), hit)
+        except IOError, e:
+            if e.filename:
+                raise ConvertError(404, "Cannot read %s: %s"%(e.filename, e.strerror))
+            raise ConvertError(404, str(e))
+        except VocabularyError, e:
+            raise ConvertError(400, "Invalid vocabulary: %s"%(str(e)))
+        except ConversionError, e:
+            raise ConvertError(400, str(e))
+
+class ConvertRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Handler for a request to a ConvertServer.
+    """
+    server_version = "ConvertOntology"
+
+    def do_GET(self):
+        self.respond(self.handleGet)
+
+    def do_POST(self):
+        self.respond(self.handlePost)
+
+    def respond(self, handler):
+        """
+        Call handler with the path and query parameters of the request,
+        and report any error it raises to the client.
+        """
+        uri   = urlparse.urlparse(self.path)
+        query = dict([ (k, v[-1]) for (k, v) in parse_qs(uri[4]).items() ])
+        self.server.countRequest()
+        try:
+            handler(uri[2], query)
+        except ConvertError, e:
+            self.sendText(e.status, str(e)+"\n")
+        except Exception, e:
+            log = logging.getLogger("ConvertOntology.ConvertServer")
+            log.exception("Request %s failed", self.path)
+            self.sendText(500, "Conversion failed: %s: %s\n"%(e.__class__.__name__, str(e)))
+        return
+
+    def handleGet(self, path, query):
+        if path == "/status":
+            self.sendStatus()
+        elif path == "/convert":
+            if not query.get("path"):
+                raise ConvertError(400, "No file path given")
+            self.sendConversion(None, query, query["path"])
+        else:
+            raise ConvertError(404, "Unknown resource %s"%(path))
+        return
+
+    def handlePost(self, path, query):
+        if path != "/convert":
+            raise ConvertError(404, "Unknown resource %s"%(path))
+        length = self.headers.getheader("content-length")
+        if length == None:
+            raise ConvertError(411, "No content length given")
+        self.sendConversion(self.rfile.read(int(length)), query)
+        return
+
+    def sendConversion(self, data, query, path=None):
+        fmt = query.get("format", "")
+        t0  = time.time()
+        (text, hit) = self.server.convert(data, fmt, path)
+        log = logging.getLogger("ConvertOntology.ConvertServer")
+        log.info("%s %s to %s in %.3fs (cache %s)",
+                 self.path, path or "%d bytes"%(len(data)), fmt, time.time()-t0, hit and "hit" or "miss")
+        self.sendText(200, text, CONTENT_TYPES[fmt], [("X-Vocab-Cache", hit and "hit" or "miss")])
+        return
+
+    def sendStatus(self):
+        cache  = self.server.cache
+        counts = (0, 0, 0)          # No cache if the server's cache size is 0
+        if cache:
+            counts = (cache.getCount(), cache.hits, cache.misses)
+        self.sendText(200, "requests %d\ncached %d\nhits %d\nmisses %d\n"%
+                      ((self.server.requests,)+counts))
+        return
+
+    def sendText(self, status, text, ctype="text/plain; charset=utf-8", headers=[]):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(text)))
+        for (name, value) in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(text)
+        return
+
+    def log_message(self, format, *args):
+        log = logging.getLogger("ConvertOntology.ConvertServer")
+        log.debug("%s "+format, self.address_string(), *args)
+
+def serveConvert(options):
+    """
+    Run a conversion service as selected by the supplied command line
+    options, until interrupted.
+    """
+    server = ConvertServer((options.serve_host, options.serve_port), options,
+                           threads=options.serve_threads, cachesize=options.serve_cache)
+    sys.stderr.write("Serving conversions at http://%s:%d/ (interrupt to stop)\n"%
+                     server.server_address)
+    try:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    finally:
+        server.server_close()
+    return 0
+
+# End.
@@ -0,0 +1,73 @@
+# $Id: MappedInput.py $
+#
+# Memory-mapped input stream for CSV files
+#
+"""
+Input stream that reads a file through a read-only memory map, so that
+the CSV reader takes its lines straight from the mapped pages (which the
+operating system reads ahead) rather than through a file object buffer:
+
+  ipstr  = mapInput(open(filename, "rb"))
+  reader = csv.reader(ipstr)
+
+Only regular, non-empty files can be mapped.  For anything else (a pipe,
+a terminal, an empty file) or if the map cannot be created, mapInput
+returns the stream it was given, so callers can use it unconditionally.
+"""
+
+import os
+import stat
+import mmap
+
+class MappedInput(object):
+    """
+    Read-only stream for the contents of a file, from its current
+    position, through a memory map.
+    """
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._map  = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map.seek(fileobj.tell())
+        self.name  = getattr(fileobj, "name", "<mapped>")
+
+    def __iter__(self):
+        return iter(self._map.readline, "")
+
+    def readline(self):
+        return self._map.readline()
+
+    def read(self, size=-1):
+        if size < 0:
+            size = len(self._map) - self._map.tell()
+        return self._map.read(size)
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def isMappable(fileobj):
+    """
+    True if the supplied stream is a regular file with some content.
+    """
+    try:
+        st = os.fstat(fileobj.fileno())
+    except (AttributeError, ValueError, EnvironmentError):
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0
+
+def mapInput(fileobj):
+    """
+    Return a MappedInput for the supplied file, or the file itself if it
+    cannot be mapped.
+    """
+    if not isMappable(fileobj):
+        return fileobj
+    try:
+        return MappedInput(fileobj)
+    except (EnvironmentError, ValueError):
+        return fileobj
+
+# End.
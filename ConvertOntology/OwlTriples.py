@@ -0,0 +1,234 @@
+# $Id: OwlTriples.py $
+#
+# RDF triples for the OWL description of a vocabulary
+#
+"""
+Describes the OWL schema for a vocabulary class as RDF statements, for use
+by the triple-oriented output formats (Turtle, N-Triples).  The statements
+are the same as those encoded in RDF/XML by the OWL emitter in
+ConvertOntology.py, but are produced a class at a time so that output can
+be written as the vocabulary is read.
+
+classStatements(vclass) returns a list of (subject, [(predicate, object), ...])
+pairs, where each subject, predicate and object is a term tuple:
+
+  (TERM_URI,     uri, qname)     qname is "prefix:local", or None
+  (TERM_LITERAL, text, datatype) datatype is a TERM_URI term, or None
+  (TERM_BNODE,   [(predicate, object), ...])
+  (TERM_LIST,    [term, ...])
+
+Model values are accessed only through their methods, so classes from any
+copy of the ConvertOntology module may be used.
+"""
+
+import sys
+import re
+
+# Kinds of term
+TERM_URI     = "uri"
+TERM_LITERAL = "literal"
+TERM_BNODE   = "bnode"
+TERM_LIST    = "list"
+
+# Namespaces used by the OWL description
+NS_RDF  = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+NS_RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+NS_OWL  = "http://www.w3.org/2002/07/owl#"
+NS_XSD  = "http://www.w3.org/2001/XMLSchema#"
+
+# Prefixes for the namespaces above, in the order they are declared
+STANDARD_PREFIXES = [
+    ("rdf",  NS_RDF),
+    ("rdfs", NS_RDFS),
+    ("owl",  NS_OWL),
+    ("xsd",  NS_XSD),
+    ]
+
+def uriTerm(uri, qname=None):
+    return (TERM_URI, uri, qname)
+
+def literalTerm(text, datatype=None):
+    return (TERM_LITERAL, text, datatype)
+
+def standardTerm(prefix, ns, local):
+    return uriTerm(ns+local, prefix+":"+local)
+
+RDF_TYPE                = standardTerm("rdf",  NS_RDF,  "type")
+RDF_FIRST               = standardTerm("rdf",  NS_RDF,  "first")
+RDF_REST                = standardTerm("rdf",  NS_RDF,  "rest")
+RDF_NIL                 = standardTerm("rdf",  NS_RDF,  "nil")
+RDFS_LABEL              = standardTerm("rdfs", NS_RDFS, "label")
+RDFS_COMMENT            = standardTerm("rdfs", NS_RDFS, "comment")
+RDFS_SUBCLASSOF         = standardTerm("rdfs", NS_RDFS, "subClassOf")
+OWL_ONTOLOGY            = standardTerm("owl",  NS_OWL,  "Ontology")
+OWL_CLASS               = standardTerm("owl",  NS_OWL,  "Class")
+OWL_OBJECTPROPERTY      = standardTerm("owl",  NS_OWL,  "ObjectProperty")
+OWL_DATATYPEPROPERTY    = standardTerm("owl",  NS_OWL,  "DatatypeProperty")
+OWL_RESTRICTION         = standardTerm("owl",  NS_OWL,  "Restriction")
+OWL_ONPROPERTY          = standardTerm("owl",  NS_OWL,  "onProperty")
+OWL_ALLVALUESFROM       = standardTerm("owl",  NS_OWL,  "allValuesFrom")
+OWL_CARDINALITY         = standardTerm("owl",  NS_OWL,  "cardinality")
+OWL_MINCARDINALITY      = standardTerm("owl",  NS_OWL,  "minCardinality")
+OWL_MAXCARDINALITY      = standardTerm("owl",  NS_OWL,  "maxCardinality")
+OWL_ONEOF               = standardTerm("owl",  NS_OWL,  "oneOf")
+OWL_UNIONOF             = standardTerm("owl",  NS_OWL,  "unionOf")
+XSD_NONNEGATIVEINTEGER  = standardTerm("xsd",  NS_XSD,  "nonNegativeInteger")
+
+def qnameOrNone(qnameOrUri):
+    """
+    Return the qname from a value returned by a getQNameOrUri method, or
+    None if the value is a <uri>.
+    """
+    if qnameOrUri.startswith("<"):
+        return None
+    return qnameOrUri
+
+def elementTerm(elem):
+    """
+    Return a term for the URI of a vocabulary class, slot or attribute.
+    """
+    return uriTerm(elem.getUri(), qnameOrNone(elem.getQNameOrUri()))
+
+def attrValueTerm(attr):
+    """
+    Return a term for the value of a vocabulary attribute.
+    """
+    if attr.isUriValue():
+        return uriTerm(attr.getValueUri(), qnameOrNone(attr.getValueQNameOrUri()))
+    return literalTerm(attr.getValueXml())
+
+def attrSubjectTerm(attr):
+    """
+    Return a term for the value of an inverse attribute, which is the subject
+    of the corresponding statement.  As in the RDF/XML output (rdf:about), a
+    literal value is taken to be a URI reference.
+    """
+    if attr.isUriValue():
+        return attrValueTerm(attr)
+    return uriTerm(attr.getValueXml())
+
+def cardinalityTerm(n):
+    return literalTerm(str(n), XSD_NONNEGATIVEINTEGER)
+
+def restrictionTerm(prop, constraint, value):
+    return (TERM_BNODE,
+        [ (RDF_TYPE,       OWL_RESTRICTION)
+        , (OWL_ONPROPERTY, prop)
+        , (constraint,     value)
+        ])
+
+def isDatatypeSlot(slot):
+    """
+    True if the value type of a slot is a literal or XML schema datatype.
+    """
+    #TODO: use URIs rather than qnames or prefix strings to isolate literal types
+    q = qnameOrNone(slot.getValTypeQNameOrUri())
+    return q != None and (q == "rdfs:Literal" or q.startswith("xsd:"))
+
+def slotStatements(slot):
+    """
+    Return statements declaring the property used by a class slot.
+    """
+    proptype = OWL_OBJECTPROPERTY
+    if isDatatypeSlot(slot):
+        proptype = OWL_DATATYPEPROPERTY
+    pos = [ (RDF_TYPE, proptype) ]
+    if slot.getLabel() != "":
+        pos.append( (RDFS_LABEL, literalTerm(slot.getLabel())) )
+    if slot.getDescription() != "":
+        pos.append( (RDFS_COMMENT, literalTerm(slot.getDescription())) )
+    return (elementTerm(slot), pos)
+
+def ontologyStatements():
+    """
+    Return statements for the ontology header, which describe the output
+    document itself (the empty relative URI).
+    """
+    #TODO: think about how to name ontology
+    return [ (uriTerm(""), [ (RDF_TYPE, OWL_ONTOLOGY) ]) ]
+
+def classStatements(vclass):
+    """
+    Return a list of (subject, [(predicate, object), ...]) statements
+    describing a vocabulary class, or an empty list if the class is not
+    new (i.e. is defined elsewhere).
+    """
+    if not vclass.isNew():
+        return []
+    c   = elementTerm(vclass)
+    sts = []
+    # Slot properties
+    for s in vclass.getSlots():
+        sts.append(slotStatements(s))
+    # Class description
+    pos = [ (RDF_TYPE, OWL_CLASS) ]
+    if vclass.getLabel() != "":
+        pos.append( (RDFS_LABEL, literalTerm(vclass.getLabel())) )
+    if vclass.getDescription() != "":
+        pos.append( (RDFS_COMMENT, literalTerm(vclass.getDescription())) )
+    for a in vclass.getAttrs():
+        if not a.isInverse():
+            pos.append( (elementTerm(a), attrValueTerm(a)) )
+    # Slot restrictions
+    for s in vclass.getSlots():
+        if s.isInverse():
+            raise ValueError, "Inverse slot property not supported"
+        p = elementTerm(s)
+        t = uriTerm(s.getValTypeUri(), qnameOrNone(s.getValTypeQNameOrUri()))
+        pos.append( (RDFS_SUBCLASSOF, restrictionTerm(p, OWL_ALLVALUESFROM, t)) )
+        min = s.getMinCardinality()
+        max = s.getMaxCardinality()
+        if min == max:
+            pos.append( (RDFS_SUBCLASSOF, restrictionTerm(p, OWL_CARDINALITY, cardinalityTerm(min))) )
+        elif min != 0:
+            pos.append( (RDFS_SUBCLASSOF, restrictionTerm(p, OWL_MINCARDINALITY, cardinalityTerm(min))) )
+        elif max != sys.maxint:
+            pos.append( (RDFS_SUBCLASSOF, restrictionTerm(p, OWL_MAXCARDINALITY, cardinalityTerm(max))) )
+    # Enumerated individual values and subclasses
+    inverse = [ a for a in vclass.getAttrs() if a.isInverse() ]
+    vals = [ attrSubjectTerm(a) for a in inverse if qnameOrNone(a.getQNameOrUri()) == "rdf:type" ]
+    if vals != []:
+        pos.append( (OWL_ONEOF, (TERM_LIST, vals)) )
+    vals = [ attrSubjectTerm(a) for a in inverse if qnameOrNone(a.getQNameOrUri()) == "rdfs:subClassOf" ]
+    if vals != []:
+        pos.append( (OWL_UNIONOF, (TERM_LIST, vals)) )
+    sts.append( (c, pos) )
+    # Inverse attribute assertions
+    for a in inverse:
+        sts.append( (attrSubjectTerm(a), [ (elementTerm(a), c) ]) )
+    return sts
+
+# ------------------
+# Formatting helpers
+# ------------------
+
+# Characters that must be escaped in a quoted literal
+LITERAL_ESCAPES = { '\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t' }
+literal_escape  = re.compile(r'[\\"\n\r\t]')
+
+# Characters that cannot appear in a <uri> reference
+iri_escape      = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+# Start of an absolute URI:  its scheme
+iri_scheme      = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+def escapeLiteral(text):
+    """
+    Return literal text escaped for use in a quoted Turtle or N-Triples string.
+    """
+    return literal_escape.sub(lambda m: LITERAL_ESCAPES[m.group(0)], text)
+
+def escapeIri(uri):
+    """
+    Return URI text escaped for use in a Turtle or N-Triples <uri> reference.
+    """
+    return iri_escape.sub(lambda m: "\\u%04X"%(ord(m.group(0))), uri)
+
+def isAbsoluteIri(uri):
+    """
+    True if URI text is an absolute URI, with a scheme, as required for an
+    N-Triples <uri> reference.
+    """
+    return iri_scheme.match(uri) != None
+
+# End.
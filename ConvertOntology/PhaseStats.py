@@ -0,0 +1,207 @@
+# $Id: PhaseStats.py $
+#
+# Per-phase timing and counts for a conversion
+#
+"""
+Accumulates wall-clock and CPU time for the named phases of a conversion
+(reading the input, building the model, each emitter method, and so on),
+together with counts of the rows and objects processed, and writes a
+report of them:
+
+  stats  = PhaseStats()
+  reader = TimedReader(csv.reader(ipstr), stats, "csv tokenizing")
+  func   = stats.timed("model building", func)
+  ...
+  stats.count("rows", reader.line_num)
+  stats.report(sys.stderr)
+
+Phases may be nested, as when a model building step reads a CSV row.
+The time reported for a phase is exclusive of the phases nested in it,
+so the phase times add up to the total time measured.
+
+If a profile directory is given, each phase is also profiled with
+cProfile, and dumpProfiles writes the statistics for each phase to a
+separate file that can be examined with the pstats module.
+"""
+
+import sys
+import os
+import re
+import time
+
+if sys.platform == "win32":
+    def cpuTime():
+        t = os.times()
+        return t[0]+t[1]
+else:
+    # time.clock is process CPU time, with better resolution than os.times
+    cpuTime = time.clock
+
+class PhaseStats(object):
+    """
+    Times and counts for the phases of a conversion.
+    """
+    def __init__(self, profiledir=None):
+        self._profiledir = profiledir
+        self._phases     = {}       # [calls, wall, cpu] for each phase
+        self._order      = []       # Phase names in order first entered
+        self._counts     = {}
+        self._countorder = []
+        self._profiles   = {}       # cProfile.Profile for each phase
+        self._stack      = []       # [name, wall, cpu] for each active phase
+        self._wall       = time.time()
+        self._cpu        = cpuTime()
+
+    def enter(self, name):
+        """
+        Start timing a phase, pausing the current phase if any.
+        """
+        wall = time.time()
+        cpu  = cpuTime()
+        if self._stack:
+            self.accumulate(self._stack[-1], wall, cpu, 0)
+        if name not in self._phases:
+            self._phases[name] = [0, 0.0, 0.0]
+            self._order.append(name)
+        self._stack.append([name, wall, cpu])
+        if self._profiledir != None:
+            self.switchProfile(name)
+        return
+
+    def leave(self):
+        """
+        Stop timing the current phase, resuming the phase it was entered from.
+        """
+        wall  = time.time()
+        cpu   = cpuTime()
+        phase = self._stack.pop()
+        self.accumulate(phase, wall, cpu, 1)
+        if self._stack:
+            self._stack[-1][1:] = [wall, cpu]
+        if self._profiledir != None:
+            self.switchProfile(self._stack and self._stack[-1][0])
+        return
+
+    def accumulate(self, phase, wall, cpu, calls):
+        (name, wall0, cpu0) = phase
+        p = self._phases[name]
+        p[0] += calls
+        p[1] += wall-wall0
+        p[2] += cpu-cpu0
+        phase[1:] = [wall, cpu]
+        return
+
+    def switchProfile(self, name):
+        """
+        Direct profiling to the named phase (or to none if name is None).
+        """
+        import cProfile
+        for p in self._profiles.values():
+            p.disable()
+        if name:
+            if name not in self._profiles:
+                self._profiles[name] = cProfile.Profile()
+            self._profiles[name].enable()
+        return
+
+    def timed(self, name, func):
+        """
+        Return a function that calls func as the named phase.
+        """
+        def call(*args, **kwargs):
+            self.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.leave()
+        return call
+
+    def timedIterator(self, name, iterable):
+        """
+        Return a generator of the values from iterable, where producing
+        each value is timed as the named phase.
+        """
+        next = self.timed(name, iter(iterable).next)
+        while True:
+            try:
+                item = next()
+            except StopIteration:
+                return
+            yield item
+
+    def count(self, name, n=1):
+        if name not in self._counts:
+            self._counts[name] = 0
+            self._countorder.append(name)
+        self._counts[name] += n
+        return
+
+    def getCount(self, name):
+        return self._counts.get(name, 0)
+
+    def getPhase(self, name):
+        """
+        Return (calls, wall, cpu) for the named phase.
+        """
+        return tuple(self._phases.get(name, (0, 0.0, 0.0)))
+
+    def getPhases(self):
+        return list(self._order)
+
+    def report(self, opstr):
+        """
+        Write a report of phase times and counts to the supplied stream.
+        """
+        wall = time.time() - self._wall
+        cpu  = cpuTime() - self._cpu
+        opstr.write("%-32s %9s %10s %10s\n"%("phase", "calls", "wall s", "cpu s"))
+        for name in self._order:
+            (calls, pwall, pcpu) = self._phases[name]
+            opstr.write("%-32s %9d %10.4f %10.4f\n"%(name, calls, pwall, pcpu))
+            wall -= pwall
+            cpu  -= pcpu
+        opstr.write("%-32s %9s %10.4f %10.4f\n"%("other", "", wall, cpu))
+        opstr.write("%-32s %9s %10.4f %10.4f\n"%("total", "",
+                    time.time() - self._wall, cpuTime() - self._cpu))
+        for name in self._countorder:
+            opstr.write("%-32s %9d\n"%(name, self._counts[name]))
+        return
+
+    def dumpProfiles(self):
+        """
+        Write the cProfile statistics for each phase to a file in the profile
+        directory, and return a list of the file names written.
+        """
+        if self._profiledir == None:
+            return []
+        if not os.path.isdir(self._profiledir):
+            os.makedirs(self._profiledir)
+        files = []
+        for name in self._order:
+            if name not in self._profiles: continue
+            self._profiles[name].disable()
+            path = os.path.join(self._profiledir, re.sub(r'\W+', "-", name)+".prof")
+            self._profiles[name].dump_stats(path)
+            files.append(path)
+        return files
+
+class TimedReader(object):
+    """
+    Wrapper for a CSV reader that times reading each row as a phase.
+    """
+    def __init__(self, reader, stats, name):
+        self._reader = reader
+        self._next   = stats.timed(name, reader.next)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        return self._next()
+
+    def getLineNum(self):
+        return self._reader.line_num
+
+    line_num = property(getLineNum)
+
+# End.
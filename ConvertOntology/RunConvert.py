@@ -0,0 +1,28 @@
+# $Id: RunConvert.py $
+#
+# Thin launcher for ConvertOntology.py
+#
+"""
+Runs ConvertOntology with the command line arguments, exactly as running
+ConvertOntology.py itself:
+
+  python RunConvert.py -r vocab.csv >vocab.owl
+
+A file run as a program is compiled every time it is started, while an
+imported module is loaded from its compiled .pyc file when that is up to
+date.  For a small vocabulary, compiling ConvertOntology.py takes about
+as long as the rest of the conversion, so the build scripts use this 
+launcher instead.  The .pyc files are written when the modules are first
+imported;  if the program directory is not writable by its users, create
+them when installing with:
+
+  python -m compileall <program directory>
+"""
+
+import sys
+import ConvertOntology
+
+if __name__ == "__main__":
+    sys.exit(ConvertOntology.main(sys.argv))
+
+# End.
@@ -0,0 +1,201 @@
+# $Id: VocabCache.py $
+#
+# On-disk cache of parsed vocabularies
+#
+"""
+Persistent cache of parsed Vocabulary values, so that converting an
+unchanged CSV file does not need to read and parse it again.
+
+Entries are keyed by a SHA-1 digest of the CSV content together with a
+version string supplied by the converter, so that changing either the
+input or the converter invalidates earlier entries.  Each entry is a
+single file holding the vocabulary pickled (protocol 2, which handles the
+__slots__ model classes and preserves sharing of interned values) and then
+compressed with zlib:
+
+  cache = VocabCache(cachedir, "ConvertOntology 1024/1")
+  key   = cache.makeKey(csvdata)
+  vocab = cache.load(key)
+  if vocab == None:
+      vocab = readVocabulary(...)
+      cache.store(key, vocab)
+
+Cache failures are never fatal:  an entry that cannot be read is treated
+as missing, and an entry that cannot be written is skipped.
+
+MemoryVocabCache has the same interface, but holds a limited number of
+vocabularies in memory, discarding the least recently used;  it is used
+by a long-running conversion service (see ConvertServer), and may be 
+shared by several threads.
+"""
+
+import os
+import zlib
+import cPickle
+import logging
+import threading
+
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
+
+# Suffix of cache entry file names
+CACHE_SUFFIX = ".vocab"
+
+def makeContentKey(version, data):
+    """
+    Return a cache key for CSV content read by the indicated converter version.
+    """
+    h = sha1(version)
+    h.update("\0")
+    h.update(data)
+    return h.hexdigest()
+
+class VocabCache(object):
+    """
+    Cache of parsed vocabularies held in files in a single directory.
+    """
+    def __init__(self, cachedir, version):
+        self._cachedir = cachedir
+        self._version  = version
+
+    def getDirectory(self):
+        return self._cachedir
+
+    def makeKey(self, data):
+        """
+        Return the cache key for the supplied CSV content.
+        """
+        return makeContentKey(self._version, data)
+
+    def getEntryPath(self, key):
+        return os.path.join(self._cachedir, key+CACHE_SUFFIX)
+
+    def load(self, key):
+        """
+        Return the vocabulary cached for the supplied key, or None.
+        """
+        log = logging.getLogger("ConvertOntology.VocabCache")
+        try:
+            f = open(self.getEntryPath(key), "rb")
+        except IOError:
+            return None
+        try:
+            try:
+                return cPickle.loads(zlib.decompress(f.read()))
+            except Exception, e:
+                log.warning("Ignoring unreadable cache entry %s: %s", key, e)
+                return None
+        finally:
+            f.close()
+
+    def store(self, key, vocab):
+        """
+        Save a vocabulary in the cache under the supplied key.  The entry
+        is written to a temporary file that is then renamed, so a concurrent
+        reader never sees a partial entry.
+
+        Returns True if the entry was saved, otherwise False.
+        """
+        import tempfile     # Only needed here, and slow to import
+        log = logging.getLogger("ConvertOntology.VocabCache")
+        data = zlib.compress(cPickle.dumps(vocab, 2))
+        path = self.getEntryPath(key)
+        try:
+            if not os.path.isdir(self._cachedir):
+                os.makedirs(self._cachedir)
+            (fd, tmppath) = tempfile.mkstemp(suffix=".tmp", dir=self._cachedir)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            if os.path.exists(path): os.remove(path)    # rename fails on Windows
+            os.rename(tmppath, path)
+        except (IOError, OSError), e:
+            log.warning("Cannot save cache entry %s: %s", key, e)
+            return False
+        return True
+
+    def clear(self):
+        """
+        Remove all entries from the cache, returning the number removed.
+        """
+        count = 0
+        if os.path.isdir(self._cachedir):
+            for name in os.listdir(self._cachedir):
+                if name.endswith(CACHE_SUFFIX) or name.endswith(".tmp"):
+                    os.remove(os.path.join(self._cachedir, name))
+                    if name.endswith(CACHE_SUFFIX): count += 1
+        return count
+
+class MemoryVocabCache(object):
+    """
+    Cache of up to 'size' parsed vocabularies held in memory, keyed as for
+    VocabCache.  When the cache is full, storing a new entry discards the
+    entry least recently stored or loaded.
+
+    Vocabulary values are returned without copying, so they are shared by
+    all users of the cache and must not be modified.
+    """
+    def __init__(self, size, version):
+        self._size    = size
+        self._version = version
+        self._entries = {}          # key -> [vocab, last use]
+        self._uses    = 0
+        self._lock    = threading.Lock()
+        self.hits     = 0
+        self.misses   = 0
+
+    def makeKey(self, data):
+        return makeContentKey(self._version, data)
+
+    def load(self, key):
+        """
+        Return the vocabulary cached for the supplied key, or None.
+        """
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(key, None)
+            if entry == None:
+                self.misses += 1
+                return None
+            self.hits  += 1
+            self._uses += 1
+            entry[1] = self._uses
+            return entry[0]
+        finally:
+            self._lock.release()
+
+    def store(self, key, vocab):
+        """
+        Save a vocabulary in the cache under the supplied key, discarding
+        the least recently used entry if the cache is full.
+        """
+        self._lock.acquire()
+        try:
+            if key not in self._entries and len(self._entries) >= self._size:
+                oldest = min([ (use, k) for (k, (v, use)) in self._entries.items() ])[1]
+                del self._entries[oldest]
+            self._uses += 1
+            self._entries[key] = [vocab, self._uses]
+        finally:
+            self._lock.release()
+        return True
+
+    def clear(self):
+        """
+        Remove all entries from the cache, returning the number removed.
+        """
+        self._lock.acquire()
+        try:
+            count = len(self._entries)
+            self._entries = {}
+        finally:
+            self._lock.release()
+        return count
+
+    def getCount(self):
+        return len(self._entries)
+
+# End.
@@ -0,0 +1,214 @@
+# $Id: VocabConverter.py $
+#
+# Library interface for converting vocabularies
+#
+"""
+Interface for programs that convert vocabularies without going through
+the command line options and data streams of ConvertOntology.py.
+
+A Converter holds everything that does not depend on the vocabulary being
+converted -- the output templates, compiled once for each format, and a
+cache of parsed vocabularies -- so it should be created once and used for
+many conversions:
+
+  converter = Converter(templates=loadTemplates("house.tmpl"))
+  owltext   = converter.convert(csvtext, "rdf")
+  converter.convertStream(open("vocab.csv", "rb"), "mediawiki", sys.stdout)
+  n3text    = converter.convertFile("vocab.csv", "n3")
+
+CSV content may be given as a byte string or a unicode string (which is
+encoded as UTF-8).  A vocabulary that imports other files (see VocabLoader)
+must be converted from its file, with convertFile, so that the imported
+files can be found;  each file is then cached separately, keyed by its
+own content and the prefixes it imports.  Output is returned as a byte string, or written to a
+supplied stream.  Failures raise a ConversionError subclass:
+
+  FormatError       unknown output format
+  TemplateError     a replacement template is not valid
+  VocabularyError   the CSV content is not a valid vocabulary;  the CSV
+                    line number where this was found is in e.line
+  OutputError       the vocabulary cannot be written in the requested format
+
+A Converter may be shared by several threads.
+"""
+
+import csv
+import cStringIO
+
+from VocabCache import MemoryVocabCache
+from VocabLoader import VocabLoader, findImports
+from BufferedWriter import DEFAULT_BUFFER_SIZE
+from ConvertOntology import (VERSION, CACHE_FORMAT, EMITTERS, FORMATS,
+    buildVocabulary, emitSequence, getTemplateNames)
+
+class ConversionError(Exception):
+    """
+    Base class for errors raised by a Converter.  'line' is the CSV line
+    number at which the error was found, or None.
+    """
+    def __init__(self, message, line=None):
+        if line != None:
+            message = "line %d: %s"%(line, message)
+        Exception.__init__(self, message)
+        self.line = line
+
+class FormatError(ConversionError):
+    pass
+
+class TemplateError(ConversionError):
+    pass
+
+class VocabularyError(ConversionError):
+    pass
+
+class OutputError(ConversionError):
+    pass
+
+class ConverterOptions(object):
+    """
+    Options passed to each emitter, as by the command line program.
+    """
+    def __init__(self, templates, base_uri, buffer_size):
+        self.templates   = templates
+        self.base_uri    = base_uri
+        self.buffer_size = buffer_size
+
+class Converter(object):
+    """
+    Converts vocabularies to any of the output formats in FORMATS.
+
+    templates   is a list of (name, text) replacement templates, as returned
+                by VocabTemplates.loadTemplates.
+    base_uri    is the base URI for relative URI references in "nt" output.
+    cachesize   is the number of parsed vocabularies kept, so that converting
+                the same content again does not read it again (0 for none).
+    buffer_size is the size of the buffer used when writing to a stream.
+    """
+    def __init__(self, templates=None, base_uri="", cachesize=32,
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        templates = list(templates or [])
+        names     = getTemplateNames()
+        for (name, text) in templates:
+            if name not in names:
+                raise TemplateError("Unknown template '%s'"%(name))
+        self._options = ConverterOptions(templates, base_uri, buffer_size)
+        try:
+            # Compile the templates for each format now, so errors are
+            # reported here, and the result is kept for later conversions
+            for fmt in FORMATS:
+                EMITTERS[fmt](cStringIO.StringIO(), self._options)
+        except ValueError, e:
+            raise TemplateError(str(e))
+        self._cache = None
+        if cachesize > 0:
+            self._cache = MemoryVocabCache(cachesize, "%s/%d"%(VERSION, CACHE_FORMAT))
+
+    def getFormats(self):
+        return list(FORMATS)
+
+    def getCache(self):
+        """
+        Return the MemoryVocabCache used by this converter, or None.
+        """
+        return self._cache
+
+    def read(self, data):
+        """
+        Return the Vocabulary read from the supplied CSV content.  The value
+        may be shared with other users of this converter, so it must not be
+        modified.
+        """
+        return self.readCached(data)[0]
+
+    def readCached(self, data):
+        """
+        Return a pair (vocab, hit) for the supplied CSV content, where 'hit'
+        is True if the vocabulary was found in the cache.
+        """
+        if isinstance(data, unicode):
+            data = data.encode("utf-8")
+        if findImports(data):
+            raise VocabularyError("Imported files cannot be found for CSV content "
+                                  "without a file name")
+        key = None
+        if self._cache:
+            key   = self._cache.makeKey(data)
+            vocab = self._cache.load(key)
+            if vocab != None:
+                return (vocab, True)
+        reader = csv.reader(cStringIO.StringIO(data))
+        try:
+            vocab = buildVocabulary(reader)
+        except csv.Error, e:
+            raise VocabularyError("CSV format error: %s"%(str(e)), reader.line_num)
+        except ValueError, e:
+            raise VocabularyError(str(e), reader.line_num)
+        if key:
+            self._cache.store(key, vocab)
+        return (vocab, False)
+
+    def readFile(self, csvpath):
+        """
+        Return a pair (vocab, hit) for the named CSV file and the files it
+        imports, if any, where 'hit' is True if none of them was parsed.
+        An IOError is raised if a file cannot be read.
+        """
+        f = open(csvpath, "rb")
+        try:
+            data = f.read()
+        finally:
+            f.close()
+        if not findImports(data):
+            return self.readCached(data)
+        loader = VocabLoader(cache=self._cache)
+        try:
+            vocab = loader.load(csvpath)
+        except ValueError, e:
+            raise VocabularyError(str(e))
+        return (vocab, loader.parsed == 0)
+
+    def readStream(self, ipstr):
+        """
+        Return the Vocabulary read from the CSV content of a stream.
+        """
+        return self.read(ipstr.read())
+
+    def convert(self, data, fmt):
+        """
+        Convert CSV content to the indicated format, and return the result.
+        """
+        return self.convertVocabulary(self.read(data), fmt)
+
+    def convertStream(self, ipstr, fmt, opstr=None):
+        """
+        Convert the CSV content of the input stream to the indicated format,
+        and write it to the output stream, or return it if none is given.
+        """
+        return self.convertVocabulary(self.readStream(ipstr), fmt, opstr)
+
+    def convertFile(self, csvpath, fmt, opstr=None):
+        """
+        Convert the named CSV file, and the files it imports, to the 
+        indicated format, as for convertStream.
+        """
+        return self.convertVocabulary(self.readFile(csvpath)[0], fmt, opstr)
+
+    def convertVocabulary(self, vocab, fmt, opstr=None):
+        """
+        Write a vocabulary in the indicated format to the output stream, or
+        return it if none is given.
+        """
+        if fmt not in EMITTERS:
+            raise FormatError("Unknown output format '%s'"%(fmt))
+        buf = opstr
+        if opstr == None:
+            buf = cStringIO.StringIO()
+        try:
+            emitSequence(vocab.getSequence(), [EMITTERS[fmt](buf, self._options)])
+        except ValueError, e:
+            raise OutputError("Cannot write %s output: %s"%(fmt, str(e)))
+        if opstr == None:
+            return buf.getvalue()
+        return None
+
+# End.
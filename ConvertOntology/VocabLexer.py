@@ -0,0 +1,108 @@
+# $Id: VocabLexer.py $
+#
+# Lexer for the cells of a vocabulary CSV row
+#
+"""
+Compiled lexer for the cell grammar used by vocabulary CSV files.
+
+Each function classifies and splits a single cell with one match against a
+pattern compiled once, here, and returns a small token tuple that is 
+consumed by the vocabulary reader and model classes:
+
+  lexPrefixCell("pre:")           -> "pre"
+  lexPropertyCell("^ rdf:type")   -> (True, "rdf:type")
+  lexValueCell("1 :: pre:type")   -> (VAL_SLOT, 1, 1, "pre:type")
+  lexValueCell("<= pre:super")    -> (VAL_SUBPROP, None, None, "pre:super")
+  lexValueCell("pre:val")         -> (VAL_VALUE, None, None, "pre:val")
+  lexUriCell("pre:local")         -> (TOK_QNAME, "pre", "local")
+  lexUriCell("<http://a.b/>")     -> (TOK_URI, "http://a.b/", None)
+  lexNodeCell("some text")        -> (TOK_LITERAL, "some text", None)
+"""
+
+import sys
+import re
+
+# Token kinds returned by lexUriCell and lexNodeCell
+TOK_QNAME   = "qname"
+TOK_URI     = "uri"
+TOK_LITERAL = "literal"
+
+# Value kinds returned by lexValueCell
+VAL_SLOT    = "slot"        # "c :: type", where c is one of ? 1 * +
+VAL_SUBPROP = "subprop"     # "<= superproperty"
+VAL_VALUE   = "value"       # attribute value
+
+# Slot cardinality flags and corresponding (min,max) cardinality
+CARDINALITY = {
+    "?": (0, 1),
+    "1": (1, 1),
+    "*": (0, sys.maxint),
+    "+": (1, sys.maxint),
+    }
+
+# Compiled cell patterns
+prefix_cell   = re.compile(r"\s*([^:]*):?")
+property_cell = re.compile(r"\s*(\^)?\s*(.*)")
+value_cell    = re.compile(r"\s*(?:([?1*+])\s*::)?\s*(<=)?\s*(.*)")
+uri_cell      = re.compile(r"([-.\w]+):([-.\w]+)|<([^>]*)>")
+node_cell     = re.compile(r"(\w+):(\w[-.\w]*)|<([^>]*)>")
+
+def lexPrefixCell(cell):
+    """
+    Return the prefix string from a prefix declaration cell; e.g. "pre:".
+    """
+    return prefix_cell.match(cell).group(1)
+
+def lexPropertyCell(cell):
+    """
+    Return a pair (inverse, property) from a property cell; 
+    e.g. "^ rdf:type" -> (True, "rdf:type").
+    """
+    m = property_cell.match(cell)
+    return (m.group(1) == '^', m.group(2))
+
+def lexValueCell(cell):
+    """
+    Return a tuple (kind, mincard, maxcard, text) from a value cell, where
+    kind is one of VAL_SLOT, VAL_SUBPROP or VAL_VALUE, mincard and maxcard
+    are the slot cardinality (None unless kind is VAL_SLOT), and text is the
+    remaining URI or literal value text.
+    """
+    (card, subprop, text) = value_cell.match(cell).groups()
+    if card != None:
+        (cmin, cmax) = CARDINALITY[card]
+        return (VAL_SLOT, cmin, cmax, text)
+    if subprop != None:
+        return (VAL_SUBPROP, None, None, text)
+    return (VAL_VALUE, None, None, text)
+
+def lexUriCell(cell):
+    """
+    Return a token (TOK_QNAME, prefix, local) or (TOK_URI, uri, None) for a
+    cell containing a qname or <uri>, or None if it contains neither.
+    """
+    m = uri_cell.match(cell)
+    if m == None:
+        return None
+    (pre, loc, uri) = m.groups()
+    if uri == None:
+        return (TOK_QNAME, pre, loc)
+    return (TOK_URI, uri, None)
+
+def lexNodeCell(cell):
+    """
+    Return a token for a cell that may contain a qname, <uri> or literal 
+    value:  (TOK_QNAME, prefix, local), (TOK_URI, uri, None) or 
+    (TOK_LITERAL, text, None).  Only qnames whose prefix and first local 
+    name character are word characters are recognized here, so that 
+    values such as "a.b: text" are treated as literals.
+    """
+    m = node_cell.match(cell)
+    if m == None:
+        return (TOK_LITERAL, cell, None)
+    (pre, loc, uri) = m.groups()
+    if uri == None:
+        return (TOK_QNAME, pre, loc)
+    return (TOK_URI, uri, None)
+
+# End.
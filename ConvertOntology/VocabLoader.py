@@ -0,0 +1,280 @@
+# $Id: VocabLoader.py $
+#
+# Read vocabularies that are split across several CSV files
+#
+"""
+Reads a vocabulary CSV file together with the vocabulary files that it
+imports, and merges them into a single Vocabulary.  A file imports another
+with a row of the form:
+
+  "@","import","base.csv"
+
+where the file name is relative to the directory of the importing file.
+The prefixes declared by an imported file may be used in the importing
+file, and imports are transitive.  Each file is merged once, after all
+of the files it imports (in the order of their import rows), so that
+the merged vocabulary has a single declaration of each prefix.  A prefix
+may be declared by several of the files for the same namespace, but it is
+an error for files to declare it for different namespaces.  The column
+headings are those of the first file merged.
+
+  loader = VocabLoader(workers=4, cache=VocabCache(cachedir, version))
+  vocab  = loader.load("vocab.csv")
+
+Files are parsed in rounds, each parsing the files whose imports have
+all been parsed;  with more than one worker, several files in a round are
+parsed at once by a pool of worker processes.  A parsed vocabulary is
+returned from a worker by pickling it, which takes about as long as
+parsing it, so this is only worthwhile for large files with several
+processors to spare.  If a cache is supplied (a VocabCache or a
+MemoryVocabCache), each file is saved in it, keyed by its content and
+the prefixes of the files it imports, so that a base vocabulary imported
+by many files is not parsed again for each of them.
+"""
+
+import sys
+import os
+import re
+import csv
+import cStringIO
+
+from ConvertOntology import (Vocabulary, buildVocabulary, getVocabCache, emitSequence,
+    countSequence)
+
+# Quick test for content that may have import rows, which are then found
+# by reading it as CSV
+IMPORT_ROW = re.compile(r'^(?:@|"@"),(?:import|"import")(?:,|\r?$)', re.MULTILINE)
+
+def findImports(data):
+    """
+    Return a list of the file names imported by CSV content, in order.
+    """
+    if not IMPORT_ROW.search(data):
+        return []
+    return [ row[2] for row in csv.reader(cStringIO.StringIO(data))
+             if len(row) > 2 and row[0] == '@' and row[1] == 'import' ]
+
+def fileHasImports(csvpath):
+    """
+    True if the named CSV file imports other vocabulary files.
+    """
+    f = open(csvpath, "rb")
+    try:
+        for line in f:
+            if IMPORT_ROW.match(line) and findImports(line):
+                return True
+        return False
+    finally:
+        f.close()
+
+def parseVocabularyFile(job):
+    """
+    Parse the CSV content of a vocabulary file, as described by a job
+    (csvpath, data, prefixes) where 'prefixes' are the VocabPrefix values
+    declared by the files it imports, and return the Vocabulary.  This is
+    called in a worker process when several files are parsed at once.
+    """
+    (csvpath, data, prefixes) = job
+    vocab  = Vocabulary()
+    vocab.importPrefixes(prefixes)
+    reader = csv.reader(cStringIO.StringIO(data))
+    try:
+        buildVocabulary(reader, vocab)
+    except (csv.Error, ValueError), e:
+        raise ValueError, "%s, line %d: %s"%(csvpath, reader.line_num, e)
+    return vocab
+
+class VocabFile(object):
+    """
+    A vocabulary file to be loaded, with the full paths of the files it imports.
+    """
+    def __init__(self, csvpath, data):
+        self.path    = csvpath
+        self.data    = data
+        base         = os.path.dirname(csvpath)
+        self.imports = [ os.path.normpath(os.path.join(base, name)) for name in findImports(data) ]
+        self.vocab   = None
+
+class VocabLoader(object):
+    """
+    Loads vocabularies split across several files, using up to 'workers'
+    processes (None for the number of CPUs) and the supplied cache, if
+    any.  The counts of files parsed and found in the cache by the last
+    load are in self.parsed and self.cached, and the VocabFile values
+    merged, in order, are in self.files.
+    """
+    def __init__(self, workers=1, cache=None):
+        self._workers = workers
+        self._cache   = cache
+        self.parsed   = 0
+        self.cached   = 0
+        self.files    = []
+
+    def load(self, csvpath):
+        """
+        Return the merged Vocabulary for the named CSV file and the files
+        it imports.  An IOError is raised if a file cannot be read, and a
+        ValueError if a file cannot be parsed or files import each other.
+        """
+        files = {}
+        order = self.readFiles(os.path.normpath(csvpath), files, [])
+        return self.loadFiles(order, files)
+
+    def loadImports(self, csvpath):
+        """
+        Return the merged Vocabulary for the files imported, directly or
+        indirectly, by the named CSV file, without parsing that file;  errors
+        are raised as for load.
+        """
+        files = {}
+        order = self.readFiles(os.path.normpath(csvpath), files, [])
+        return self.loadFiles(order[:-1], files)
+
+    def loadFiles(self, order, files):
+        """
+        Parse and merge the files whose paths are listed in 'order', each
+        after those it imports, from 'files' (as filled in by readFiles).
+        """
+        self.parsed = 0
+        self.cached = 0
+        self.files  = [ files[p] for p in order ]
+        done  = set()
+        while len(done) < len(order):
+            ready = [ p for p in order if p not in done and
+                      not [ i for i in files[p].imports if i not in done ] ]
+            self.parseFiles([ files[p] for p in ready ], files)
+            done.update(ready)
+        vocab = Vocabulary()
+        for p in order:
+            try:
+                vocab.mergeVocabulary(files[p].vocab)
+            except ValueError, e:
+                raise ValueError, "%s: %s"%(p, e)
+        return vocab
+
+    def readFiles(self, csvpath, files, importers):
+        """
+        Read a file and those it imports that are not already in 'files' (a
+        dictionary of VocabFile values keyed by path), adding them to it,
+        and return a list of their paths with each after those it imports.
+        'importers' is the list of files whose imports are being read.
+        """
+        if csvpath in importers:
+            cycle = importers[importers.index(csvpath):]+[csvpath]
+            raise ValueError, "Import cycle: %s"%(" -> ".join(cycle))
+        if csvpath in files:
+            return []
+        try:
+            f = open(csvpath, "rb")
+            try:
+                data = f.read()
+            finally:
+                f.close()
+        except IOError, e:
+            if importers:
+                raise IOError, "Cannot read %s, imported by %s: %s"%(csvpath, importers[-1], e.strerror)
+            raise
+        vf    = VocabFile(csvpath, data)
+        order = []
+        for i in vf.imports:
+            order.extend(self.readFiles(i, files, importers+[csvpath]))
+        files[csvpath] = vf
+        return order+[csvpath]
+
+    def getImportedPrefixes(self, vf, files):
+        """
+        Return the prefix declarations of the files imported, directly or
+        indirectly, by a file, in the order in which they would be merged.
+        """
+        prefixes = []
+        seen     = set()
+        def addPrefixes(path):
+            for i in files[path].imports:
+                if i not in seen:
+                    seen.add(i)
+                    addPrefixes(i)
+                    prefixes.extend(files[i].vocab.getPrefixes())
+        addPrefixes(vf.path)
+        return prefixes
+
+    def parseFiles(self, vfs, files):
+        """
+        Set the vocabulary of each of the supplied files, whose imports
+        have all been parsed, from the cache or by parsing them.
+        """
+        jobs = []
+        keys = []
+        for vf in vfs:
+            prefixes = self.getImportedPrefixes(vf, files)
+            if self._cache:
+                # A file's vocabulary depends on the prefixes it imports
+                sig = "".join([ "\n@%s %s"%(p.getPrefix(), p.getUri()) for p in prefixes ])
+                key = self._cache.makeKey(vf.data+sig)
+                vf.vocab = self._cache.load(key)
+                if vf.vocab != None:
+                    self.cached += 1
+                    continue
+                keys.append(key)
+            jobs.append((vf.path, vf.data, prefixes))
+        vocabs = self.mapJobs(jobs)
+        for (job, vocab) in zip(jobs, vocabs):
+            files[job[0]].vocab = vocab
+            self.parsed += 1
+        if self._cache:
+            for (key, vocab) in zip(keys, vocabs):
+                self._cache.store(key, vocab)
+        return
+
+    def mapJobs(self, jobs):
+        """
+        Return the vocabularies parsed for a list of jobs, in order, using a
+        pool of worker processes if there are several jobs.
+        """
+        workers = self._workers
+        if workers != 1 and len(jobs) > 1:
+            try:
+                import multiprocessing
+            except ImportError:
+                multiprocessing = None
+            if multiprocessing:
+                pool = multiprocessing.Pool(min(workers or multiprocessing.cpu_count(), len(jobs)))
+                try:
+                    return pool.map(parseVocabularyFile, jobs, 1)
+                finally:
+                    pool.close()
+                    pool.join()
+        return map(parseVocabularyFile, jobs)
+
+def convertWithImports(csvpath, emitters, options):
+    """
+    Convert the vocabulary in a CSV file and the files it imports, writing
+    it to each of the supplied emitters, with the cache and statistics
+    selected by the options as for ConvertOntology.convertOntology.
+
+    Returns:
+      0 - success
+      1 - error
+    """
+    cache = None
+    if not getattr(options, "no_cache", False):
+        cache = getVocabCache(options)
+    stats  = getattr(options, "stats", None)
+    loader = VocabLoader(getattr(options, "jobs", 0) or 1, cache)
+    load   = loader.load
+    if stats:
+        load = stats.timed("import loading", load)
+    try:
+        vocab = load(csvpath)
+    except (IOError, ValueError), e:
+        sys.stderr.write("%s\n"%(str(e)))
+        return 1
+    if stats:
+        stats.count("files parsed", loader.parsed)
+        stats.count("files cached", loader.cached)
+    sequence = vocab.getSequence()
+    if stats:
+        sequence = countSequence(stats, sequence)
+    emitSequence(sequence, emitters)
+    return 0
+
+# End.
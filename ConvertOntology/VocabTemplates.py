@@ -0,0 +1,172 @@
+# $Id: VocabTemplates.py $
+#
+# Compiled output templates for vocabulary emitters
+#
+"""
+Output templates for the vocabulary emitters, compiled into renderer
+functions.  Each template is a %-format string with positional fields
+(e.g. %s), and is compiled once into a function that takes one argument
+per field and returns the filled-in text:
+
+  render = TemplateSet([ ("owl_class_open", '<owl:Class rdf:about="%s">\\n') ])
+  opstr.write(render.owl_class_open(uri))
+
+The default templates for each output format are compiled by its
+emitter when that emitter is first used.  A template file supplies
+replacements for some or all of them, so a new house style can be
+produced without changing the emitters.  In a template file, each template starts with a
+header line '@@ name' and consists of the following lines, up to the
+next header, exactly as written (including line breaks).  A line ending
+with a backslash is joined to the next without a line break, and lines
+before the first header are comments:
+
+  Basecamp templates with a plain heading row
+  @@ basecamp_heading
+  <tr><th>%s</th><th>%s</th><th>%s</th><th>%s</th><th>%s</th></tr>\\
+  @@ owl_class_close
+      </owl:Class>
+
+  @@ ...
+
+A replacement template must have the same number of fields as the
+template it replaces, as the emitters supply a fixed set of values.
+"""
+
+import re
+
+# Start of a template in a template file
+template_header = re.compile(r'^@@\s*(\w+)\s*$')
+
+# A single %-format field, or an escaped '%'
+template_field  = re.compile(r'%[-#0 +]*\d*(?:\.\d*)?[diouxXeEfFgGcrs%]')
+
+def countFields(text):
+    """
+    Return the number of positional fields in a template, or raise
+    ValueError if the template contains a field that cannot be used.
+    """
+    fields = template_field.findall(text)
+    if "%" in template_field.sub("", text):
+        raise ValueError, "Invalid format field in template %s"%(repr(text))
+    return len([ f for f in fields if f != "%%" ])
+
+def compileTemplate(text):
+    """
+    Return a function that renders the supplied template, taking one
+    argument for each field.
+    """
+    n = countFields(text)
+    if n == 0:
+        const = text % ()
+        return lambda: const
+    if n == 1:
+        return lambda v: text % (v,)
+    return lambda *vals: text % vals
+
+def templatesFromClass(cls, prefix):
+    """
+    Return a list of (name, text) for the string attributes of a class
+    whose names start with the given prefix.
+    """
+    return [ (name, getattr(cls, name)) for name in dir(cls)
+             if name.startswith(prefix) and isinstance(getattr(cls, name), str) ]
+
+class TemplateSet(object):
+    """
+    Set of compiled templates, each of which is available as a renderer
+    function attribute with the same name as the template.
+    """
+    def __init__(self, templates):
+        self._texts  = {}
+        self._fields = {}
+        for (name, text) in templates:
+            self._fields[name] = countFields(text)
+            self._texts[name]  = text
+            setattr(self, name, compileTemplate(text))
+
+    def getNames(self):
+        return sorted(self._texts.keys())
+
+    def getText(self, name):
+        return self._texts[name]
+
+    def getTemplates(self):
+        return [ (name, self._texts[name]) for name in self.getNames() ]
+
+    def override(self, templates):
+        """
+        Return a new TemplateSet in which templates from the supplied list
+        of (name, text) replace those with the same name.  Names that are
+        not in this set are ignored, so one list can hold replacements for
+        several output formats.  Raises ValueError if a replacement does
+        not have the same number of fields as the template it replaces.
+        """
+        texts = dict(self._texts)
+        for (name, text) in templates:
+            if name not in texts: continue
+            if countFields(text) != self._fields[name]:
+                raise ValueError, ("Template %s must have %d field(s)"%
+                                   (name, self._fields[name]))
+            texts[name] = text
+        return TemplateSet(texts.items())
+
+# -----------------------
+# Reading template files
+# -----------------------
+
+def readTemplates(ipstr, filename="<templates>"):
+    """
+    Read templates in the format described above from the supplied stream,
+    and return a list of (name, text) in the order they appear.
+    """
+    templates = []
+    name  = None
+    lines = []
+    lineno = 0
+    for line in ipstr:
+        lineno += 1
+        line = line.rstrip("\r\n")
+        m = template_header.match(line)
+        if m:
+            if name: templates.append((name, "".join(lines)))
+            name  = m.group(1)
+            lines = []
+        elif line.startswith("@@"):
+            raise ValueError, "%s:%d: Invalid template header"%(filename, lineno)
+        elif name:
+            if line.endswith("\\"):
+                lines.append(line[:-1])
+            else:
+                lines.append(line+"\n")
+    if name: templates.append((name, "".join(lines)))
+    for (name, text) in templates:
+        try:
+            countFields(text)
+        except ValueError, e:
+            raise ValueError, "%s: %s: %s"%(filename, name, str(e))
+    return templates
+
+def loadTemplates(filename):
+    """
+    Read templates from the named file.
+    """
+    ipstr = open(filename, "rb")
+    try:
+        return readTemplates(ipstr, filename)
+    finally:
+        ipstr.close()
+
+def writeTemplates(templates, opstr):
+    """
+    Write a list of (name, text) templates to the supplied stream in the
+    format read by readTemplates.
+    """
+    for (name, text) in templates:
+        opstr.write("@@ %s\n"%(name))
+        lines = text.split("\n")
+        for line in lines[:-1]:
+            opstr.write(line+"\n")
+        if lines[-1]:
+            opstr.write(lines[-1]+"\\\n")
+
+# End.
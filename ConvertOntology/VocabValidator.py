@@ -0,0 +1,206 @@
+# $Id: VocabValidator.py $
+#
+# Check the references between the elements of a vocabulary
+#
+"""
+Checks that the terms referred to by a vocabulary are defined, so that
+mistyped names are found before the OWL output is loaded into a reasoner.
+The references checked are:
+
+  - slot value types, e.g. "1 :: pre:Type"
+  - superproperties of slot properties, e.g. "<= pre:superprop"
+  - values of rdfs:subClassOf attributes of a class, in either direction,
+    and of rdf:type attributes (but not of inverse rdf:type attributes,
+    whose values are individuals of the class rather than references)
+
+A class reference must name a class defined by the vocabulary, and a
+superproperty must name a property used by one of its slots or
+attributes, unless the reference is to a namespace in which the
+vocabulary defines nothing, such as that of another vocabulary whose
+prefix is declared:  references to other vocabularies are not checked.
+A reference in the XML Schema, RDF, RDFS or OWL namespaces must name one
+of their terms, such as an XML Schema datatype.
+
+All problems are reported, with the CSV line numbers of the rows
+concerned;  a row that cannot be read is reported and skipped.
+
+  problems = validateVocabulary(csv.reader(open("vocab.csv", "rb")))
+  for (line, message) in problems:
+      print "vocab.csv:%d: %s"%(line, message)
+
+The defined terms and the references to them are noted as the rows are
+read, and each distinct reference is then looked up once in a set of
+defined terms, so validation takes little longer than reading.
+"""
+
+import sys
+import csv
+import cStringIO
+
+from ConvertOntology import (Vocabulary, readVocabularyEvents, getVocabCache,
+    EV_CLASS_START, EV_ATTR, EV_SLOT, EV_ASSERTION, RDFS_SUBCLASSOF_URI)
+from OwlTriples import NS_RDF, NS_RDFS, NS_OWL, NS_XSD
+
+RDF_TYPE_URI = NS_RDF+"type"
+
+# Terms of the standard namespaces;  a reference in one of these
+# namespaces must name one of them
+STANDARD_TERMS = {
+    NS_XSD:
+        set("""anyType anySimpleType string normalizedString token language
+               Name NCName NMTOKEN NMTOKENS ID IDREF IDREFS ENTITY ENTITIES
+               QName NOTATION anyURI boolean decimal integer nonPositiveInteger
+               negativeInteger long int short byte nonNegativeInteger
+               unsignedLong unsignedInt unsignedShort unsignedByte
+               positiveInteger float double duration dateTime time date
+               gYearMonth gYear gMonthDay gDay gMonth hexBinary base64Binary
+            """.split()),
+    NS_RDF:
+        set("""type Property Statement subject predicate object Bag Seq Alt
+               value List first rest nil XMLLiteral PlainLiteral langString
+            """.split()),
+    NS_RDFS:
+        set("""Resource Class Literal Datatype Container
+               ContainerMembershipProperty subClassOf subPropertyOf domain
+               range label comment member seeAlso isDefinedBy
+            """.split()),
+    NS_OWL:
+        set("""Class Thing Nothing Restriction Ontology DataRange AllDifferent
+               DeprecatedClass DeprecatedProperty ObjectProperty
+               DatatypeProperty AnnotationProperty OntologyProperty
+               FunctionalProperty InverseFunctionalProperty
+               TransitiveProperty SymmetricProperty equivalentClass
+               equivalentProperty sameAs differentFrom disjointWith inverseOf
+               unionOf intersectionOf complementOf oneOf onProperty
+               allValuesFrom someValuesFrom hasValue minCardinality
+               maxCardinality cardinality distinctMembers imports versionInfo
+               priorVersion backwardCompatibleWith incompatibleWith
+               topObjectProperty bottomObjectProperty topDataProperty
+               bottomDataProperty real rational
+            """.split()),
+    }
+
+# Kinds of reference, with the description of what they should name
+REF_VALTYPE    = ("Slot value type", "a defined class or datatype")
+REF_SUPERPROP  = ("Superproperty",   "a defined property")
+REF_SUPERCLASS = ("Superclass",      "a defined class")
+REF_SUBCLASS   = ("Subclass",        "a defined class")
+REF_TYPE       = ("Type",            "a defined class")
+
+def getNamespace(uri):
+    """
+    Return the namespace part of a URI, up to its last '#' or '/'.
+    """
+    return uri[:max(uri.rfind("#"), uri.rfind("/"))+1]
+
+def validateVocabulary(csvreader, vocab=None):
+    """
+    Read a vocabulary from the CSV reader, and return a list of (line, message)
+    pairs describing the problems found, in line order.  If a Vocabulary is
+    supplied, prefixes are declared in it as the rows are read, and it may
+    already hold imported vocabularies whose terms can be referred to.
+    """
+    v = vocab
+    if v == None: v = Vocabulary()
+    problems = []
+    refs     = []           # (line, kind, referring element)
+    classes  = set()        # URIs of classes
+    props    = set()        # URIs of properties used by slots and attributes
+    newuris  = set()        # URIs of new classes and slot properties
+    for c in v.getClasses():
+        classes.add(c.getUri())
+        if c.isNew(): newuris.add(c.getUri())
+        for e in c.getSlots()+c.getAttrs():
+            props.add(e.getUri())
+            if e.isNew(): newuris.add(e.getUri())
+    try:
+        for (event, item, line) in readVocabularyEvents(csvreader, v, problems):
+            if event == EV_SLOT:
+                uri = item.getUri()
+                props.add(uri)
+                if item.isNew(): newuris.add(uri)
+                refs.append((line, REF_VALTYPE, item))
+            elif event == EV_ATTR:
+                uri = item.getUri()
+                props.add(uri)
+                if uri == RDFS_SUBCLASSOF_URI:
+                    refs.append((line, (item.isInverse() and REF_SUBCLASS) or REF_SUPERCLASS, item))
+                elif uri == RDF_TYPE_URI and not item.isInverse():
+                    refs.append((line, REF_TYPE, item))
+            elif event == EV_CLASS_START:
+                uri = item.getUri()
+                classes.add(uri)
+                if item.isNew(): newuris.add(uri)
+            elif event == EV_ASSERTION:
+                refs.append((line, REF_SUPERPROP, item))
+    except csv.Error, e:
+        problems.append((csvreader.line_num, "CSV format error: %s"%(str(e))))
+    # Namespaces in which the vocabulary defines terms
+    namespaces = set([ getNamespace(u) for u in newuris ])
+    # Check each distinct reference once
+    checked = {}
+    for (line, kind, item) in refs:
+        if kind == REF_VALTYPE:
+            uri = item.getValTypeUri()
+        elif item.isUriValue():
+            uri = item.getValueUri()
+        else:
+            problems.append((line, "%s %s is not a URI"%(kind[0], item.getValueOrUri())))
+            continue
+        ok = checked.get((uri, kind), None)
+        if ok == None:
+            ns    = getNamespace(uri)
+            terms = STANDARD_TERMS.get(ns, None)
+            if terms != None:
+                ok = uri[len(ns):] in terms
+            elif ns not in namespaces:
+                ok = True
+            elif kind == REF_SUPERPROP:
+                ok = uri in props
+            else:
+                ok = uri in classes
+            checked[(uri, kind)] = ok
+        if not ok:
+            if kind == REF_VALTYPE:
+                text = item.getValTypeQNameOrUri()
+            else:
+                text = item.getValueOrUri()
+            problems.append((line, "%s %s is not %s"%(kind[0], text, kind[1])))
+    problems.sort(key=lambda p: p[0])
+    return problems
+
+def validateOntology(ipstr, opstr, options):
+    """
+    Validate the vocabulary read from the input stream, which is read from
+    the file options.inp_file if that is set, writing a line to the output
+    stream for each problem found.  If the file imports other vocabulary
+    files, references to their terms are accepted, but they are not
+    themselves validated.
+
+    Returns:
+      0 - no problems found
+      1 - problems found, or error
+    """
+    name  = options.inp_file or "<stdin>"
+    data  = ipstr.read()
+    vocab = Vocabulary()
+    if options.inp_file:
+        from VocabLoader import VocabLoader, findImports
+        if findImports(data):
+            cache = None
+            if not getattr(options, "no_cache", False):
+                cache = getVocabCache(options)
+            try:
+                vocab.mergeVocabulary(VocabLoader(cache=cache).loadImports(options.inp_file))
+            except (IOError, ValueError), e:
+                sys.stderr.write("%s\n"%(str(e)))
+                return 1
+    problems = validateVocabulary(csv.reader(cStringIO.StringIO(data)), vocab)
+    for (line, message) in problems:
+        opstr.write("%s:%d: %s\n"%(name, line, message))
+    opstr.flush()
+    if problems:
+        return 1
+    return 0
+
+# End.
@@ -0,0 +1,414 @@
+# $Id: WatchConvert.py $
+#
+# Convert a vocabulary CSV file again each time it changes
+#
+"""
+Watch a vocabulary CSV file while it is being edited, and convert it to
+the selected output files each time it is saved, reporting the time taken
+by each conversion:
+
+  watcher = VocabWatcher("vocab.csv", options, sys.stderr)
+  watcher.watch(interval=1.0)
+
+The file is polled for a change of modification time or size.  If the
+content is the same as that last converted (e.g. the file was saved
+without changes), the outputs are left alone.  Otherwise the file is read
+again and the outputs are rewritten, reusing what was read from the 
+previous version:  a BlockReader takes the classes whose rows and prefixes
+are unchanged, and a WarmVocabulary takes the URI and node values resolved
+for the previous version wherever the prefixes that resolve them are
+unchanged.  The compiled output templates are shared by all conversions.
+
+If the file imports other vocabulary files (see VocabLoader), they are
+watched as well, and a change to any of them converts the vocabulary
+again;  each file is then parsed again only if it or the prefixes it 
+imports have changed, as parsed files are kept in a MemoryVocabCache.
+
+A file that cannot be read or converted is reported, and the watch
+continues with the previous version of the vocabulary.
+"""
+
+import sys
+import os
+import csv
+import copy
+import time
+import itertools
+import StringIO
+import cStringIO
+import traceback
+
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
+
+from VocabLexer import lexPrefixCell
+from VocabCache import MemoryVocabCache
+from VocabLoader import VocabLoader, findImports
+from ConvertOntology import (VERSION, CACHE_FORMAT, Vocabulary, VocabUri, VocabNode,
+    readVocabulary, convertVocabulary, getOutputFormats)
+
+# Number of parsed files kept when watching a file that imports others
+WATCH_CACHE_SIZE = 32
+
+class WarmVocabulary(Vocabulary):
+    """
+    Vocabulary that reuses the URI and node values interned by an earlier
+    vocabulary (e.g. one read from a previous version of the same file),
+    where this vocabulary's prefixes resolve them to the same URIs.  The
+    number of values reused is counted in self.reused.
+    """
+    def __init__(self, previous=None):
+        Vocabulary.__init__(self)
+        self._prevuris  = {}
+        self._prevnodes = {}
+        if previous:
+            self._prevuris  = previous._uricache
+            self._prevnodes = previous._nodecache
+        self.reused = 0
+
+    def internUri(self, uritxt):
+        u = self._uricache.get(uritxt, None)
+        if u == None:
+            u = self._prevuris.get(uritxt, None)
+            if u != None and u.isResolvedBy(self._prefixindex):
+                self.reused += 1
+            else:
+                u = VocabUri(self._prefixindex, uritxt)
+            self._uricache[uritxt] = u
+        return u
+
+    def internNode(self, valtxt):
+        n = self._nodecache.get(valtxt, None)
+        if n == None:
+            n = self._prevnodes.get(valtxt, None)
+            if n != None and n.isResolvedBy(self._prefixindex):
+                self.reused += 1
+            else:
+                n = VocabNode(self._prefixindex, valtxt)
+            self._nodecache[valtxt] = n
+        return n
+
+    def forgetPrevious(self):
+        """
+        Drop the values of the earlier vocabulary, once reading is done.
+        """
+        self._prevuris  = {}
+        self._prevnodes = {}
+        return
+
+    def getInternedCount(self):
+        return len(self._uricache)+len(self._nodecache)
+
+class BlockReader(object):
+    """
+    CSV reader for readVocabulary that reuses the classes read from an
+    earlier version of the same file.
+
+    Rows are read a block at a time, where a block is a class definition
+    row and the rows that follow it, up to the next class definition.  A
+    block whose rows, and the prefix declarations before it, are the same
+    as a block read from the earlier version is not returned:  its class,
+    and any prefix declarations and blank rows in it, are added straight 
+    to the vocabulary.  Other rows are returned as read.
+
+    The class read from each block of this version is recorded in 
+    self.blocks, keyed as for 'previous', for use with the next version.
+    """
+    def __init__(self, csvreader, vocab, previous=None):
+        self._reader   = csvreader
+        self._vocab    = vocab
+        self._previous = dict(previous or {})
+        self._prefixes = ()         # Prefix declaration rows read so far
+        self._rows     = self.readRows()
+        self._line_num = 0
+        self.blocks    = {}         # Block key -> VocabClass
+        self.reused    = 0
+
+    def __iter__(self):
+        return self._rows
+
+    def next(self):
+        return self._rows.next()
+
+    def getLineNum(self):
+        return self._line_num
+
+    line_num = property(getLineNum)
+
+    def readRows(self):
+        """
+        Generate the rows to be read by the caller, reading the input a 
+        block at a time.
+        """
+        reader = self._reader
+        row    = reader.next()
+        self._line_num = reader.line_num
+        yield row                   # Column headings
+        rows    = []
+        readkey = None              # Key of block last returned to caller
+        for row in itertools.chain(reader, [None]):
+            # End of input, or a class definition row as read by readVocabularyEvents
+            if row is None or (rows and len(row) > 1 and row[1] != '' and row[0] != '#' and
+                               not (row[0] == '@' and row[1] in ('prefix', 'import'))):
+                if readkey:
+                    # The class read from the last block is the latest added
+                    self.blocks[readkey] = self._vocab.getClasses()[-1]
+                    readkey = None
+                key = self.getBlockKey(rows)
+                if not self.reuseBlock(key, rows):
+                    for (r, self._line_num) in rows:
+                        yield r
+                    if rows and isClassStart(rows[0][0]):
+                        readkey = key
+                rows = []
+            rows.append((row, reader.line_num))
+        if readkey:
+            self.blocks[readkey] = self._vocab.getClasses()[-1]
+        return
+
+    def getBlockKey(self, rows):
+        """
+        Return a key for a block of (row, line_num) values, combining its 
+        rows and the prefix declarations before it, and note any prefix
+        declarations in the block.
+        """
+        key = (self._prefixes, tuple([ tuple(row) for (row, line) in rows ]))
+        for (row, line) in rows:
+            if row[:2] == ['@', 'prefix']:
+                self._prefixes += (tuple(row),)
+        return key
+
+    def reuseBlock(self, key, rows):
+        """
+        If a class was read from the same block of the earlier version, add
+        it to the vocabulary, with any prefixes and blank rows after it, and 
+        return True.  Otherwise return False.
+        """
+        vclass = self._previous.pop(key, None)
+        if vclass == None:
+            return False
+        self.reused += 1
+        self.blocks[key] = vclass
+        self._vocab.addClass(vclass)
+        for (row, line) in rows[1:]:
+            r = (row+['','','','','','',''])[:7]
+            if r[0] == '@' and r[1] == 'prefix':
+                self._vocab.addPrefix(lexPrefixCell(r[2]), r[3], r[4], r[5], r[6])
+            elif r[0] == '@' and r[1] == 'import':
+                self._vocab.addImport(r[2], r[4], r[5], r[6])
+            elif r[1:] == ['','','','','','']:
+                self._vocab.addSequenceItem(None)
+        self._line_num = rows[-1][1]
+        return True
+
+def isClassStart(row):
+    """
+    True if the supplied CSV row starts a class definition, as read by
+    readVocabularyEvents.
+    """
+    return (len(row) > 1 and row[1] != '' and row[0] != '#' and
+            not (row[0] == '@' and row[1] in ('prefix', 'import')))
+
+def watchOptions(options):
+    """
+    Return a copy of the supplied options in which every selected output
+    format is written to a named file (the output file, where no file is
+    given for the format).
+    """
+    o = copy.copy(options)
+    o.formats = [ (fmt, filename or options.out_file)
+                  for (fmt, filename) in getOutputFormats(options) ]
+    for (fmt, filename) in o.formats:
+        setattr(o, fmt, False)
+    return o
+
+class VocabWatcher(object):
+    """
+    Converts a vocabulary CSV file to the output files selected by the
+    supplied options each time it changes, writing a line about each
+    conversion to the report stream (if given).
+    """
+    def __init__(self, csvpath, options, report=None):
+        self._csvpath = csvpath
+        self._options = watchOptions(options)
+        self._report  = report
+        self._paths   = [csvpath]   # Watched file and the files it imports
+        self._state   = None        # State of files when last polled
+        self._digest  = None        # Digest of content last converted
+        self._vocab   = None        # Vocabulary last converted
+        self._blocks  = {}          # Classes last converted, see BlockReader
+        self._cache   = MemoryVocabCache(WATCH_CACHE_SIZE, "%s/%d"%(VERSION, CACHE_FORMAT))
+
+    def getVocabulary(self):
+        return self._vocab
+
+    def getFileState(self):
+        """
+        Return a tuple of the modification time and size of the watched file
+        and of each file it imported when last converted (None for one that
+        does not exist), or None if the watched file does not exist.
+        """
+        state = []
+        for path in self._paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                if path == self._csvpath: return None
+                state.append(None)
+                continue
+            state.append((st.st_mtime, st.st_size))
+        return tuple(state)
+
+    def writeReport(self, message):
+        if self._report:
+            self._report.write("%s %s: %s\n"%(time.strftime("%H:%M:%S"), self._csvpath, message))
+            self._report.flush()
+        return
+
+    def poll(self):
+        """
+        Convert the watched file if it has changed since the last poll.
+
+        Returns None if the file has not changed (or does not exist), or
+        else the status returned by convert.
+        """
+        state = self.getFileState()
+        if state == None or state == self._state:
+            return None
+        changetime = None
+        if self._state:
+            changetime = max([ s[0] for s in state if s ])
+        self._state = state
+        paths  = self._paths
+        status = self.convert(changetime)
+        if self._paths != paths:
+            # Imports have changed, so watch the files now imported
+            self._state = self.getFileState()
+        return status
+
+    def convert(self, changetime=None):
+        """
+        Convert the watched file, unless its content is the same as that
+        last converted.  If the time the file was changed is given, the
+        time from then to the end of the conversion is also reported.
+
+        Returns:
+          0 - success
+          1 - error
+        """
+        t0 = time.time()
+        try:
+            f = open(self._csvpath, "rb")
+            try:
+                data = f.read()
+            finally:
+                f.close()
+        except IOError, e:
+            self.writeReport("read failed: %s"%(str(e)))
+            return 1
+        if findImports(data):
+            return self.convertWithImports(t0, changetime)
+        self._paths = [self._csvpath]
+        digest = sha1(data).hexdigest()
+        if digest == self._digest:
+            self.writeReport("unchanged")
+            return 0
+        vocab  = WarmVocabulary(self._vocab)
+        reader = BlockReader(csv.reader(cStringIO.StringIO(data)), vocab, self._blocks)
+        try:
+            status = 1
+            if readVocabulary(reader, vocab):
+                vocab.forgetPrevious()
+                status = convertVocabulary(vocab, StringIO.StringIO(), self._options)
+        except Exception, e:
+            message = traceback.format_exception_only(e.__class__, e)[-1].strip()
+            self.writeReport("conversion failed: %s"%(message))
+            return 1
+        if status != 0:
+            self.writeReport("conversion failed")
+            return status
+        self._digest = digest
+        self._vocab  = vocab
+        self._blocks = reader.blocks
+        t1 = time.time()
+        latency = ""
+        if changetime != None:
+            latency = " (%.3fs after change)"%(t1-changetime)
+        self.writeReport("converted in %.3fs%s, reused %d of %d classes and %d of %d URIs"%
+                         (t1-t0, latency, reader.reused, len(vocab.getClasses()),
+                          vocab.reused, vocab.getInternedCount()))
+        return 0
+
+    def convertWithImports(self, t0, changetime):
+        """
+        Convert the watched file and the files it imports, as for convert,
+        having started at time t0.
+        """
+        loader = VocabLoader(cache=self._cache)
+        try:
+            try:
+                vocab = loader.load(self._csvpath)
+            except IOError, e:
+                self.writeReport("read failed: %s"%(str(e)))
+                return 1
+            except ValueError, e:
+                self.writeReport("conversion failed: %s"%(str(e)))
+                return 1
+        finally:
+            if loader.files:
+                self._paths = [self._csvpath]+[ vf.path for vf in loader.files[:-1] ]
+        digest = sha1("".join([ "%s\n%d\n%s"%(vf.path, len(vf.data), vf.data)
+                                for vf in loader.files ])).hexdigest()
+        if digest == self._digest:
+            self.writeReport("unchanged")
+            return 0
+        try:
+            status = convertVocabulary(vocab, StringIO.StringIO(), self._options)
+        except Exception, e:
+            message = traceback.format_exception_only(e.__class__, e)[-1].strip()
+            self.writeReport("conversion failed: %s"%(message))
+            return 1
+        if status != 0:
+            self.writeReport("conversion failed")
+            return status
+        self._digest = digest
+        self._vocab  = vocab
+        self._blocks = {}
+        t1 = time.time()
+        latency = ""
+        if changetime != None:
+            latency = " (%.3fs after change)"%(t1-changetime)
+        self.writeReport("converted in %.3fs%s, parsed %d of %d files"%
+                         (t1-t0, latency, loader.parsed, len(loader.files)))
+        return 0
+
+    def watch(self, interval=1.0, polls=None):
+        """
+        Poll the watched file every interval seconds, converting it when
+        it changes, until interrupted (or for the number of polls given).
+
+        Returns the status of the last conversion, or 0 if there was none.
+        """
+        self.writeReport("watching for changes (interrupt to stop)")
+        status = 0
+        try:
+            while polls == None or polls > 0:
+                s = self.poll()
+                if s != None: status = s
+                if polls != None: polls -= 1
+                if polls != 0: time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        return status
+
+def watchConvert(csvpath, options):
+    """
+    Watch a CSV file as selected by the supplied command line options,
+    reporting each conversion to stderr.
+    """
+    watcher = VocabWatcher(csvpath, options, sys.stderr)
+    return watcher.watch(options.watch_interval)
+
+# End.
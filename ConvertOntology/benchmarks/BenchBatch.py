@@ -0,0 +1,64 @@
+# $Id: BenchBatch.py $
+#
+# Benchmark: batch conversion of a directory of vocabularies, serially
+# and with a pool of worker processes, against one program run per file.
+#
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+import subprocess
+
+from BenchUtils import makeVocabularyCsv
+from BatchConvert import batchConvert
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.mediawiki = False
+        self.basecamp  = False
+        self.rdf       = False
+        self.n3        = False
+        self.__dict__.update(kwargs)
+
+def makeVocabularyFiles(srcdir, numfiles, numclasses):
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    for i in range(numfiles):
+        f = open(os.path.join(srcdir, "vocab%03d.csv"%(i)), "wb")
+        f.write(csvtext)
+        f.close()
+    return
+
+def runPerFile(srcdir):
+    prog = os.path.join("..", "ConvertOntology.py")
+    for name in sorted(os.listdir(srcdir)):
+        if name.endswith(".csv"):
+            base = os.path.join(srcdir, name[:-4])
+            subprocess.check_call([sys.executable, prog, "-o", base+".owl", "-r", base+".csv"])
+    return
+
+def benchBatch(numfiles=32, numclasses=500):
+    srcdir = tempfile.mkdtemp()
+    try:
+        makeVocabularyFiles(srcdir, numfiles, numclasses)
+        print "%d files of %d classes each"%(numfiles, numclasses)
+        print "%-28s %12s %12s"%("method", "time (s)", "files/s")
+        for (name, func, args) in (
+                ("program run per file", runPerFile,   (srcdir,)),
+                ("batch, 1 worker",      batchConvert, (srcdir, BenchOptions(rdf=True), 1)),
+                ("batch, 2 workers",     batchConvert, (srcdir, BenchOptions(rdf=True), 2)),
+                ("batch, 4 workers",     batchConvert, (srcdir, BenchOptions(rdf=True), 4)),
+                ):
+            t0 = time.time()
+            func(*args)
+            t  = time.time() - t0
+            print "%-28s %12.3f %12.1f"%(name, t, numfiles/t)
+    finally:
+        shutil.rmtree(srcdir)
+    return
+
+if __name__ == "__main__":
+    benchBatch()
+
+# End.
@@ -0,0 +1,59 @@
+# $Id: BenchCache.py $
+#
+# Benchmark: conversion time with a cold and a warm parsed-vocabulary cache.
+#
+
+import sys
+import os
+import csv
+import StringIO
+import tempfile
+import shutil
+
+from BenchUtils import makeVocabularyCsv, timeCall, csvReaderArgs
+from ConvertOntology import readVocabulary, convertOntology, getVocabCache
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.mediawiki = False
+        self.basecamp  = False
+        self.rdf       = False
+        self.n3        = False
+        self.__dict__.update(kwargs)
+
+def convertText(csvtext, options):
+    return convertOntology(StringIO.StringIO(csvtext), StringIO.StringIO(), options)
+
+def benchCache(numclasses=5000):
+    csvtext = makeVocabularyCsv(numclasses=numclasses, numslots=5, numattrs=2)
+    rows    = csvtext.count("\n")
+    print "Synthetic vocabulary: %d classes, %d rows, %d bytes of CSV"%(numclasses, rows, len(csvtext))
+    cachedir = tempfile.mkdtemp()
+    try:
+        nocache = BenchOptions(rdf=True, mediawiki=True, basecamp=True)
+        cold    = BenchOptions(rdf=True, mediawiki=True, basecamp=True, 
+                               cache_dir=cachedir, clear_cache=True)
+        warm    = BenchOptions(rdf=True, mediawiki=True, basecamp=True, 
+                               cache_dir=cachedir)
+        cache   = getVocabCache(warm)
+        key     = cache.makeKey(csvtext)
+        print "%-28s %12s %14s"%("operation", "time (s)", "rows/s")
+        for (name, func, args) in (
+                ("convert, no cache",       convertText,    (csvtext, nocache)),
+                ("convert, cold cache",     convertText,    (csvtext, cold)),
+                ("convert, warm cache",     convertText,    (csvtext, warm)),
+                ("readVocabulary",          readVocabulary, csvReaderArgs(csvtext)),
+                ("cache load",              cache.load,     (key,)),
+                ):
+            t = timeCall(func, args)
+            print "%-28s %12.4f %14.0f"%(name, t, rows/t)
+        size = os.path.getsize(cache.getEntryPath(key))
+        print "Cache entry: %d bytes (%.1f%% of CSV)"%(size, size*100.0/len(csvtext))
+    finally:
+        shutil.rmtree(cachedir)
+    return
+
+if __name__ == "__main__":
+    benchCache()
+
+# End.
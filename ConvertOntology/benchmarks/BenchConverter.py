@@ -0,0 +1,48 @@
+# $Id: BenchConverter.py $
+#
+# Benchmark: many small conversions in one process, using convertOntology
+# with an options object and streams for each call, compared with a single
+# Converter for new content (a cache miss) and repeated content (a hit).
+#
+
+import sys
+import StringIO
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from ConvertOntology import convertOntology
+from VocabConverter import Converter
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def convertEach(texts, fmt):
+    for t in texts:
+        out = StringIO.StringIO()
+        convertOntology(StringIO.StringIO(t), out, BenchOptions(**{fmt: True}))
+        out.getvalue()
+
+def convertEachWith(converter, texts, fmt):
+    for t in texts:
+        converter.convert(t, fmt)
+
+def benchConverter(count=1000, numclasses=10, fmt="rdf"):
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    # Content differs by a trailing blank row, so none is found in the cache
+    texts   = [ csvtext+",,,,,,\n"*(i+1) for i in range(count) ]
+    print "%d conversions of %d classes to %s"%(count, numclasses, fmt)
+    print "%-22s %10s %10s"%("method", "seconds", "ms/call")
+    def report(name, secs):
+        print "%-22s %10.4f %10.3f"%(name, secs, secs*1000.0/count)
+    report("convertOntology", timeCall(convertEach, (texts, fmt)))
+    report("Converter (no cache)", timeCall(lambda: convertEachWith(Converter(cachesize=0), texts, fmt)))
+    report("Converter (miss)", timeCall(lambda: convertEachWith(Converter(cachesize=count), texts, fmt)))
+    converter = Converter()
+    report("Converter (hit)", timeCall(convertEachWith, (converter, [csvtext]*count, fmt)))
+    return
+
+if __name__ == "__main__":
+    args = [ int(a) for a in sys.argv[1:3] ]
+    benchConverter(*args)
+
+# End.
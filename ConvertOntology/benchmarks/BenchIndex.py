@@ -0,0 +1,102 @@
+# $Id: BenchIndex.py $
+#
+# Benchmark: lookup-heavy workloads on a parsed vocabulary, using the
+# Vocabulary cross-reference indexes compared with scanning the lists of
+# classes, slots and attributes.  Each workload looks up every class by
+# URI, the slots for every slot property, the classes for every slot value
+# type and the subclasses of every class.  The one-off cost of building
+# the indexes for a vocabulary is shown separately.
+#
+
+import sys
+import csv
+import StringIO
+
+from BenchUtils import makeVocabularyRows, timeCall
+from ConvertOntology import readVocabulary, RDFS_SUBCLASSOF_URI
+
+def makeHierarchyCsv(numclasses):
+    """
+    Return CSV text for a synthetic vocabulary in which the first attribute
+    of each class but the first makes it a subclass of an earlier class.
+    """
+    rows = makeVocabularyRows(numclasses=numclasses)
+    rows.insert(1, ["@","prefix","rdfs:","<http://www.w3.org/2000/01/rdf-schema#>","","",""])
+    c = -1
+    for r in rows:
+        if len(r) > 1 and r[1].startswith("ns"):
+            c += 1
+        elif c > 0 and len(r) > 2 and r[2].endswith(":attr0"):
+            r[2:4] = ["rdfs:subClassOf", "ns%d:Class%d"%((c/2)%3, c/2)]
+    buf = StringIO.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+# Lookups by scanning
+
+def scanClass(vocab, uri):
+    for c in vocab.getClasses():
+        if c.getUri() == uri: return c
+    return None
+
+def scanSlots(vocab, uri):
+    return [ (c, s) for c in vocab.getClasses() for s in c.getSlots() if s.getUri() == uri ]
+
+def scanValueType(vocab, uri):
+    return [ c for c in vocab.getClasses()
+             if [ s for s in c.getSlots() if s.getValTypeUri() == uri ] ]
+
+def scanSubclasses(vocab, uri):
+    return [ c.getUri() for c in vocab.getClasses() for a in c.getAttrs()
+             if a.getUri() == RDFS_SUBCLASSOF_URI and a.getValueUri() == uri ]
+
+SCANS   = (scanClass, scanSlots, scanValueType, scanSubclasses)
+
+# Lookups using the indexes
+
+INDEXED = ( lambda vocab, uri: vocab.getClassByUri(uri)
+          , lambda vocab, uri: vocab.getSlotsByProperty(uri)
+          , lambda vocab, uri: vocab.getClassesByValueType(uri)
+          , lambda vocab, uri: vocab.getSubclasses(uri)
+          )
+
+def getKeys(vocab):
+    """
+    Return lists of the URIs looked up by each workload.
+    """
+    classes  = [ c.getUri() for c in vocab.getClasses() ]
+    props    = sorted(set([ s.getUri() for c in vocab.getClasses() for s in c.getSlots() ]))
+    valtypes = sorted(set([ s.getValTypeUri() for c in vocab.getClasses() for s in c.getSlots() ]))
+    return (classes, props, valtypes, classes)
+
+def lookupAll(vocab, funcs, keys):
+    for (f, uris) in zip(funcs, keys):
+        for u in uris:
+            f(vocab, u)
+    return
+
+def benchIndex(classcounts=(100, 1000, 3000)):
+    print "%8s %10s %12s %12s %12s"%("classes", "lookups", "scan (s)", "index (s)", "build (s)")
+    for n in classcounts:
+        csvtext = makeHierarchyCsv(n)
+        vocab   = readVocabulary(csv.reader(StringIO.StringIO(csvtext)))
+        keys    = getKeys(vocab)
+        for (f, g, uris) in zip(SCANS, INDEXED, keys):
+            for u in uris[:20]:
+                assert f(vocab, u) == g(vocab, u), "%s differs for %s"%(f.__name__, u)
+        def freshVocab():
+            return (readVocabulary(csv.reader(StringIO.StringIO(csvtext))),)
+        build   = timeCall(lambda v: v.buildIndexes(), freshVocab)
+        scan    = timeCall(lookupAll, (vocab, SCANS, keys), repeat=1)
+        index   = timeCall(lookupAll, (vocab, INDEXED, keys))
+        print "%8d %10d %12.4f %12.4f %12.4f"%(n, sum(map(len, keys)), scan, index, build)
+    return
+
+if __name__ == "__main__":
+    args = [ int(a) for a in sys.argv[1:] ]
+    if args:
+        benchIndex(args)
+    else:
+        benchIndex()
+
+# End.
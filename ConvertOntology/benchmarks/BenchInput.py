@@ -0,0 +1,59 @@
+# $Id: BenchInput.py $
+#
+# Benchmark: reading a vocabulary from a file through the file object
+# (the default) and through a memory map (--mmap), for CSV tokenizing
+# alone, for readVocabulary, and for reading the whole file as done
+# when the vocabulary cache is used.
+#
+
+import sys
+import os
+import csv
+import tempfile
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from ConvertOntology import readVocabulary
+from MappedInput import mapInput
+
+def openStream(path):
+    return open(path, "rb")
+
+def openMapped(path):
+    return mapInput(open(path, "rb"))
+
+def tokenize(opener, path):
+    f = opener(path)
+    for row in csv.reader(f): pass
+    f.close()
+
+def parse(opener, path):
+    f = opener(path)
+    readVocabulary(csv.reader(f))
+    f.close()
+
+def readAll(opener, path):
+    f = opener(path)
+    f.read()
+    f.close()
+
+def benchInput(sizes=(1000, 10000, 50000)):
+    print "%-8s %10s %-10s %10s %10s %10s"%("classes", "bytes", "input", "csv", "read", "read all")
+    for numclasses in sizes:
+        (fd, path) = tempfile.mkstemp(suffix=".csv")
+        os.write(fd, makeVocabularyCsv(numclasses=numclasses, commentlen=40))
+        os.close(fd)
+        try:
+            for (name, opener) in [("stream", openStream), ("mmap", openMapped)]:
+                print "%-8d %10d %-10s %10.4f %10.4f %10.4f"%(
+                    numclasses, os.path.getsize(path), name,
+                    timeCall(tokenize, (opener, path)),
+                    timeCall(parse,    (opener, path)),
+                    timeCall(readAll,  (opener, path)))
+        finally:
+            os.remove(path)
+    return
+
+if __name__ == "__main__":
+    benchInput([ int(a) for a in sys.argv[1:] ] or (1000, 10000, 50000))
+
+# End.
@@ -0,0 +1,44 @@
+# $Id: BenchIntern.py $
+#
+# Benchmark: memory used by a parsed vocabulary with and without
+# interning of VocabUri and VocabNode values.
+#
+
+import sys
+import csv
+import StringIO
+
+from BenchUtils import makeVocabularyCsv, deepSizeOf
+from ConvertOntology import Vocabulary, VocabUri, VocabNode, readVocabulary
+
+def readUninterned(csvtext):
+    """
+    Read a vocabulary with a new VocabUri or VocabNode for every occurrence,
+    as was done before Vocabulary.internUri/internNode were introduced.
+    """
+    internUri  = Vocabulary.internUri
+    internNode = Vocabulary.internNode
+    Vocabulary.internUri  = lambda self, t: VocabUri(self.getPrefixIndex(), t)
+    Vocabulary.internNode = lambda self, t: VocabNode(self.getPrefixIndex(), t)
+    try:
+        return readVocabulary(csv.reader(StringIO.StringIO(csvtext)))
+    finally:
+        Vocabulary.internUri  = internUri
+        Vocabulary.internNode = internNode
+
+def benchIntern(numclasses=20000):
+    csvtext = makeVocabularyCsv(numclasses=numclasses, numslots=5, numattrs=2)
+    rows    = csvtext.count("\n")
+    print "Synthetic vocabulary: %d classes, %d rows, %d bytes of CSV"%(numclasses, rows, len(csvtext))
+    print "%-12s %14s %12s"%("values", "bytes", "bytes/row")
+    plain    = deepSizeOf(readUninterned(csvtext))
+    print "%-12s %14d %12.1f"%("separate", plain, float(plain)/rows)
+    interned = deepSizeOf(readVocabulary(csv.reader(StringIO.StringIO(csvtext))))
+    print "%-12s %14d %12.1f"%("interned", interned, float(interned)/rows)
+    print "Saved %d bytes (%.1f%%)"%(plain-interned, (plain-interned)*100.0/plain)
+    return
+
+if __name__ == "__main__":
+    benchIntern()
+
+# End.
@@ -0,0 +1,105 @@
+# $Id: BenchLexer.py $
+#
+# Benchmark: per-row throughput of CSV cell lexing.
+#
+# Compares the precompiled VocabLexer functions with the previous path,
+# which compiled each pattern in the per-row and per-cell code and matched
+# value cells against several patterns in turn.
+#
+
+import sys
+import re
+
+from BenchUtils import makeVocabularyRows, makeVocabularyCsv, timeCall, csvReaderArgs
+from VocabLexer import *
+from ConvertOntology import readVocabulary
+
+def legacyLexUri(uritxt):
+    qname_pattern = re.compile("([-.\w]+):([-.\w]+)")
+    uri_pattern   = re.compile("<([^>]*)>")
+    mqname = qname_pattern.match(uritxt)
+    if mqname:
+        return (mqname.group(1), mqname.group(2))
+    muri = uri_pattern.match(uritxt)
+    if muri:
+        return muri.group(1)
+    return None
+
+def legacyLexNode(valtxt):
+    qname_pattern = re.compile("(\w+):(\w+)")
+    uri_pattern   = re.compile("<([^>]*)>")
+    mqname = qname_pattern.match(valtxt)
+    muri   = uri_pattern.match(valtxt)
+    if (not mqname) and (not muri):
+        return valtxt
+    return legacyLexUri(valtxt)
+
+def legacyLexRows(rows):
+    """
+    Lex rows using patterns compiled per cell, as readVocabulary used to
+    """
+    for row in rows:
+        row = (row+['','','','','','',''])[:7]
+        if row[0] == '@':
+            pref_pattern = re.compile("\s*([^:]*):?")
+            pref_pattern.match(row[2]).group(1)
+            continue
+        if row[1] != '':
+            legacyLexUri(row[1])
+        if row[2] != '':
+            prop_pattern = re.compile("\s*(\^)?\s*(.*)")
+            mprop = prop_pattern.match(row[2])
+            legacyLexUri(mprop.group(2))
+            slot_pattern = re.compile("\s*(([?1*+])\s*::)?\s*(<=)?\s*(.*)")
+            mslot = slot_pattern.match(row[3])
+            sval  = mslot.group(4)
+            if mslot.group(1) != None:
+                card  = mslot.group(2)
+                cmin  = 0
+                cmax  = sys.maxint
+                if card in "1+": cmin = 1
+                if card in "1?": cmax = 1
+                legacyLexUri(sval)
+            else:
+                legacyLexNode(sval)
+    return
+
+def lexRows(rows):
+    """
+    Lex rows using the precompiled VocabLexer functions
+    """
+    for row in rows:
+        row = (row+['','','','','','',''])[:7]
+        if row[0] == '@':
+            lexPrefixCell(row[2])
+            continue
+        if row[1] != '':
+            lexUriCell(row[1])
+        if row[2] != '':
+            (pinv, puri) = lexPropertyCell(row[2])
+            lexUriCell(puri)
+            (vkind, cmin, cmax, sval) = lexValueCell(row[3])
+            if vkind == VAL_SLOT:
+                lexUriCell(sval)
+            else:
+                lexNodeCell(sval)
+    return
+
+def benchLexer(numclasses=2000):
+    rows    = makeVocabularyRows(numclasses=numclasses)
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    nrows   = len(rows)
+    print "%-24s %10s %12s %14s"%("path", "rows", "time (s)", "rows/s")
+    for (name, func, args) in (
+            ("lexer, legacy",   legacyLexRows,  (rows,)),
+            ("lexer, compiled", lexRows,        (rows,)),
+            ("readVocabulary",  readVocabulary, csvReaderArgs(csvtext)),
+            ):
+        t = timeCall(func, args)
+        print "%-24s %10d %12.4f %14.0f"%(name, nrows, t, nrows/t)
+    return
+
+if __name__ == "__main__":
+    benchLexer()
+
+# End.
@@ -0,0 +1,70 @@
+# $Id: BenchLoader.py $
+#
+# Benchmark: loading a vocabulary split across files, a base vocabulary
+# imported by several part files that are all imported by a top file.
+# The whole vocabulary is loaded in one process and with worker processes,
+# and each part file is loaded in turn (as by a batch conversion), with
+# and without a cache of parsed files, so the base is parsed once.
+#
+
+import sys
+import os
+import shutil
+import tempfile
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from VocabLoader import VocabLoader
+from VocabCache import MemoryVocabCache
+
+def writeFile(path, text):
+    f = open(path, "wb")
+    f.write(text)
+    f.close()
+
+def makeVocabularyFiles(tmpdir, numparts, numclasses):
+    """
+    Write the base, part and top files, and return the part file paths.
+    """
+    writeFile(os.path.join(tmpdir, "base.csv"), makeVocabularyCsv(numclasses=numclasses))
+    parts = []
+    for i in range(numparts):
+        (headings, body) = makeVocabularyCsv(numclasses=numclasses).split("\n", 1)
+        # Part classes are distinct, and their slots use the base classes
+        body = body.replace(":Class", ":Part%dClass"%(i)).replace(":Type", ":Class")
+        parts.append(os.path.join(tmpdir, "part%d.csv"%(i)))
+        writeFile(parts[-1], headings+'\n"@","import","base.csv",,,,\n'+body)
+    writeFile(os.path.join(tmpdir, "top.csv"), "\n".join(
+        ['"f","c","p","v","label","descr","comment"'] +
+        [ '"@","import","part%d.csv",,,,'%(i) for i in range(numparts) ]) + "\n")
+    return parts
+
+def loadEach(loader, paths):
+    for p in paths:
+        loader.load(p)
+
+def benchLoader(numparts=4, numclasses=5000, workers=4):
+    tmpdir = tempfile.mkdtemp()
+    top    = os.path.join(tmpdir, "top.csv")
+    try:
+        parts = makeVocabularyFiles(tmpdir, numparts, numclasses)
+        print "Base and %d part files of %d classes each"%(numparts, numclasses)
+        print "%-34s %10s"%("load", "seconds")
+        print "%-34s %10.4f"%("top file, 1 process",
+            timeCall(VocabLoader(workers=1).load, (top,)))
+        print "%-34s %10.4f"%("top file, %d workers"%(workers),
+            timeCall(VocabLoader(workers=workers).load, (top,)))
+        def cachedLoader():
+            return (VocabLoader(workers=1, cache=MemoryVocabCache(numparts+2, "bench")), parts)
+        print "%-34s %10.4f"%("each part file, no cache",
+            timeCall(loadEach, (VocabLoader(workers=1), parts)))
+        print "%-34s %10.4f"%("each part file, cache",
+            timeCall(loadEach, cachedLoader))
+    finally:
+        shutil.rmtree(tmpdir)
+    return
+
+if __name__ == "__main__":
+    args = [ int(a) for a in sys.argv[1:4] ]
+    benchLoader(*args)
+
+# End.
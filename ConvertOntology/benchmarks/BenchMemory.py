@@ -0,0 +1,44 @@
+# $Id: BenchMemory.py $
+#
+# Benchmark: memory used by the parsed vocabulary object graph, in bytes
+# per input row.
+#
+# Usage:  python BenchMemory.py [dir ...]
+#
+# Each 'dir' is a directory containing a version of ConvertOntology.py to
+# measure (e.g. a checkout of an earlier revision); the default is the
+# current version.  Each version is measured in a separate process.
+#
+
+import sys
+import os
+import subprocess
+
+from BenchUtils import makeVocabularyCsv, deepSizeOf
+
+def measureMemory(numclasses):
+    """
+    Parse a synthetic vocabulary and print its size in bytes and rows
+    """
+    import csv
+    import StringIO
+    from ConvertOntology import readVocabulary
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    vocab   = readVocabulary(csv.reader(StringIO.StringIO(csvtext)))
+    print deepSizeOf(vocab), csvtext.count("\n")
+    return
+
+def benchMemory(dirs, numclasses=20000):
+    print "%-30s %10s %14s %12s"%("version", "rows", "bytes", "bytes/row")
+    for d in dirs:
+        cmd = ("import sys; sys.path.insert(0, %r); "
+               "import BenchMemory; BenchMemory.measureMemory(%d)")%(os.path.abspath(d), numclasses)
+        out = subprocess.Popen([sys.executable, "-c", cmd], stdout=subprocess.PIPE).communicate()[0]
+        (size, rows) = [ int(n) for n in out.split() ]
+        print "%-30s %10d %14d %12.1f"%(d, rows, size, float(size)/rows)
+    return
+
+if __name__ == "__main__":
+    benchMemory(sys.argv[1:] or [".."])
+
+# End.
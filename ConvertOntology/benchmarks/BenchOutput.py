@@ -0,0 +1,92 @@
+# $Id: BenchOutput.py $
+#
+# Benchmark: emitter output with different buffer sizes, written to a
+# file, a pipe and in-memory streams.
+#
+
+import sys
+import os
+import csv
+import StringIO
+import cStringIO
+import tempfile
+import threading
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from ConvertOntology import readVocabulary, emitSequence, EMITTERS
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class PipeSink:
+    """
+    Pipe to a thread that reads and discards its contents.  'bufsize' is
+    the buffering used for the writing end (0 makes each write a system
+    call, as for an unbuffered standard output stream).
+    """
+    def __init__(self, bufsize):
+        (r, w) = os.pipe()
+        self._reader = threading.Thread(target=self.drain, args=(r,))
+        self._reader.start()
+        self._stream = os.fdopen(w, "wb", bufsize)
+        self.write   = self._stream.write
+
+    def drain(self, r):
+        while os.read(r, 1<<16): pass
+        os.close(r)
+
+    def close(self):
+        self._stream.close()
+        self._reader.join()
+
+class FileSink:
+    def __init__(self, bufsize):
+        (fd, self._path) = tempfile.mkstemp()
+        os.close(fd)
+        self._stream = open(self._path, "wb", bufsize)
+        self.write   = self._stream.write
+
+    def close(self):
+        self._stream.close()
+        os.remove(self._path)
+
+class MemorySink:
+    def __init__(self, module):
+        self._stream = module.StringIO()
+        self.write   = self._stream.write
+
+    def close(self):
+        self._stream.close()
+
+SINKS = [
+    ("file",               lambda: FileSink(-1)),
+    ("file, unbuffered",   lambda: FileSink(0)),
+    ("pipe",               lambda: PipeSink(-1)),
+    ("pipe, unbuffered",   lambda: PipeSink(0)),
+    ("StringIO",           lambda: MemorySink(StringIO)),
+    ("cStringIO",          lambda: MemorySink(cStringIO)),
+    ]
+
+BUFFER_SIZES = [0, 4096, 65536, 1<<20]
+
+def emitTo(vocab, makesink, formats, bufsize):
+    sink     = makesink()
+    options  = BenchOptions(buffer_size=bufsize)
+    emitSequence(vocab.getSequence(), [ EMITTERS[f](sink, options) for f in formats ])
+    sink.close()
+
+def benchOutput(numclasses=5000, formats=("rdf",)):
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    vocab   = readVocabulary(csv.reader(StringIO.StringIO(csvtext)))
+    print "Output formats %s for %d classes"%(", ".join(formats), numclasses)
+    print "%-20s"%("sink")+"".join([ " %14s"%("buffer %d"%b) for b in BUFFER_SIZES ])
+    for (name, makesink) in SINKS:
+        times = [ timeCall(emitTo, (vocab, makesink, formats, b)) for b in BUFFER_SIZES ]
+        print "%-20s"%(name)+"".join([ " %14.4f"%t for t in times ])
+    return
+
+if __name__ == "__main__":
+    benchOutput(formats=sys.argv[1:] or ("rdf",))
+
+# End.
@@ -0,0 +1,74 @@
+# $Id: BenchOwlSize.py $
+#
+# Benchmark: size of the OWL RDF/XML output, and time to write it, with a
+# property declaration for each slot (as the OWL writer did previously)
+# and with one declaration for each property, with and without property
+# domains.  The vocabularies have a given fraction of their slot properties
+# shared by all classes (such as a name or description), while the other
+# properties are used by a single class.
+#
+
+import sys
+import csv
+import StringIO
+
+from BenchUtils import makeVocabularyRows, timeCall
+from ConvertOntology import OwlEmitter, readVocabulary, emitSequence
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class PerSlotOwlEmitter(OwlEmitter):
+    """
+    Declares the property used by each slot separately.
+    """
+    def addProperty(self, vclass, slot):
+        self._props.append((slot, self.isDatatypeSlot(slot), [ v for v in [slot.getLabel()] if v ],
+                            [ v for v in [slot.getDescription()] if v ], [vclass.getUriXml()]))
+
+def makeSharedCsv(numclasses, numslots, shared):
+    """
+    Return CSV text for a vocabulary in which the first 'shared' fraction of
+    the slots of each class use properties shared by all classes, and the
+    others use properties of their own.
+    """
+    rows = makeVocabularyRows(numclasses=numclasses, numslots=numslots, numprefixes=1)
+    c = -1
+    for r in rows:
+        if len(r) > 1 and r[1] != "":
+            c += 1
+        elif len(r) > 3 and " :: " in r[3]:
+            s = int(r[2].split(":slot")[1])
+            if s >= int(numslots*shared):
+                r[2] = r[2].replace(":slot", ":class%dslot"%(c))
+    buf = StringIO.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+def writeOwl(vocab, emitterclass, options):
+    out = StringIO.StringIO()
+    emitSequence(vocab.getSequence(), [emitterclass(out, options)])
+    return out.getvalue()
+
+def benchOwlSize(numclasses=1000, numslots=8, sharedfractions=(0.0, 0.25, 0.5, 1.0)):
+    print "%d classes of %d slots"%(numclasses, numslots)
+    print "%-8s %-22s %12s %8s %10s"%("shared", "declarations", "bytes", "size", "seconds")
+    for shared in sharedfractions:
+        vocab = readVocabulary(csv.reader(StringIO.StringIO(makeSharedCsv(numclasses, numslots, shared))))
+        base  = None
+        for (name, emitterclass, domains) in [ ("per slot", PerSlotOwlEmitter, False)
+                                             , ("per property", OwlEmitter, False)
+                                             , ("per property+domains", OwlEmitter, True) ]:
+            options = BenchOptions(property_domains=domains)
+            size    = len(writeOwl(vocab, emitterclass, options))
+            if base == None: base = size
+            secs    = timeCall(writeOwl, (vocab, emitterclass, options))
+            print "%-8.2f %-22s %12d %7.1f%% %10.4f"%(shared, name, size, size*100.0/base, secs)
+    return
+
+if __name__ == "__main__":
+    args = [ int(a) for a in sys.argv[1:3] ]
+    benchOwlSize(*args)
+
+# End.
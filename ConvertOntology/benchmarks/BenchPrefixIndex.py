@@ -0,0 +1,26 @@
+# $Id: BenchPrefixIndex.py $
+#
+# Benchmark: vocabulary parse time as the number of declared prefixes grows.
+#
+# With qnames resolved through Vocabulary.getPrefixIndex(), the time per
+# row should stay roughly constant as the prefix count increases.
+#
+
+import sys
+
+from BenchUtils import makeVocabularyCsv, timeCall, csvReaderArgs
+from ConvertOntology import readVocabulary
+
+def benchPrefixIndex(numclasses=200, prefixcounts=(1, 10, 50, 200, 1000)):
+    print "%10s %10s %12s %12s"%("prefixes", "rows", "parse (s)", "us/row")
+    for n in prefixcounts:
+        csvtext = makeVocabularyCsv(numclasses=numclasses, numprefixes=n)
+        rows    = csvtext.count("\n")
+        t       = timeCall(readVocabulary, csvReaderArgs(csvtext))
+        print "%10d %10d %12.4f %12.2f"%(n, rows, t, t*1000000.0/rows)
+    return
+
+if __name__ == "__main__":
+    benchPrefixIndex()
+
+# End.
@@ -0,0 +1,66 @@
+# $Id: BenchServer.py $
+#
+# Benchmark: time to convert a vocabulary by running the converter as a
+# new process, compared with a request to the conversion service, both
+# from this process and by running the client script as a new process;
+# service requests are timed for new content (a cache miss) and for
+# content converted before (a cache hit).
+#
+
+import sys
+import os
+import tempfile
+import threading
+import subprocess
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from ConvertServer import ConvertServer
+from ConvertClient import requestConversion
+
+SRCDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def runProcess(args):
+    subprocess.Popen([sys.executable]+args, stdout=open(os.devnull, "wb")).wait()
+
+def benchServer(sizes=(10, 1000, 10000), fmt="rdf"):
+    server = ConvertServer(("127.0.0.1", 0), BenchOptions(), threads=2, cachesize=8)
+    port   = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    print "Conversion to %s"%(fmt)
+    print "%-8s %12s %12s %12s %12s"%("classes", "process", "miss", "hit", "client hit")
+    try:
+        for numclasses in sizes:
+            csvtext = makeVocabularyCsv(numclasses=numclasses)
+            (fd, path) = tempfile.mkstemp(suffix=".csv")
+            os.write(fd, csvtext)
+            os.close(fd)
+            variants = []
+            def missArgs():
+                # Content differs by a trailing blank row each time
+                variants.append(csvtext+",,,,,,\n"*(len(variants)+1))
+                return (variants[-1], fmt, "127.0.0.1", port)
+            try:
+                print "%-8d %12.4f %12.4f %12.4f %12.4f"%(numclasses,
+                    timeCall(runProcess, ([os.path.join(SRCDIR, "ConvertOntology.py"),
+                                           "-f", fmt, path],)),
+                    timeCall(requestConversion, missArgs),
+                    timeCall(requestConversion, (csvtext, fmt, "127.0.0.1", port)),
+                    timeCall(runProcess, ([os.path.join(SRCDIR, "ConvertClient.py"),
+                                           "--port", str(port), "-f", fmt, path],)))
+            finally:
+                os.remove(path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    return
+
+if __name__ == "__main__":
+    benchServer([ int(a) for a in sys.argv[1:] ] or (10, 1000, 10000))
+
+# End.
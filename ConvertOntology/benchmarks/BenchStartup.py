@@ -0,0 +1,94 @@
+# $Id: BenchStartup.py $
+#
+# Benchmark: time from starting the converter as a new process to the
+# first byte of its output, for a small vocabulary, running
+# ConvertOntology.py directly and through the RunConvert.py launcher.
+# Times are also shown less the time for the interpreter to start and
+# write a byte, which is the cost of the converter's own start-up.
+#
+# Usage:  python BenchStartup.py [--classes N] [--repeat N] [--max-overhead SECONDS]
+#
+# The exit status is 1 if the start-up cost of RunConvert.py for any
+# format exceeds the --max-overhead threshold, so this can be used to
+# catch start-up regressions, e.g. a module imported where it is not used.
+#
+
+import sys
+import os
+import time
+import optparse
+import tempfile
+import compileall
+import subprocess
+
+from BenchUtils import makeVocabularyCsv
+
+SRCDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+FORMATS = [ ("rdf",       ["-r"])
+          , ("mediawiki", ["-m"])
+          , ("basecamp",  ["-b"])
+          , ("n3",        ["-n"])
+          , ("nt",        ["--ntriples", "--base", "http://example.org/"])
+          ]
+
+def timeFirstByte(args, repeat):
+    """
+    Run the Python interpreter with the supplied arguments, and return the
+    best time in seconds until the first byte of its output is received.
+    """
+    best = None
+    for i in range(repeat):
+        t0   = time.time()
+        proc = subprocess.Popen([sys.executable]+args, stdout=subprocess.PIPE)
+        proc.stdout.read(1)
+        t    = time.time() - t0
+        proc.stdout.read()
+        proc.wait()
+        if best == None or t < best: best = t
+    return best
+
+def benchStartup(numclasses=10, repeat=10, maxoverhead=0.030):
+    """
+    Print start-up times, and return True if each is within the threshold.
+    """
+    # Time the normal installed state, in which imported modules are compiled
+    compileall.compile_dir(SRCDIR, maxlevels=0, quiet=1)
+    (fd, path) = tempfile.mkstemp(suffix=".csv")
+    os.write(fd, makeVocabularyCsv(numclasses=numclasses))
+    os.close(fd)
+    ok = True
+    try:
+        base = timeFirstByte(["-c", "import sys; sys.stdout.write('x')"], repeat)
+        print "Time to first output byte, %d classes (interpreter alone %.4f)"%(numclasses, base)
+        print "%-20s %-10s %10s %10s"%("program", "format", "seconds", "start-up")
+        for (fmt, opts) in FORMATS:
+            for prog in ("ConvertOntology.py", "RunConvert.py"):
+                secs = timeFirstByte([os.path.join(SRCDIR, prog)]+opts+[path], repeat)
+                flag = ""
+                if prog == "RunConvert.py" and secs-base > maxoverhead:
+                    flag = "  exceeds %.4f"%(maxoverhead)
+                    ok   = False
+                print "%-20s %-10s %10.4f %10.4f%s"%(prog, fmt, secs, secs-base, flag)
+    finally:
+        os.remove(path)
+    return ok
+
+def getOptions(argv):
+    parser = optparse.OptionParser(usage="%prog [options]")
+    parser.add_option("--classes",      type="int",   default=10)
+    parser.add_option("--repeat",       type="int",   default=10)
+    parser.add_option("--max-overhead", type="float", default=0.030, dest="maxoverhead",
+                      metavar="SECONDS",
+                      help="Maximum start-up time of RunConvert.py, beyond that of the "\
+                           "interpreter (default %default)")
+    (options, args) = parser.parse_args(argv)
+    if args: parser.error("Unexpected arguments")
+    return options
+
+if __name__ == "__main__":
+    options = getOptions(sys.argv[1:])
+    if not benchStartup(options.classes, options.repeat, options.maxoverhead):
+        sys.exit(1)
+
+# End.
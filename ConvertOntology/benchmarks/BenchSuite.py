@@ -0,0 +1,231 @@
+# $Id: BenchSuite.py $
+#
+# Benchmark suite: time readVocabulary and each convertOntologyTo*
+# function on a synthetic vocabulary, and record throughput and peak
+# memory as CSV results that can be compared across runs.
+#
+# Usage:  python BenchSuite.py [options] [case ...]
+#         python BenchSuite.py --compare BASE.csv NEW.csv
+#
+# Cases are "read" (readVocabulary only) and the output format names
+# rdf, mediawiki, basecamp, n3 and nt (reading and conversion);  the
+# default is all of them.  Each case is run in a separate process, so
+# that its peak memory can be measured.  Peak memory is the growth of
+# the process's maximum resident set size while running the case, in
+# kilobytes (left blank where the resource module is not available).
+#
+# For example, to compare the current tree with an earlier result:
+#
+#   python BenchSuite.py --label r1024 --results base.csv
+#   ...change the converter...
+#   python BenchSuite.py --label new --results new.csv
+#   python BenchSuite.py --compare base.csv new.csv
+#
+
+import sys
+import os
+import csv
+import time
+import optparse
+import tempfile
+import subprocess
+
+from BenchUtils import makeVocabularyCsv, timeCall
+
+# Function used for each benchmark case, and whether it writes output
+CASES = [
+    ("read",      "readVocabulary",             False),
+    ("rdf",       "convertOntologyToOwl",       True),
+    ("mediawiki", "convertOntologyToMediaWiki", True),
+    ("basecamp",  "convertOntologyToBasecamp",  True),
+    ("n3",        "convertOntologyToTurtle",    True),
+    ("nt",        "convertOntologyToNTriples",  True),
+    ]
+
+# Parameters of the synthetic vocabulary, in results column order
+PARAMS = ["classes", "slots", "attrs", "prefixes", "commentlen", "urishare"]
+
+RESULT_COLUMNS = (["label", "time", "case"] + PARAMS +
+    ["rows", "input_bytes", "output_bytes", "seconds", "rows_per_sec", "bytes_per_sec", "peak_kb"])
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class ByteCounter:
+    """
+    Output stream that discards its contents, counting the bytes written.
+    """
+    def __init__(self):
+        self.bytes = 0
+    def write(self, text):
+        self.bytes += len(text)
+
+def maxResidentKb():
+    """
+    Return the maximum resident set size of this process so far, or None.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin": kb = kb/1024       # Reported in bytes
+    return kb
+
+def measureCase(case, csvpath, repeat):
+    """
+    Run one benchmark case on the CSV file, and print the number of rows,
+    input bytes, output bytes, best time and peak memory growth.  This is
+    called in a separate process for each case.
+    """
+    import StringIO
+    import ConvertOntology
+    csvtext  = open(csvpath, "rb").read()
+    [funcname, hasoutput] = [ (f, o) for (c, f, o) in CASES if c == case ][0]
+    func     = getattr(ConvertOntology, funcname)
+    counters = []
+    def args():
+        counters.append(ByteCounter())
+        reader = csv.reader(StringIO.StringIO(csvtext))
+        if hasoutput: return (reader, counters[-1], BenchOptions(base_uri="http://example.org/"))
+        return (reader,)
+    base = maxResidentKb()
+    secs = timeCall(func, args, repeat)
+    peak = maxResidentKb()
+    if base != None: peak = peak-base
+    print csvtext.count("\n"), len(csvtext), counters[-1].bytes, repr(secs), peak
+    return
+
+def runCase(case, csvpath, repeat):
+    """
+    Run a benchmark case in a new process, and return its results as a
+    tuple (rows, input_bytes, output_bytes, seconds, peak_kb).
+    """
+    cmd = ("import sys; sys.path.insert(0, %r); "
+           "import BenchSuite; BenchSuite.measureCase(%r, %r, %d)")%(
+           os.path.dirname(os.path.abspath(__file__)), case, csvpath, repeat)
+    out = subprocess.Popen([sys.executable, "-c", cmd], stdout=subprocess.PIPE).communicate()[0]
+    (rows, ibytes, obytes, secs, peak) = out.split()
+    if peak == "None":
+        peak = ""
+    else:
+        peak = int(peak)
+    return (int(rows), int(ibytes), int(obytes), float(secs), peak)
+
+def benchSuite(cases, params, repeat=3, label=""):
+    """
+    Run the benchmark cases on a synthetic vocabulary described by params
+    (a dictionary keyed by PARAMS), and return a list of result rows.
+    """
+    csvtext = makeVocabularyCsv(numclasses=params["classes"], numslots=params["slots"],
+                                numattrs=params["attrs"], numprefixes=params["prefixes"],
+                                commentlen=params["commentlen"], urishare=params["urishare"])
+    (fd, csvpath) = tempfile.mkstemp(suffix=".csv")
+    os.write(fd, csvtext)
+    os.close(fd)
+    results = []
+    try:
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        for case in cases:
+            (rows, ibytes, obytes, secs, peak) = runCase(case, csvpath, repeat)
+            results.append([label, now, case] + [ params[p] for p in PARAMS ] +
+                [ rows, ibytes, obytes, "%.4f"%secs,
+                  "%.0f"%(rows/secs), "%.0f"%(ibytes/secs), peak ])
+    finally:
+        os.remove(csvpath)
+    return results
+
+def writeResults(results, filename):
+    """
+    Write result rows as CSV to the named file (appending, with a header if
+    the file is new), or to stdout if no file name is given.
+    """
+    if not filename:
+        w = csv.writer(sys.stdout)
+        w.writerow(RESULT_COLUMNS)
+        w.writerows(results)
+        return
+    isnew = not os.path.exists(filename)
+    f = open(filename, "ab")
+    try:
+        w = csv.writer(f)
+        if isnew: w.writerow(RESULT_COLUMNS)
+        w.writerows(results)
+    finally:
+        f.close()
+    return
+
+def readResults(filename):
+    """
+    Return a dictionary of the last result in a results file for each
+    case and set of vocabulary parameters.
+    """
+    rows    = csv.reader(open(filename, "rb"))
+    columns = rows.next()
+    results = {}
+    for r in rows:
+        d = dict(zip(columns, r))
+        results[tuple([d["case"]] + [ d[p] for p in PARAMS ])] = d
+    return results
+
+def compareResults(basefile, newfile):
+    """
+    Print the ratio of time and peak memory for each case in a new results
+    file to that for the same case in a base results file.
+    """
+    base = readResults(basefile)
+    new  = readResults(newfile)
+    print "%-10s %-28s %10s %10s %7s %10s %10s %7s"%(
+        "case", "classes/slots/attrs/pre/com/uri",
+        "base s", "new s", "ratio", "base kb", "new kb", "ratio")
+    for key in sorted(new.keys()):
+        if key not in base: continue
+        (b, n) = (base[key], new[key])
+        (bs, ns) = (float(b["seconds"]), float(n["seconds"]))
+        mem = ""
+        if b["peak_kb"] and n["peak_kb"] and int(b["peak_kb"]) > 0:
+            mem = "%7.2f"%(float(n["peak_kb"])/int(b["peak_kb"]))
+        print "%-10s %-28s %10.4f %10.4f %7.2f %10s %10s %7s"%(
+            key[0], "/".join(key[1:]), bs, ns, ns/bs, b["peak_kb"], n["peak_kb"], mem)
+    return
+
+def getOptions(argv):
+    parser = optparse.OptionParser(
+                usage="%prog [options] [case ...]\n"\
+                      "       %prog --compare BASE.csv NEW.csv")
+    parser.add_option("--classes",        type="int",   default=5000)
+    parser.add_option("--slots",          type="int",   default=5)
+    parser.add_option("--attrs",          type="int",   default=2)
+    parser.add_option("--prefixes",       type="int",   default=3)
+    parser.add_option("--comment-length", type="int",   default=0, dest="commentlen")
+    parser.add_option("--uri-share",      type="float", default=0.0, dest="urishare",
+                      help="Fraction of values written as full <uri> references")
+    parser.add_option("--repeat",         type="int",   default=3)
+    parser.add_option("--label",          default="",
+                      help="Label recorded with each result, e.g. a revision number")
+    parser.add_option("--results",        default="", metavar="FILE",
+                      help="Append results to FILE (default: write to stdout)")
+    parser.add_option("--compare",        action="store_true", default=False,
+                      help="Compare two results files")
+    (options, args) = parser.parse_args(argv)
+    if options.compare:
+        if len(args) != 2: parser.error("--compare needs two results files")
+    else:
+        names = [ c for (c, f, o) in CASES ]
+        for a in args:
+            if a not in names: parser.error("Unknown case '%s'"%(a))
+        if not 0.0 <= options.urishare <= 1.0: parser.error("--uri-share must be 0.0 to 1.0")
+    return (options, args)
+
+if __name__ == "__main__":
+    (options, args) = getOptions(sys.argv[1:])
+    if options.compare:
+        compareResults(args[0], args[1])
+    else:
+        params  = dict([ (p, getattr(options, p)) for p in PARAMS ])
+        results = benchSuite(args or [ c for (c, f, o) in CASES ], params,
+                             repeat=options.repeat, label=options.label)
+        writeResults(results, options.results)
+
+# End.
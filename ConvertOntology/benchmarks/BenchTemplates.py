@@ -0,0 +1,62 @@
+# $Id: BenchTemplates.py $
+#
+# Benchmark: emitter output using the compiled default templates and a
+# full set of replacement templates read from a template file, and the
+# cost of a renderer call compared with applying a format string in line.
+#
+
+import sys
+import csv
+import StringIO
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from ConvertOntology import readVocabulary, emitSequence, EMITTERS
+from VocabTemplates import TemplateSet, readTemplates, writeTemplates
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+FORMATS = ["rdf", "mediawiki", "basecamp"]
+
+def emitTo(vocab, fmt, options):
+    emitSequence(vocab.getSequence(), [EMITTERS[fmt](StringIO.StringIO(), options)])
+
+def templateFileText(fmt):
+    buf = StringIO.StringIO()
+    writeTemplates(EMITTERS[fmt].getDefaultTemplates().getTemplates(), buf)
+    return buf.getvalue()
+
+def benchEmitters(numclasses):
+    print "Emitter output for %d classes"%(numclasses)
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    vocab   = readVocabulary(csv.reader(StringIO.StringIO(csvtext)))
+    print "%-12s %12s %12s"%("format", "default", "from file")
+    for fmt in FORMATS:
+        templates = readTemplates(StringIO.StringIO(templateFileText(fmt)))
+        t1 = timeCall(emitTo, (vocab, fmt, BenchOptions()))
+        t2 = timeCall(emitTo, (vocab, fmt, BenchOptions(templates=templates)))
+        print "%-12s %12.4f %12.4f"%(fmt, t1, t2)
+    return
+
+def inlineFormat(text, n):
+    for i in xrange(n):
+        text%("http://example.org/ns0#slot1", 1)
+
+def renderFormat(render, n):
+    for i in xrange(n):
+        render("http://example.org/ns0#slot1", 1)
+
+def benchRender(n=200000):
+    text   = EMITTERS["rdf"].getDefaultTemplates().getText("owl_class_slot_min")
+    render = TemplateSet([("t", text)]).t
+    print "Fill owl_class_slot_min %d times"%(n)
+    print "%-12s %12.4f"%("inline %", timeCall(inlineFormat, (text, n)))
+    print "%-12s %12.4f"%("renderer", timeCall(renderFormat, (render, n)))
+    return
+
+if __name__ == "__main__":
+    benchEmitters(int((sys.argv[1:] or [5000])[0]))
+    benchRender()
+
+# End.
@@ -0,0 +1,125 @@
+# $Id: BenchUtils.py $
+#
+# Support functions for ConvertOntology benchmarks
+#
+# Benchmarks are stand-alone scripts that are run from the benchmarks
+# directory, and print their results to stdout.
+#
+
+import sys
+import time
+import types
+import csv
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+
+def makeVocabularyRows(numclasses=100, numslots=5, numattrs=2, numprefixes=3,
+                       commentlen=0, urishare=0.0):
+    """
+    Return a list of CSV rows describing a synthetic vocabulary.
+
+    numclasses  is the number of new classes defined
+    numslots    is the number of slots for each class
+    numattrs    is the number of attributes for each class
+    numprefixes is the number of namespace prefixes declared; qnames in 
+                the vocabulary body are spread over all of them.
+    commentlen  is the length of the comment text on each class and slot
+                row (0 for no comments)
+    urishare    is the fraction (0.0 to 1.0) of attribute values that are
+                written as full <uri> references rather than qnames.  (Slot
+                value types are always qnames, as the OWL and wiki outputs
+                need a qname for them.)
+    """
+    rows = [["f","c","p","v","label","descr","comment"]]
+    prefixes = [ "ns%d"%(i) for i in range(numprefixes) ]
+    for pre in prefixes:
+        rows.append(["@","prefix",pre+":","<http://example.org/%s#>"%(pre),"","",""])
+    rows.append([])
+    comment = ("Comment text. "*(commentlen/14+1))[:commentlen]
+    values  = [0]           # Number of values written, for selecting <uri> forms
+    def value(pre, local):
+        n = values[0]
+        values[0] = n+1
+        if int((n+1)*urishare) > int(n*urishare):
+            return "<http://example.org/%s#%s>"%(pre, local)
+        return "%s:%s"%(pre, local)
+    for c in range(numclasses):
+        pre = prefixes[c % numprefixes]
+        rows.append(["+","%s:Class%d"%(pre,c),"","","Class %d"%(c),"Description of class %d"%(c),comment])
+        for a in range(numattrs):
+            apre = prefixes[(c+a) % numprefixes]
+            rows.append(["+","","%s:attr%d"%(apre,a),value(apre,"Value%d"%(a)),"","",""])
+        for s in range(numslots):
+            spre = prefixes[(c+s) % numprefixes]
+            rows.append(["+","","%s:slot%d"%(spre,s),"? :: %s:Type%d"%(spre,s),
+                         "Slot %d"%(s),"Description of slot %d"%(s),comment])
+        rows.append([])
+    return rows
+
+def makeVocabularyCsv(numclasses=100, numslots=5, numattrs=2, numprefixes=3,
+                      commentlen=0, urishare=0.0):
+    """
+    Return a string containing CSV text for a synthetic vocabulary;
+    see makeVocabularyRows for parameters.
+    """
+    buf = StringIO.StringIO()
+    csv.writer(buf).writerows(makeVocabularyRows(numclasses, numslots, numattrs, numprefixes,
+                                                 commentlen, urishare))
+    return buf.getvalue()
+
+def timeCall(func, args=(), repeat=3):
+    """
+    Call a function repeatedly with the supplied arguments, and return the 
+    best elapsed time in seconds.  If 'args' is a function, it is called 
+    before each timed call to obtain a fresh tuple of arguments.
+    """
+    best = None
+    for i in range(repeat):
+        a = args
+        if callable(args): a = args()
+        t0 = time.time()
+        func(*a)
+        t  = time.time() - t0
+        if best == None or t < best: best = t
+    return best
+
+def deepSizeOf(obj):
+    """
+    Return the approximate number of bytes used by an object and everything
+    reachable from it through instance attributes (including __slots__) and
+    container items.  Shared objects are counted once; classes, modules and
+    functions are not counted.
+    """
+    skip  = (type, types.ClassType, types.ModuleType, 
+             types.FunctionType, types.BuiltinFunctionType)
+    seen  = set()
+    size  = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, skip):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        if hasattr(o, "__dict__"):
+            stack.append(o.__dict__)
+        for c in getattr(type(o), "__mro__", ()):
+            for n in c.__dict__.get("__slots__", ()):
+                if hasattr(o, n):
+                    stack.append(getattr(o, n))
+    return size
+
+def csvReaderArgs(csvtext):
+    """
+    Return a function that returns a fresh CSV reader argument tuple for csvtext
+    """
+    return lambda: (csv.reader(StringIO.StringIO(csvtext)),)
+
+# End.
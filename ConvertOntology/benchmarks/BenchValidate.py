@@ -0,0 +1,48 @@
+# $Id: BenchValidate.py $
+#
+# Benchmark: validating a large vocabulary, compared with reading it.
+# The vocabulary defines the slot value types that it uses, and a number
+# of the slots have mistyped value types, each of which is reported.
+#
+
+import sys
+import csv
+import StringIO
+
+from BenchUtils import makeVocabularyRows, timeCall, csvReaderArgs
+from ConvertOntology import readVocabulary
+from VocabValidator import validateVocabulary
+
+def makeValidationCsv(numclasses, numtypos):
+    """
+    Return CSV text for a synthetic vocabulary with its slot value types
+    defined as classes, and 'numtypos' slot value types misspelt.
+    """
+    rows  = makeVocabularyRows(numclasses=numclasses)
+    types = sorted(set([ r[3].split(" :: ")[1] for r in rows if len(r) > 3 and " :: " in r[3] ]))
+    rows.extend([ ["+", t, "", "", "", "", ""] for t in types ])
+    slots = [ r for r in rows if len(r) > 3 and " :: " in r[3] ]
+    for i in range(numtypos):
+        r    = slots[i*len(slots)/numtypos]
+        r[3] = r[3].replace("Type", "Tpye")
+    buf = StringIO.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+def benchValidate(numclasses=12500, numtypos=100):
+    csvtext = makeValidationCsv(numclasses, numtypos)
+    rows    = csvtext.count("\n")
+    found   = len(validateVocabulary(*csvReaderArgs(csvtext)()))
+    assert found == numtypos, "%d problems found, expected %d"%(found, numtypos)
+    print "%d rows, %d problems"%(rows, found)
+    print "%-12s %10s %10s"%("pass", "seconds", "us/row")
+    for (name, func) in [("read", readVocabulary), ("validate", validateVocabulary)]:
+        t = timeCall(func, csvReaderArgs(csvtext))
+        print "%-12s %10.4f %10.2f"%(name, t, t*1000000.0/rows)
+    return
+
+if __name__ == "__main__":
+    args = [ int(a) for a in sys.argv[1:3] ]
+    benchValidate(*args)
+
+# End.
@@ -0,0 +1,57 @@
+# $Id: BenchWatch.py $
+#
+# Benchmark: reconversion with --watch after an edit to one class, an
+# edit to every class and a change of prefix, compared with converting
+# the file from scratch.  Each edit is made to a fresh watcher that has
+# already converted the original file.
+#
+
+import sys
+import os
+import shutil
+import tempfile
+
+from BenchUtils import makeVocabularyCsv, timeCall
+from WatchConvert import VocabWatcher
+
+class BenchOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+EDITS = [
+    ("from scratch", None),
+    ("one class",    lambda t: t.replace("Description of slot 1,", "Edited slot 1,", 1)),
+    ("every class",  lambda t: t.replace("Description of slot 1,", "Edited slot 1,")),
+    ("prefix",       lambda t: t.replace("/ns1#", "/ns1b#", 1)),
+    ]
+
+def writeFile(path, text):
+    f = open(path, "wb")
+    f.write(text)
+    f.close()
+
+def benchWatch(numclasses, formats=("rdf", "mediawiki")):
+    tmpdir  = tempfile.mkdtemp()
+    csvpath = os.path.join(tmpdir, "vocab.csv")
+    csvtext = makeVocabularyCsv(numclasses=numclasses)
+    options = BenchOptions(formats=[ (f, os.path.join(tmpdir, "out."+f)) for f in formats ])
+    print "Reconversion of %d classes to %s"%(numclasses, ", ".join(formats))
+    print "%-14s %10s"%("edit", "seconds")
+    try:
+        for (name, edit) in EDITS:
+            def setup():
+                writeFile(csvpath, csvtext)
+                watcher = VocabWatcher(csvpath, options)
+                if edit:
+                    watcher.convert()
+                    writeFile(csvpath, edit(csvtext))
+                return (watcher,)
+            print "%-14s %10.4f"%(name, timeCall(VocabWatcher.convert, setup))
+    finally:
+        shutil.rmtree(tmpdir)
+    return
+
+if __name__ == "__main__":
+    benchWatch(int((sys.argv[1:] or [5000])[0]))
+
+# End.
@@ -0,0 +1,3 @@
+rem make owl, wiki and basecamp files
+rem RunConvert.py -f rdf=FlyAtlas-Vocabulary.owl -f mediawiki=FlyAtlas-Vocabulary.wiki -f basecamp=FlyAtlas-Vocabulary.basecamp FlyAtlas-Vocabulary.csv
+RunConvert.py -f rdf=OpenDataForge-Vocabulary.owl -f mediawiki=OpenDataForge-Vocabulary.wiki -f basecamp=OpenDataForge-Vocabulary.basecamp OpenDataForge-Vocabulary.csv
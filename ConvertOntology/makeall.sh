@@ -0,0 +1,14 @@
+#!/bin/bash
+#
+# make owl, wiki and basecamp files from a single reading of the CSV file
+#
+
+if [[ "$1" == "" ]]; then
+    echo "Usage: $0 <filename>"
+    echo "  reads from <filename>.csv, writes to <filename>.owl, <filename>.wiki and <filename>.basecamp"
+    exit 1
+fi
+
+python RunConvert.py -f rdf=$1.owl -f mediawiki=$1.wiki -f basecamp=$1.basecamp $1.csv
+
+# End.
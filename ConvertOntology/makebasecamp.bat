@@ -1,3 +1,3 @@
 rem make owl files
-rem ConvertOntology.py -b FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.basecamp
-ConvertOntology.py -b OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.basecamp
+rem RunConvert.py -b FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.basecamp
+RunConvert.py -b OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.basecamp
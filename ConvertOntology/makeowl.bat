@@ -1,3 +1,3 @@
 rem make owl files
-rem ConvertOntology.py -r FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.owl
-ConvertOntology.py -r OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.owl
+rem RunConvert.py -r FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.owl
+RunConvert.py -r OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.owl
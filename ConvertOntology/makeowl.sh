@@ -9,6 +9,6 @@ if [[ "$1" == "" ]]; then
     exit 1
 fi
 
-python ConvertOntology.py -r $1.csv >$1.owl
+python RunConvert.py -r $1.csv >$1.owl
 
 # End.
@@ -1,3 +1,3 @@
 rem make owl files
-rem ConvertOntology.py -m FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.wiki
-ConvertOntology.py -m OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.wiki
+rem RunConvert.py -m FlyAtlas-Vocabulary.csv      >FlyAtlas-Vocabulary.wiki
+RunConvert.py -m OpenDataForge-Vocabulary.csv >OpenDataForge-Vocabulary.wiki
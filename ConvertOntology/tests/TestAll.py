@@ -0,0 +1,52 @@
+# $Id: TestAll.py $
+#
+# Unit testing for ConvertOntology and its supporting modules
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys, unittest, logging
+
+# Add main library directory to python path
+sys.path.append("..")
+sys.path.append("../..")
+
+import TestConvertOntology
+import TestVocabLexer
+import TestVocabCache
+import TestBatchConvert
+import TestOwlTriples
+import TestBufferedWriter
+import TestVocabTemplates
+import TestPhaseStats
+import TestMappedInput
+import TestWatchConvert
+import TestConvertServer
+import TestVocabConverter
+import TestVocabLoader
+import TestVocabValidator
+
+# Code to run unit tests from all test modules
+def getTestSuite(select="unit"):
+    suite = unittest.TestSuite()
+    suite.addTest(TestConvertOntology.getTestSuite(select=select))
+    suite.addTest(TestVocabLexer.getTestSuite(select=select))
+    suite.addTest(TestVocabCache.getTestSuite(select=select))
+    suite.addTest(TestBatchConvert.getTestSuite(select=select))
+    suite.addTest(TestOwlTriples.getTestSuite(select=select))
+    suite.addTest(TestBufferedWriter.getTestSuite(select=select))
+    suite.addTest(TestVocabTemplates.getTestSuite(select=select))
+    suite.addTest(TestPhaseStats.getTestSuite(select=select))
+    suite.addTest(TestMappedInput.getTestSuite(select=select))
+    suite.addTest(TestWatchConvert.getTestSuite(select=select))
+    suite.addTest(TestConvertServer.getTestSuite(select=select))
+    suite.addTest(TestVocabConverter.getTestSuite(select=select))
+    suite.addTest(TestVocabLoader.getTestSuite(select=select))
+    suite.addTest(TestVocabValidator.getTestSuite(select=select))
+    return suite
+
+from MiscLib import TestUtils
+
+if __name__ == "__main__":
+    TestUtils.runTests("TestAll", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,161 @@
+# $Id: TestBatchConvert.py $
+#
+# Unit testing for batch conversion of vocabulary files (BatchConvert.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from BatchConvert import *
+from TestConvertOntology import TestOptions
+
+class TestBatchConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        self.tmpdir   = tempfile.mkdtemp()
+        self.srcdir   = os.path.join(self.tmpdir, "src")
+        os.makedirs(os.path.join(self.srcdir, "sub"))
+        shutil.copy(self.testpath+"TestVocabulary.csv", os.path.join(self.srcdir, "a.csv"))
+        shutil.copy(self.testpath+"TestVocabulary.csv", os.path.join(self.srcdir, "sub", "b.csv"))
+        f = open(os.path.join(self.srcdir, "bad.csv"), "wb")
+        f.write('"f","c","p","v","label","descr","comment"\n,"pre:Class",,,"unterminated\0')
+        f.close()
+        open(os.path.join(self.srcdir, "notes.txt"), "wb").close()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        return
+
+    # Helpers
+
+    def srcPath(self, *names):
+        return os.path.join(self.srcdir, *names)
+
+    def readResource(self, name):
+        return open(self.testpath+name, "rb").read()
+
+    # Test cases
+
+    def testCollectVocabularies(self):
+        self.assertEqual(collectVocabularies(self.srcdir),
+            [ self.srcPath("a.csv"), self.srcPath("bad.csv"), self.srcPath("sub", "b.csv") ])
+        self.assertEqual(collectVocabularies(self.srcdir, recursive=False),
+            [ self.srcPath("a.csv"), self.srcPath("bad.csv") ])
+
+    def testMakeBatchJobs(self):
+        jobs = makeBatchJobs(self.srcdir, TestOptions(rdf=True, basecamp=True))
+        self.assertEqual(len(jobs), 3)
+        (csvpath, options) = jobs[2]
+        self.assertEqual(csvpath, self.srcPath("sub", "b.csv"))
+        self.assertEqual(options.rdf, False)
+        self.assertEqual(options.formats,
+            [ ("basecamp", self.srcPath("sub", "b.basecamp"))
+            , ("rdf",      self.srcPath("sub", "b.owl"))
+            ])
+        outdir = os.path.join(self.tmpdir, "out")
+        jobs = makeBatchJobs(self.srcdir, TestOptions(mediawiki=True), outdir)
+        self.assertEqual(jobs[2][1].formats, [ ("mediawiki", os.path.join(outdir, "sub", "b.wiki")) ])
+
+    def testMakeOutputDirs(self):
+        outdir = os.path.join(self.tmpdir, "out")
+        makeOutputDirs(makeBatchJobs(self.srcdir, TestOptions(rdf=True, n3=True), outdir))
+        self.assertTrue(os.path.isdir(os.path.join(outdir, "sub")))
+        makeOutputDirs(makeBatchJobs(self.srcdir, TestOptions(rdf=True), outdir))
+        self.assertEqual(sorted(os.listdir(outdir)), ["sub"])
+
+    def testConvertFile(self):
+        outfile = self.srcPath("a.owl")
+        (path, status, t, message) = convertFile(
+            (self.srcPath("a.csv"), TestOptions(formats=[("rdf", outfile)])))
+        self.assertEqual((path, status, message), (self.srcPath("a.csv"), 0, ""))
+        self.assertEqual(open(outfile, "rb").read(), self.readResource("TestVocabulary.owl"))
+
+    def testConvertFileError(self):
+        (path, status, t, message) = convertFile(
+            (self.srcPath("bad.csv"), TestOptions(formats=[("rdf", self.srcPath("bad.owl"))])))
+        self.assertEqual(status, 1)
+        self.assertEqual(message, "input line 2: line contains NUL")
+        (path, status, t, message) = convertFile(
+            (self.srcPath("none.csv"), TestOptions(formats=[("rdf", self.srcPath("none.owl"))])))
+        self.assertEqual(status, 1)
+        self.assert_("IOError" in message)
+
+    def testWriteBatchSummary(self):
+        opstr = StringIO.StringIO()
+        writeBatchSummary([ ("a.csv", 0, 0.25, ""), ("b.csv", 1, 0.5, "bad\ninput") ], opstr, 1.0)
+        self.assertEqual(opstr.getvalue(),
+            "   0.250s  ok      a.csv\n"
+            "   0.500s  FAILED  b.csv\n"
+            "          bad\n"
+            "          input\n"
+            "1 files converted, 1 failed, 0.750s total conversion time, 1.000s elapsed\n")
+
+    def testBatchConvert(self):
+        outdir  = os.path.join(self.tmpdir, "out")
+        results = batchConvert(self.srcdir, TestOptions(rdf=True, mediawiki=True), 
+                               workers=2, outdir=outdir)
+        self.assertEqual([ (p, s) for (p, s, t, m) in results ],
+            [ (self.srcPath("a.csv"), 0), (self.srcPath("bad.csv"), 1), (self.srcPath("sub", "b.csv"), 0) ])
+        for name in ("a", os.path.join("sub", "b")):
+            self.assertEqual(open(os.path.join(outdir, name+".owl"), "rb").read(),
+                             self.readResource("TestVocabulary.owl"))
+            self.assertEqual(open(os.path.join(outdir, name+".wiki"), "rb").read(),
+                             self.readResource("TestVocabulary.wiki"))
+
+    def testBatchConvertSerial(self):
+        results = batchConvert(self.srcdir, TestOptions(basecamp=True), workers=1)
+        self.assertEqual([ s for (p, s, t, m) in results ], [0, 1, 0])
+        self.assertEqual(open(self.srcPath("sub", "b.basecamp"), "rb").read(),
+                         self.readResource("TestVocabulary.basecamp"))
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testCollectVocabularies"
+            , "testMakeBatchJobs"
+            , "testMakeOutputDirs"
+            , "testConvertFile"
+            , "testConvertFileError"
+            , "testWriteBatchSummary"
+            ],
+        "component":
+            [ "testBatchConvert"
+            , "testBatchConvertSerial"
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestBatchConvert, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestBatchConvert", getTestSuite, sys.argv)
+
+# End.
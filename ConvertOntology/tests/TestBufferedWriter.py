@@ -0,0 +1,101 @@
+# $Id: TestBufferedWriter.py $
+#
+# Unit testing for buffered emitter output (BufferedWriter.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import unittest
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from BufferedWriter import *
+
+class CountingStream:
+    def __init__(self):
+        self.writes = []
+    def write(self, text):
+        self.writes.append(text)
+
+class TestBufferedWriter(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    # Test cases
+
+    def testBuffered(self):
+        s = CountingStream()
+        w = BufferedWriter(s, 10)
+        w.write("abcd")
+        w.write("efgh")
+        self.assertEqual(s.writes, [])
+        self.assertEqual(w.getBytesWritten(), 8)
+        w.write("ijkl")
+        self.assertEqual(s.writes, ["abcdefghijkl"])
+        w.write("mn")
+        w.flush()
+        w.flush()
+        self.assertEqual(s.writes, ["abcdefghijkl", "mn"])
+        self.assertEqual(w.getBytesWritten(), 14)
+
+    def testUnbuffered(self):
+        s = CountingStream()
+        w = BufferedWriter(s, 0)
+        w.write("abcd")
+        w.write("efgh")
+        self.assertEqual(s.writes, ["abcd", "efgh"])
+        w.flush()
+        self.assertEqual(s.writes, ["abcd", "efgh"])
+        self.assertEqual(w.getBytesWritten(), 8)
+
+    def testDefault(self):
+        s = StringIO.StringIO()
+        w = BufferedWriter(s)
+        self.assertEqual(w.getBufferSize(), DEFAULT_BUFFER_SIZE)
+        self.assert_(w.getStream() is s)
+        w.write("x"*DEFAULT_BUFFER_SIZE)
+        self.assertEqual(len(s.getvalue()), DEFAULT_BUFFER_SIZE)
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testBuffered"
+            , "testUnbuffered"
+            , "testDefault"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestBufferedWriter, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestBufferedWriter", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,564 @@
+# $Id: TestConvertOntology.py $
+#
+# Unit testing for vocabulary reading and conversion (ConvertOntology.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import csv
+import logging
+import StringIO
+import cPickle
+import subprocess
+
+sys.path.append("..")
+sys.path.append("../..")
+import ConvertOntology
+from ConvertOntology import *
+from PhaseStats import PhaseStats
+from MappedInput import mapInput
+
+class TestOptions:
+    """
+    Stand-in for the options value returned by getOptions
+    """
+    def __init__(self, **kwargs):
+        self.mediawiki = False
+        self.basecamp  = False
+        self.rdf       = False
+        self.n3        = False
+        self.nt        = False
+        self.__dict__.update(kwargs)
+
+class TestConvertOntology(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        return
+
+    def tearDown(self):
+        return
+
+    # Helpers
+
+    def openReader(self, name="TestVocabulary.csv"):
+        return csv.reader(open(self.testpath+name, "rb"))
+
+    def readResource(self, name):
+        return open(self.testpath+name, "rb").read()
+
+    def convert(self, name="TestVocabulary.csv", **kwargs):
+        opstr = StringIO.StringIO()
+        status = convertOntology(open(self.testpath+name, "rb"), opstr, TestOptions(**kwargs))
+        self.assertEqual(status, 0)
+        return opstr.getvalue()
+
+    # Test cases
+
+    def testReadVocabulary(self):
+        testReadVocabulary()
+
+    def testReadVocabularyEvents(self):
+        events = [ (e,l) for (e,i,l) in readVocabularyEvents(self.openReader()) ]
+        expect = [ (EV_HEADINGS,1), (EV_BLANK,2)
+                 , (EV_PREFIX,3), (EV_PREFIX,4), (EV_PREFIX,5), (EV_BLANK,6)
+                 , (EV_CLASS_START,7), (EV_ATTR,7), (EV_ATTR,8), (EV_BLANK,9)
+                 , (EV_CLASS_END,10), (EV_CLASS_START,10), (EV_ATTR,11)
+                 , (EV_SLOT,12), (EV_SLOT,13), (EV_SLOT,14), (EV_SLOT,15)
+                 , (EV_ASSERTION,16), (EV_BLANK,17)
+                 , (EV_CLASS_END,18), (EV_CLASS_START,18)
+                 , (EV_ATTR,19), (EV_ATTR,20), (EV_ATTR,22), (EV_BLANK,23)
+                 , (EV_CLASS_END,24), (EV_CLASS_START,24), (EV_SLOT,24)
+                 , (EV_CLASS_END,24)
+                 ]
+        self.assertEqual(events, expect)
+
+    def testReadVocabularyEventsPrefixes(self):
+        vocab = Vocabulary()
+        for (e,i,l) in readVocabularyEvents(self.openReader(), vocab):
+            if e == EV_CLASS_START:
+                self.assertEqual(len(vocab.getPrefixes()), 3)
+        self.assertEqual(vocab.getClasses(), [])
+
+    def testReadVocabularySequence(self):
+        vocab = readVocabulary(self.openReader())
+        seq   = list(readVocabularySequence(self.openReader()))
+        self.assertEqual(len(seq), len(vocab.getSequence()))
+        for (sval,vval) in zip(seq, vocab.getSequence()):
+            self.assertEqual(type(sval), type(vval))
+            if isinstance(vval, VocabClass):
+                self.assertEqual(sval.getUri(), vval.getUri())
+                self.assertEqual(len(sval.getAttrs()), len(vval.getAttrs()))
+                self.assertEqual(len(sval.getSlots()), len(vval.getSlots()))
+                self.assertEqual(sval.getComment(), vval.getComment())
+
+    def testReadVocabularySequenceComplete(self):
+        # Trailing comment row must be attached before the class is returned
+        seq = list(readVocabularySequence(self.openReader()))
+        ctype = [ i for i in seq if isinstance(i, VocabClass) ][2]
+        self.assertEqual(ctype.getAttr(1).getComment(),
+            ["type value2 comment", "type value2 more comment"])
+
+    def testReadVocabularySequenceBounded(self):
+        # Interned values do not accumulate while a sequence is streamed
+        rows  = ['"f","c","p","v"\n', '"@","prefix","ex:","<http://example.org/>"\n']
+        for i in range(3000):
+            rows.append('"+","ex:Class%d","ex:prop%d","1 :: ex:Type%d"\n'%(i, i, i))
+        vocab = Vocabulary()
+        most  = 0
+        count = 0
+        for item in readVocabularySequence(csv.reader(rows), vocab):
+            most   = max(most, len(vocab._uricache)+len(vocab._nodecache))
+            count += isinstance(item, VocabClass)
+        self.assertEqual(count, 3000)
+        self.assert_(most <= ConvertOntology.STREAM_INTERN_LIMIT+3, most)
+        self.assert_(vocab.internUri("ex:Class1") is vocab.internUri("ex:Class1"))
+
+    def testInternUri(self):
+        vocab = readVocabulary(self.openReader())
+        c1    = vocab.getClass(1)
+        self.assert_(vocab.internUri("pre:slot1") is vocab.internUri("pre:slot1"))
+        self.assert_(vocab.internUri("pre:type1") is c1.getSlot(0)._valtype)
+        self.assert_(vocab.getClass(0).getAttr(0)._uri is vocab.getClass(0).getAttr(1)._uri)
+        self.assert_(vocab.internNode("value1") is vocab.getClass(2).getAttr(0)._value)
+        self.assert_(vocab.internNode("pre:val") is not vocab.internUri("pre:val"))
+        self.assertEqual(vocab.internUri("pre:type1").getUri(), "prefix#type1")
+
+    def testInternUriImmutable(self):
+        vocab = readVocabulary(self.openReader())
+        u     = vocab.internUri("pre:slot1")
+        self.assertRaises(ValueError, u.setUri, vocab.getPrefixIndex(), "pre:other")
+        n     = vocab.internNode("value1")
+        self.assertRaises(ValueError, n.setUri, vocab.getPrefixIndex(), "value2")
+        self.assertEqual(u.getUri(),   "prefix#slot1")
+        self.assertEqual(n.getValue(), "value1")
+
+    def testCompactElements(self):
+        vocab = readVocabulary(self.openReader())
+        c1    = vocab.getClass(1)
+        for e in [vocab.getPrefix(0), c1, c1.getAttr(0), c1.getSlot(3), 
+                  c1.getSlot(3).getAssertion(0), c1._uri, c1.getAttr(0)._value]:
+            self.assertFalse(hasattr(e, "__dict__"), "%s has __dict__"%(type(e).__name__))
+        self.assertEqual(c1.getSlot(0).getAssertions(), [])
+        self.assertEqual(vocab.getClass(0).getComment(), [])
+
+    def testVocabularyIndexes(self):
+        vocab = readVocabulary(self.openReader())
+        (c0, c1, c2, c3) = vocab.getClasses()
+        self.assert_(vocab.getClassByUri("prefix#Class") is c1)
+        self.assertEqual(vocab.getClassByUri("prefix#Other"), None)
+        self.assertEqual(vocab.getSlotsByProperty("prefix#slot2"), [(c1, c1.getSlot(1))])
+        self.assertEqual(vocab.getSlotsByProperty("prefix#prop"), [])
+        self.assertEqual(vocab.getAttrsByProperty("prefix#prop"), [(c1, c1.getAttr(0))])
+        self.assertEqual(len(vocab.getAttrsByProperty("http://www.w3.org/2000/01/rdf-schema#seeAlso")), 2)
+        self.assertEqual(vocab.getSlotsByValueType("prefix#s.s-s"), [(c3, c3.getSlot(0))])
+        self.assertEqual(vocab.getClassesByValueType("prefix#type3"), [c1])
+        # Classes, slots and attributes added after the indexes are built
+        c4 = VocabClass(vocab, True, "pre:Class4")
+        c1.addSlot(VocabSlot(vocab, True, False, "pre:slot5", 0, 1, "pre:type3"))
+        vocab.addClass(c4)
+        c4.addSlot(VocabSlot(vocab, True, False, "pre:slot1", 1, 1, "pre:type3"))
+        self.assert_(vocab.getClassByUri("prefix#Class4") is c4)
+        self.assertEqual(vocab.getSlotsByProperty("prefix#slot1"), 
+                         [(c1, c1.getSlot(0)), (c4, c4.getSlot(0))])
+        self.assertEqual(vocab.getSlotsByProperty("prefix#slot5"), [(c1, c1.getSlot(4))])
+        self.assertEqual(vocab.getClassesByValueType("prefix#type3"), [c1, c4])
+
+    def testVocabularySubclasses(self):
+        text  = ( '"f","c","p","v","label","descr","comment"\n'
+                  '"@","prefix","rdfs:","<http://www.w3.org/2000/01/rdf-schema#>",,,\n'
+                  '"@","prefix","ex:","<http://example.org/>",,,\n'
+                  '"+","ex:Animal",,,,,\n'
+                  '"+",,"^ rdfs:subClassOf","ex:Fish",,,\n'
+                  '"+","ex:Dog",,,,,\n'
+                  '"+",,"rdfs:subClassOf","ex:Animal",,,\n'
+                  '"+","ex:Cat",,,,,\n'
+                  '"+",,"rdfs:subClassOf","ex:Animal",,,\n'
+                  '"+",,"rdfs:subClassOf","""not a class""",,,\n'
+                  ',"ex:Fish",,,,,\n'
+                  ',,"rdfs:subClassOf","ex:Animal",,,\n' )
+        vocab = readVocabulary(csv.reader(StringIO.StringIO(text)))
+        self.assertEqual(vocab.getSubclasses("http://example.org/Animal"),
+            ["http://example.org/Fish", "http://example.org/Dog", "http://example.org/Cat"])
+        self.assertEqual(vocab.getSubclasses("http://example.org/Dog"), [])
+        # Indexes of a merged vocabulary cover the classes of both
+        other = Vocabulary()
+        other.addPrefix("ex", "<http://example.org/>", "", "", "")
+        other.addClass(VocabClass(other, True, "ex:Puppy"))
+        other.getClass(0).addAttr(VocabAttr(other, True, False, 
+            "<http://www.w3.org/2000/01/rdf-schema#subClassOf>", "ex:Dog"))
+        vocab.mergeVocabulary(other)
+        self.assertEqual(vocab.getSubclasses("http://example.org/Dog"), ["http://example.org/Puppy"])
+        self.assert_(vocab.getClassByUri("http://example.org/Puppy") is other.getClass(0))
+
+    def testConvertOwl(self):
+        self.assertEqual(self.convert(rdf=True), self.readResource("TestVocabulary.owl"))
+
+    def testOwlPropertyDeclarations(self):
+        text = ( '"f","c","p","v","label","descr","comment"\n'
+                 '"@","prefix","xsd:","<http://www.w3.org/2001/XMLSchema#>",,,\n'
+                 '"@","prefix","ex:","<http://example.org/>",,,\n'
+                 '"+","ex:Dog",,,,,\n'
+                 '"+",,"ex:name","1 :: xsd:string","name","The name",\n'
+                 '"+",,"ex:owner","? :: ex:Person","owner",,\n'
+                 '"+","ex:Cat",,,,,\n'
+                 '"+",,"ex:name","1 :: xsd:string","name","The name used",\n'
+                 '"+",,"ex:owner","? :: ex:Person","keeper",,\n'
+                 '"+","ex:Person",,,,,\n'
+                 '"+",,"ex:name","1 :: xsd:string","name",,\n' )
+        def convert(**kwargs):
+            opstr = StringIO.StringIO()
+            self.assertEqual(convertOntology(StringIO.StringIO(text), opstr, TestOptions(rdf=True, **kwargs)), 0)
+            return opstr.getvalue()
+        out = convert()
+        self.assertEqual(out.count('<owl:DatatypeProperty rdf:about="&ex;name">'), 1)
+        self.assertEqual(out.count('<owl:ObjectProperty rdf:about="&ex;owner">'), 1)
+        expect = ( '    <owl:ObjectProperty rdf:about="&ex;owner">\n'
+                   '        <rdfs:label>owner</rdfs:label>\n'
+                   '        <rdfs:label>keeper</rdfs:label>\n'
+                   '    </owl:ObjectProperty>\n' )
+        self.assert_(expect in out, out)
+        self.assertEqual(out.count("<rdfs:label>name</rdfs:label>"), 1)
+        self.assertEqual(out.count(">The name</rdfs:comment>"), 1)
+        self.assertEqual(out.count(">The name used</rdfs:comment>"), 1)
+        self.assert_("rdfs:domain" not in out)
+        # Class restrictions are unchanged
+        self.assertEqual(out.count('<owl:onProperty rdf:resource="&ex;name"/>'), 6)
+        out = convert(property_domains=True)
+        expect = ( '        <rdfs:label>keeper</rdfs:label>\n'
+                   '        <rdfs:domain>\n'
+                   '            <owl:Class>\n'
+                   '                <owl:unionOf rdf:parseType="Collection">\n'
+                   '                    <owl:Class rdf:about="&ex;Dog"/>\n'
+                   '                    <owl:Class rdf:about="&ex;Cat"/>\n'
+                   '                </owl:unionOf>\n'
+                   '            </owl:Class>\n'
+                   '        </rdfs:domain>\n'
+                   '    </owl:ObjectProperty>\n' )
+        self.assert_(expect in out, out)
+        self.assertEqual(convert(property_domains=True).count("<owl:Class rdf:about=\"&ex;Person\"/>"), 1)
+
+    def testConvertMediaWiki(self):
+        self.assertEqual(self.convert(mediawiki=True), self.readResource("TestVocabulary.wiki"))
+
+    def testConvertBasecamp(self):
+        self.assertEqual(self.convert(basecamp=True), self.readResource("TestVocabulary.basecamp"))
+
+    def testConvertTurtle(self):
+        self.assertEqual(self.convert(n3=True), self.readResource("TestVocabulary.n3"))
+
+    def testTurtlePrefixes(self):
+        opstr = StringIO.StringIO()
+        vocab = Vocabulary()
+        e = TurtleEmitter(opstr, TestOptions())
+        e.writeStart()
+        e.writePrefix(vocab.addPrefix("owl", "<http://example.org/owl#>", "", "", ""))
+        e.writePrefix(vocab.addPrefix("ex", "<http://example.org/>", "", "", ""))
+        e.writePrefix(vocab.addPrefix("ex", "<http://example.org/other/>", "", "", ""))
+        e.writePrefix(vocab.addPrefix("1x", "<http://example.org/1x/>", "", "", ""))
+        c = VocabClass(vocab, True, "ex:Class", 'a "quoted"\nlabel')
+        c.addAttr(VocabAttr(vocab, True, False, "owl:prop", "ex:local."))
+        c.addAttr(VocabAttr(vocab, True, False, "1x:prop", "<http://example.org/a b>"))
+        e.writeClass(c)
+        e.writeEnd()
+        e.flush()
+        out = opstr.getvalue()
+        self.assertEqual(out.count("@prefix owl:"), 1)
+        self.assertEqual(out.count("@prefix ex:"), 1)
+        self.assert_("@prefix 1x:" not in out)
+        expect = ( '\nex:Class\n'
+                   '    a owl:Class ;\n'
+                   '    rdfs:label "a \\"quoted\\"\\nlabel" ;\n'
+                   '    <http://example.org/owl#prop> <http://example.org/local.> ;\n'
+                   '    <http://example.org/1x/prop> <http://example.org/a\\u0020b> .\n'
+                 )
+        self.assert_(out.endswith(expect), out)
+
+    def testConvertNTriples(self):
+        out = self.convert(nt=True, base_uri="http://example.org/base/")
+        self.assertEqual(out, self.readResource("TestVocabulary.nt"))
+
+    def testNTriplesRelative(self):
+        # N-Triples cannot have relative URI references
+        for base in ("", "base/"):
+            opstr = StringIO.StringIO()
+            e = NTriplesEmitter(opstr, TestOptions(base_uri=base))
+            self.assertRaises(ValueError, e.writeStart)
+            self.assertEqual(opstr.getvalue(), "")
+        e = NTriplesEmitter(StringIO.StringIO(), TestOptions())
+        self.assertRaises(ValueError, e.formatTerm, uriTerm("prefix#slot1"), [])
+        self.assertEqual(e.formatTerm(uriTerm("urn:x:slot1"), []), "<urn:x:slot1>")
+        self.assertTrue(isAbsoluteIri("http://example.org/"))
+        self.assertFalse(isAbsoluteIri("#"))
+
+    def testBufferedOutput(self):
+        opstr = StringIO.StringIO()
+        e = MediaWikiEmitter(opstr, TestOptions(buffer_size=1000))
+        e.writeStart()
+        e.writeBlank()
+        self.assertEqual(opstr.getvalue(), "")
+        e.flush()
+        self.assertEqual(opstr.getvalue(), e.wiki_preamble+e.wiki_blank)
+        for size in (0, 1, 100000):
+            self.assertEqual(self.convert(rdf=True, buffer_size=size), 
+                             self.readResource("TestVocabulary.owl"))
+
+    def testCustomTemplates(self):
+        templates = [ ("wiki_preamble", "{|\n"), ("wiki_postamble", "|}\n"), ("owl_other", "") ]
+        out = self.convert(mediawiki=True, templates=templates)
+        ref = self.readResource("TestVocabulary.wiki")
+        self.assertEqual(out, "{|\n"+ref[len(MediaWikiEmitter.wiki_preamble):-len("|}\n\n")]+"|}\n")
+        self.assertEqual(self.convert(rdf=True, templates=templates), self.readResource("TestVocabulary.owl"))
+        self.assertRaises(ValueError, MediaWikiEmitter, StringIO.StringIO(), 
+                          TestOptions(templates=[("wiki_prefix", "%s")]))
+
+    def testConvertMapped(self):
+        ipstr  = mapInput(open(self.testpath+"TestVocabulary.csv", "rb"))
+        opstr  = StringIO.StringIO()
+        status = convertOntology(ipstr, opstr, TestOptions(rdf=True))
+        ipstr.close()
+        self.assertEqual(status, 0)
+        self.assertEqual(opstr.getvalue(), self.readResource("TestVocabulary.owl"))
+
+    def testGetOutputFormats(self):
+        self.assertEqual(getOutputFormats(TestOptions(rdf=True)), [("rdf","")])
+        self.assertEqual(getOutputFormats(TestOptions(rdf=True, formats=[("basecamp","b.txt")])), 
+                         [("rdf",""), ("basecamp","b.txt")])
+
+    def testConvertMultipleFormats(self):
+        # Input stream can be read only once, so all outputs come from one parse
+        tmpdir = tempfile.mkdtemp()
+        try:
+            owlfile  = os.path.join(tmpdir, "out.owl")
+            wikifile = os.path.join(tmpdir, "out.wiki")
+            out = self.convert(basecamp=True, formats=[("rdf",owlfile), ("mediawiki",wikifile)])
+            self.assertEqual(out, self.readResource("TestVocabulary.basecamp"))
+            self.assertEqual(open(owlfile,"rb").read(),  self.readResource("TestVocabulary.owl"))
+            self.assertEqual(open(wikifile,"rb").read(), self.readResource("TestVocabulary.wiki"))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testConvertCached(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            # Cold: vocabulary is read and saved
+            out = self.convert(rdf=True, cache_dir=tmpdir)
+            self.assertEqual(out, self.readResource("TestVocabulary.owl"))
+            self.assertEqual(len(os.listdir(tmpdir)), 1)
+            # Warm: input is not parsed again
+            reader = ConvertOntology.readVocabulary
+            ConvertOntology.readVocabulary = None
+            try:
+                out = self.convert(rdf=True, mediawiki=True, cache_dir=tmpdir)
+            finally:
+                ConvertOntology.readVocabulary = reader
+            self.assertEqual(out, self.readResource("TestVocabulary.wiki")+
+                                  self.readResource("TestVocabulary.owl"))
+            # Cleared
+            self.assertEqual(self.convert(cache_dir=tmpdir, clear_cache=True), "")
+            self.assertEqual(os.listdir(tmpdir), [])
+            # Bypassed: nothing is saved
+            out = self.convert(basecamp=True, cache_dir=tmpdir, no_cache=True)
+            self.assertEqual(out, self.readResource("TestVocabulary.basecamp"))
+            self.assertEqual(os.listdir(tmpdir), [])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testConvertStats(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            for cachedir in (None, tmpdir, tmpdir):
+                stats  = PhaseStats()
+                n3file = os.path.join(tmpdir, "out.n3")
+                out = self.convert(rdf=True, formats=[("n3",n3file)], cache_dir=cachedir, stats=stats)
+                self.assertEqual(out, self.readResource("TestVocabulary.owl"))
+                self.assertEqual(open(n3file,"rb").read(), self.readResource("TestVocabulary.n3"))
+                os.remove(n3file)
+                phases = stats.getPhases()
+                for p in ("rdf writeClass", "n3 writeClass", "rdf writeEnd", "output flush"):
+                    self.assert_(p in phases, p)
+                self.assertEqual(stats.getPhase("rdf writeClass")[0], 4)
+                self.assertEqual(stats.getCount("classes"), 4)
+                self.assertEqual(stats.getCount("slots"), 5)
+                self.assertEqual(stats.getCount("assertions"), 1)
+                self.assertEqual(stats.getCount("bytes written"), 
+                                 len(out)+len(self.readResource("TestVocabulary.n3")))
+                if "cache load" not in phases or stats.getPhase("model building")[0]:
+                    self.assert_("csv tokenizing" in phases)
+                    self.assert_("prefix resolution" in phases)
+                    self.assertEqual(stats.getCount("rows"), 24)
+            # Cache entry was saved by the second conversion and used by the third
+            self.assertEqual(len(os.listdir(tmpdir)), 1)
+            self.assert_("model building" not in phases)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testInstrumentReader(self):
+        # The vocabulary read is not changed by timing, and can be saved
+        stats = PhaseStats()
+        (reader, timed) = instrumentReader(stats, self.openReader())
+        self.assert_(readVocabulary(reader, timed) is timed)
+        vocab = timed.vocab
+        self.assertEqual(vocab.__class__, Vocabulary)
+        self.assertFalse("internUri" in vocab.__dict__ or "internNode" in vocab.__dict__)
+        self.assertEqual(len(vocab.getClasses()), 4)
+        self.assert_(stats.getPhase("prefix resolution")[0] > 0)
+        copy = cPickle.loads(cPickle.dumps(vocab, 2))
+        self.assertEqual(copy.getClass(1).getUri(), vocab.getClass(1).getUri())
+
+    def testTracing(self):
+        class Collect(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.records = []
+            def emit(self, record):
+                self.records.append(record)
+        h   = Collect()
+        log = logging.getLogger("ConvertOntology")
+        log.addHandler(h)
+        level = log.level
+        log.setLevel(logging.DEBUG)
+        try:
+            self.convert(mediawiki=True)
+            self.assertEqual(h.records, [])
+            setTracing(True)
+            self.convert(mediawiki=True)
+            names = set([ r.name for r in h.records ])
+            self.assertEqual(names, set(["ConvertOntology.VocabUri", "ConvertOntology.VocabNode",
+                                         "ConvertOntology.readVocabulary"]))
+        finally:
+            setTracing(False)
+            log.setLevel(level)
+            log.removeHandler(h)
+
+    def testConvertCsvError(self):
+        opstr = StringIO.StringIO()
+        ipstr = StringIO.StringIO('"f","c","p","v","label","descr","comment"\n'
+                                  ',"pre:Class",,,"unterminated\0')
+        stderr = sys.stderr
+        sys.stderr = StringIO.StringIO()
+        try:
+            status = convertOntology(ipstr, opstr, TestOptions(mediawiki=True))
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(status, 1)
+
+    def runPython(self, args, env=None):
+        proc = subprocess.Popen([sys.executable]+args, stdout=subprocess.PIPE, env=env)
+        out  = proc.communicate()[0]
+        self.assertEqual(proc.returncode, 0)
+        return out
+
+    def testRunConvert(self):
+        out = self.runPython(["../RunConvert.py", "-r", self.testpath+"TestVocabulary.csv"])
+        self.assertEqual(out, self.readResource("TestVocabulary.owl"))
+
+    def testRunConvertUncached(self):
+        # No cache is used or written unless a cache directory is given
+        tmpdir = tempfile.mkdtemp()
+        try:
+            env = dict(os.environ, HOME=tmpdir)
+            out = self.runPython(["../ConvertOntology.py", "-r", self.testpath+"TestVocabulary.csv"], env)
+            self.assertEqual(out, self.readResource("TestVocabulary.owl"))
+            self.assertEqual(os.listdir(tmpdir), [])
+            proc = subprocess.Popen([sys.executable, "../ConvertOntology.py", "--clear-cache"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+            err  = proc.communicate()[1]
+            self.assertEqual(proc.returncode, 2)
+            self.assertTrue("--clear-cache requires --cache-dir" in err)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testNoOutputFormat(self):
+        self.assertRaises(ValueError, convertOntology, open(self.testpath+"TestVocabulary.csv", "rb"),
+                          StringIO.StringIO(), TestOptions())
+        self.assertRaises(ValueError, convertOntology, open(self.testpath+"TestVocabulary.csv", "rb"),
+                          StringIO.StringIO(), TestOptions(formats=[("pdf", "")]))
+        proc = subprocess.Popen([sys.executable, "../ConvertOntology.py", self.testpath+"TestVocabulary.csv"],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        err  = proc.communicate()[1]
+        self.assertEqual(proc.returncode, 2)
+        self.assertTrue("error: No output format selected" in err, err)
+
+    def testLazyImports(self):
+        # Modules needed only by some options are not loaded by importing
+        # ConvertOntology, or by reading a vocabulary
+        out = self.runPython(["-c", "import sys; sys.path.insert(0, '..'); "
+            "import ConvertOntology, csv; "
+            "ConvertOntology.readVocabulary(csv.reader(open(%r, 'rb'))); "
+            "print sorted([ m for m in %r if m in sys.modules ])"%(
+            self.testpath+"TestVocabulary.csv",
+            ("optparse", "urlparse", "StringIO", "tempfile", "VocabCache", "PhaseStats", "MappedInput"))])
+        self.assertEqual(out, "[]\n")
+
+# Assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testReadVocabulary"
+            , "testReadVocabularyEvents"
+            , "testReadVocabularyEventsPrefixes"
+            , "testReadVocabularySequence"
+            , "testReadVocabularySequenceComplete"
+            , "testReadVocabularySequenceBounded"
+            , "testInternUri"
+            , "testInternUriImmutable"
+            , "testCompactElements"
+            , "testVocabularyIndexes"
+            , "testVocabularySubclasses"
+            ],
+        "component":
+            [ "testConvertOwl"
+            , "testOwlPropertyDeclarations"
+            , "testConvertMediaWiki"
+            , "testConvertBasecamp"
+            , "testConvertTurtle"
+            , "testTurtlePrefixes"
+            , "testConvertNTriples"
+            , "testNTriplesRelative"
+            , "testBufferedOutput"
+            , "testCustomTemplates"
+            , "testConvertMapped"
+            , "testGetOutputFormats"
+            , "testConvertMultipleFormats"
+            , "testConvertCached"
+            , "testConvertStats"
+            , "testInstrumentReader"
+            , "testTracing"
+            , "testConvertCsvError"
+            , "testRunConvert"
+            , "testRunConvertUncached"
+            , "testNoOutputFormat"
+            , "testLazyImports"
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestConvertOntology, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestConvertOntology", getTestSuite, sys.argv)
+
+# End.
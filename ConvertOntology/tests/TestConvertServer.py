@@ -0,0 +1,192 @@
+# $Id: TestConvertServer.py $
+#
+# Unit testing for the vocabulary conversion service (ConvertServer.py),
+# using the client functions in ConvertClient.py
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import threading
+
+sys.path.append("..")
+sys.path.append("../..")
+from ConvertServer import *
+from ConvertClient import requestConversion, requestPathConversion, requestStatus, sendRequest
+from TestConvertOntology import TestOptions
+
+class TestConvertServer(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        self.server   = ConvertServer(("127.0.0.1", 0), TestOptions(), threads=2, cachesize=4)
+        self.port     = self.server.server_address[1]
+        self.thread   = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.start()
+        return
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        return
+
+    # Helpers
+
+    def readResource(self, name):
+        f = open(self.testpath+name, "rb")
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def convert(self, data, fmt):
+        return requestConversion(data, fmt, port=self.port)
+
+    # Tests
+
+    def testConvert(self):
+        csvdata = self.readResource("TestVocabulary.csv")
+        self.assertEqual(self.convert(csvdata, "rdf"),
+                         (200, "miss", self.readResource("TestVocabulary.owl")))
+        self.assertEqual(self.convert(csvdata, "rdf"),
+                         (200, "hit", self.readResource("TestVocabulary.owl")))
+        return
+
+    def testConvertFormats(self):
+        csvdata = self.readResource("TestVocabulary.csv")
+        for (fmt, name) in [("mediawiki", "TestVocabulary.wiki"),
+                            ("basecamp",  "TestVocabulary.basecamp"),
+                            ("n3",        "TestVocabulary.n3")]:
+            (status, cache, body) = self.convert(csvdata, fmt)
+            self.assertEqual((status, body), (200, self.readResource(name)))
+        self.assertEqual(requestStatus(port=self.port),
+                         {"requests": 4, "cached": 1, "hits": 2, "misses": 1})
+        return
+
+    def testConvertPath(self):
+        (status, cache, body) = requestPathConversion(self.testpath+"TestVocabulary.csv", "rdf",
+                                                      port=self.port)
+        self.assertEqual((status, body), (200, self.readResource("TestVocabulary.owl")))
+        (status, cache, body) = self.convert(self.readResource("TestVocabulary.csv"), "rdf")
+        self.assertEqual(cache, "hit")
+        return
+
+    def testConvertPathImports(self):
+        csvdata = self.readResource("TestVocabulary.csv")
+        split   = csvdata.index(',"<#>"')
+        tmpdir  = tempfile.mkdtemp()
+        try:
+            f = open(os.path.join(tmpdir, "base.csv"), "wb")
+            f.write(csvdata[:split])
+            f.close()
+            maindata = csvdata[:csvdata.index("\n")+1]+'"@","import","base.csv",,,,\n'+csvdata[split:]
+            f = open(os.path.join(tmpdir, "main.csv"), "wb")
+            f.write(maindata)
+            f.close()
+            (status, cache, body) = requestPathConversion(os.path.join(tmpdir, "main.csv"), "n3",
+                                                          port=self.port)
+            self.assertEqual((status, body), (200, self.readResource("TestVocabulary.n3")))
+            (status, cache, body) = self.convert(maindata, "n3")
+            self.assertEqual(status, 400)
+            self.assertTrue("Imported files cannot be found" in body)
+            os.remove(os.path.join(tmpdir, "base.csv"))
+            (status, cache, body) = requestPathConversion(os.path.join(tmpdir, "main.csv"), "n3",
+                                                          port=self.port)
+            self.assertEqual(status, 404)
+            self.assertTrue(body.startswith("Cannot read %s, imported by"%(os.path.join(tmpdir, "base.csv"))))
+        finally:
+            shutil.rmtree(tmpdir)
+        return
+
+    def testConvertErrors(self):
+        csvdata = self.readResource("TestVocabulary.csv")
+        (status, cache, body) = self.convert(csvdata, "pdf")
+        self.assertEqual((status, body), (400, "Unknown output format 'pdf'\n"))
+        (status, cache, body) = self.convert('"f","c"\n,"undef:Class"\n', "rdf")
+        self.assertEqual(status, 400)
+        self.assertTrue(body.startswith("Invalid vocabulary: "))
+        (status, cache, body) = requestPathConversion(self.testpath+"Missing.csv", "rdf",
+                                                      port=self.port)
+        self.assertEqual(status, 404)
+        self.assertEqual(sendRequest("127.0.0.1", self.port, "GET", "/convert?format=rdf")[0], 400)
+        self.assertEqual(sendRequest("127.0.0.1", self.port, "GET", "/other")[0], 404)
+        self.assertEqual(sendRequest("127.0.0.1", self.port, "POST", "/other", "")[0], 404)
+        return
+
+    def testUncached(self):
+        server = ConvertServer(("127.0.0.1", 0), TestOptions(), threads=1, cachesize=0)
+        port   = server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        try:
+            csvdata = self.readResource("TestVocabulary.csv")
+            for i in range(2):
+                (status, cache, body) = requestConversion(csvdata, "rdf", port=port)
+                self.assertEqual((status, cache), (200, "miss"))
+            self.assertEqual(requestStatus(port=port),
+                             {"requests": 3, "cached": 0, "hits": 0, "misses": 0})
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        return
+
+    def testConcurrent(self):
+        csvdata = self.readResource("TestVocabulary.csv")
+        expect  = self.readResource("TestVocabulary.owl")
+        results = []
+        def run():
+            for i in range(5):
+                results.append(self.convert(csvdata, "rdf")[::2])
+        threads = [ threading.Thread(target=run) for i in range(4) ]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(results, [(200, expect)]*20)
+        self.assertEqual(requestStatus(port=self.port)["requests"], 21)
+        return
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit":
+            [ "testConvert"
+            , "testConvertFormats"
+            , "testConvertPath"
+            , "testConvertPathImports"
+            , "testConvertErrors"
+            , "testUncached"
+            ],
+        "component":
+            [ "testConcurrent"
+            ],
+        "integration":
+            [
+            ],
+        "pending":
+            [
+            ]
+        }
+    return TestUtils.getTestSuite(TestConvertServer, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestConvertServer", getTestSuite, sys.argv)
+
+# End.
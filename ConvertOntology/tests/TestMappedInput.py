@@ -0,0 +1,110 @@
+# $Id: TestMappedInput.py $
+#
+# Unit testing for memory-mapped input (MappedInput.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import csv
+
+sys.path.append("..")
+sys.path.append("../..")
+from MappedInput import *
+
+class TestMappedInput(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        return
+
+    # Helpers
+
+    def makeFile(self, data):
+        path = os.path.join(self.tmpdir, "input.csv")
+        f = open(path, "wb")
+        f.write(data)
+        f.close()
+        return path
+
+    # Test cases
+
+    def testMappedLines(self):
+        data = "a,b\r\n\"c\nd\",e\r\nf"
+        m = mapInput(open(self.makeFile(data), "rb"))
+        self.assert_(isinstance(m, MappedInput))
+        self.assertEqual(list(m), ["a,b\r\n", "\"c\n", "d\",e\r\n", "f"])
+        m.close()
+        m = mapInput(open(self.makeFile(data), "rb"))
+        self.assertEqual(list(csv.reader(m)), [["a","b"], ["c\nd","e"], ["f"]])
+        m.close()
+
+    def testMappedRead(self):
+        f = open(self.makeFile("0123456789\nabc\n"), "rb")
+        f.read(2)
+        m = mapInput(f)
+        self.assertEqual(m.read(3), "234")
+        self.assertEqual(m.readline(), "56789\n")
+        self.assertEqual(m.read(), "abc\n")
+        self.assertEqual(m.read(), "")
+        m.close()
+
+    def testFallback(self):
+        f = open(self.makeFile(""), "rb")
+        self.assert_(mapInput(f) is f)
+        f.close()
+        (r, w) = os.pipe()
+        p = os.fdopen(r, "rb")
+        os.close(w)
+        self.assert_(mapInput(p) is p)
+        p.close()
+        class Stream:
+            def read(self): return ""
+        s = Stream()
+        self.assert_(mapInput(s) is s)
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testMappedLines"
+            , "testMappedRead"
+            , "testFallback"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestMappedInput, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestMappedInput", getTestSuite, sys.argv)
+
+# End.
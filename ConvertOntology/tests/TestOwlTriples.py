@@ -0,0 +1,124 @@
+# $Id: TestOwlTriples.py $
+#
+# Unit testing for OWL description of vocabulary as RDF triples (OwlTriples.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import unittest
+import csv
+
+sys.path.append("..")
+sys.path.append("../..")
+from OwlTriples import *
+from ConvertOntology import Vocabulary, VocabClass, VocabSlot, readVocabulary
+
+class TestOwlTriples(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        self.vocab    = readVocabulary(csv.reader(open(self.testpath+"TestVocabulary.csv", "rb")))
+        return
+
+    def tearDown(self):
+        return
+
+    # Helpers
+
+    def pre(self, local):
+        return uriTerm("prefix#"+local, "pre:"+local)
+
+    # Test cases
+
+    def testClassNotNew(self):
+        self.assertEqual(classStatements(self.vocab.getClass(0)), [])
+
+    def testClassStatements(self):
+        sts = classStatements(self.vocab.getClass(1))
+        self.assertEqual([ s for (s, pos) in sts ],
+            [ self.pre("slot1"), self.pre("slot2"), self.pre("slot3"), self.pre("slot4"), self.pre("Class") ])
+        self.assertEqual(sts[0][1],
+            [ (RDF_TYPE,     OWL_OBJECTPROPERTY)
+            , (RDFS_LABEL,   literalTerm("slot1 type1"))
+            , (RDFS_COMMENT, literalTerm("slot1 type1 descr"))
+            ])
+        pos = sts[4][1]
+        self.assertEqual(pos[3], (self.pre("prop"), self.pre("val")))
+        self.assertEqual(pos[5], (RDFS_SUBCLASSOF, (TERM_BNODE,
+            [ (RDF_TYPE,        OWL_RESTRICTION)
+            , (OWL_ONPROPERTY,  self.pre("slot1"))
+            , (OWL_CARDINALITY, literalTerm("1", XSD_NONNEGATIVEINTEGER))
+            ])))
+        self.assertEqual(len(pos), 11)
+
+    def testEnumeration(self):
+        sts = classStatements(self.vocab.getClass(2))
+        c   = self.pre("Type")
+        self.assertEqual(sts[0][1][3], (RDFS_LABEL, literalTerm("label text")))
+        self.assertEqual(sts[0][1][4], (OWL_ONEOF, (TERM_LIST, [uriTerm("value1"), uriTerm("value2")])))
+        self.assertEqual(sts[1:],
+            [ (uriTerm("value1"), [ (RDF_TYPE, c) ])
+            , (uriTerm("value2"), [ (RDF_TYPE, c) ])
+            ])
+
+    def testDatatypeSlot(self):
+        v = Vocabulary()
+        v.addPrefix("xsd", "<"+NS_XSD+">", "", "", "")
+        c = VocabClass(v, True, "<http://example.org/C>")
+        c.addSlot(VocabSlot(v, True, False, "<http://example.org/p>", 0, 1, "xsd:string"))
+        c.addSlot(VocabSlot(v, True, False, "<http://example.org/q>", 0, 1, "<http://example.org/T>"))
+        sts = classStatements(c)
+        self.assertEqual(sts[0], (uriTerm("http://example.org/p"), [ (RDF_TYPE, OWL_DATATYPEPROPERTY) ]))
+        self.assertEqual(sts[1], (uriTerm("http://example.org/q"), [ (RDF_TYPE, OWL_OBJECTPROPERTY) ]))
+
+    def testInverseSlot(self):
+        v = Vocabulary()
+        c = VocabClass(v, True, "<http://example.org/C>")
+        c.addSlot(VocabSlot(v, True, True, "<http://example.org/p>", 0, 1, "<http://example.org/T>"))
+        self.assertRaises(ValueError, classStatements, c)
+
+    def testEscape(self):
+        self.assertEqual(escapeLiteral('a "b"\\\n\tc'), 'a \\"b\\"\\\\\\n\\tc')
+        self.assertEqual(escapeIri("http://a.b/c d<e>"), "http://a.b/c\\u0020d\\u003Ce\\u003E")
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testClassNotNew"
+            , "testClassStatements"
+            , "testEnumeration"
+            , "testDatatypeSlot"
+            , "testInverseSlot"
+            , "testEscape"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestOwlTriples, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestOwlTriples", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,140 @@
+# $Id: TestPhaseStats.py $
+#
+# Unit testing for conversion phase statistics (PhaseStats.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import csv
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from PhaseStats import *
+
+def spin(n):
+    for i in xrange(n): pass
+    return n
+
+class TestPhaseStats(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    # Test cases
+
+    def testTimed(self):
+        s = PhaseStats()
+        f = s.timed("outer", lambda: s.timed("inner", spin)(200000))
+        self.assertEqual(f(), 200000)
+        self.assertEqual(f(), 200000)
+        self.assertEqual(s.getPhases(), ["outer", "inner"])
+        (ocalls, owall, ocpu) = s.getPhase("outer")
+        (icalls, iwall, icpu) = s.getPhase("inner")
+        self.assertEqual((ocalls, icalls), (2, 2))
+        # Outer time excludes the nested phase
+        self.assert_(iwall > owall)
+        self.assertEqual(s.getPhase("missing"), (0, 0.0, 0.0))
+
+    def testTimedError(self):
+        s = PhaseStats()
+        def fail(): raise ValueError, "failed"
+        self.assertRaises(ValueError, s.timed("fail", fail))
+        self.assertEqual(s.getPhase("fail")[0], 1)
+        s.timed("next", spin)(10)
+        self.assertEqual(s.getPhase("next")[0], 1)
+
+    def testTimedIterator(self):
+        s = PhaseStats()
+        self.assertEqual(list(s.timedIterator("items", [1, 2, 3])), [1, 2, 3])
+        self.assertEqual(s.getPhase("items")[0], 4)
+
+    def testCounts(self):
+        s = PhaseStats()
+        s.count("rows", 10)
+        s.count("classes")
+        s.count("rows", 5)
+        self.assertEqual(s.getCount("rows"), 15)
+        self.assertEqual(s.getCount("classes"), 1)
+        self.assertEqual(s.getCount("slots"), 0)
+        s.timed("phase one", spin)(10)
+        out = StringIO.StringIO()
+        s.report(out)
+        lines = [ l.split() for l in out.getvalue().splitlines() ]
+        self.assertEqual(lines[0], ["phase", "calls", "wall", "s", "cpu", "s"])
+        self.assertEqual(lines[1][:3], ["phase", "one", "1"])
+        self.assertEqual([ l[0] for l in lines[2:4] ], ["other", "total"])
+        self.assertEqual(lines[4:], [["rows", "15"], ["classes", "1"]])
+
+    def testTimedReader(self):
+        s = PhaseStats()
+        r = TimedReader(csv.reader(StringIO.StringIO("a,b\nc,d\n")), s, "csv")
+        self.assertEqual(r.next(), ["a", "b"])
+        self.assertEqual(r.line_num, 1)
+        self.assertEqual([ row for row in r ], [["c", "d"]])
+        self.assertEqual(r.line_num, 2)
+        self.assertEqual(s.getPhase("csv")[0], 3)
+
+    def testProfiles(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            profdir = os.path.join(tmpdir, "prof")
+            s = PhaseStats(profdir)
+            s.timed("phase one", lambda: s.timed("phase/two", spin)(10))()
+            files = s.dumpProfiles()
+            self.assertEqual(files, [ os.path.join(profdir, "phase-one.prof"),
+                                      os.path.join(profdir, "phase-two.prof") ])
+            for f in files:
+                self.assert_(os.path.getsize(f) > 0)
+            self.assertEqual(PhaseStats().dumpProfiles(), [])
+        finally:
+            shutil.rmtree(tmpdir)
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testTimed"
+            , "testTimedError"
+            , "testTimedIterator"
+            , "testCounts"
+            , "testTimedReader"
+            , "testProfiles"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestPhaseStats, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestPhaseStats", getTestSuite, sys.argv)
+
+# End.
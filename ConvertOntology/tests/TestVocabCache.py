@@ -0,0 +1,144 @@
+# $Id: TestVocabCache.py $
+#
+# Unit testing for parsed vocabulary cache (VocabCache.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import csv
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabCache import *
+from ConvertOntology import readVocabulary
+
+class TestVocabCache(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        self.cachedir = tempfile.mkdtemp()
+        self.cache    = VocabCache(self.cachedir, "test 1")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir)
+        return
+
+    # Helpers
+
+    def readVocab(self, name="TestVocabulary.csv"):
+        return readVocabulary(csv.reader(open(self.testpath+name, "rb")))
+
+    # Test cases
+
+    def testMakeKey(self):
+        k = self.cache.makeKey("a,b,c\r\n")
+        self.assertEqual(k, self.cache.makeKey("a,b,c\r\n"))
+        self.assertNotEqual(k, self.cache.makeKey("a,b,d\r\n"))
+        self.assertNotEqual(k, VocabCache(self.cachedir, "test 2").makeKey("a,b,c\r\n"))
+
+    def testLoadMissing(self):
+        self.assertEqual(self.cache.load(self.cache.makeKey("")), None)
+
+    def testStoreLoad(self):
+        vocab = self.readVocab()
+        self.assertEqual(self.cache.store("k1", vocab), True)
+        v = self.cache.load("k1")
+        self.assertEqual(len(v.getSequence()), len(vocab.getSequence()))
+        self.assertEqual(len(v.getClasses()),  len(vocab.getClasses()))
+        self.assertEqual(v.getClass(1).getSlot(0).getValTypeUri(),
+                         vocab.getClass(1).getSlot(0).getValTypeUri())
+        # Interned values are still shared after loading
+        self.assertEqual(v.internUri("rdfs:Resource") is v.internUri("rdfs:Resource"), True)
+        self.assertEqual(v.lookupPrefix("rdf").getUri(), vocab.lookupPrefix("rdf").getUri())
+
+    def testLoadCorrupt(self):
+        f = open(self.cache.getEntryPath("k1"), "wb")
+        f.write("not a cache entry")
+        f.close()
+        self.assertEqual(self.cache.load("k1"), None)
+
+    def testStoreNewDirectory(self):
+        cache = VocabCache(os.path.join(self.cachedir, "sub", "dir"), "test 1")
+        self.assertEqual(cache.store("k1", self.readVocab()), True)
+        self.assertNotEqual(cache.load("k1"), None)
+
+    def testClear(self):
+        self.cache.store("k1", self.readVocab())
+        self.cache.store("k2", self.readVocab())
+        self.assertEqual(self.cache.clear(), 2)
+        self.assertEqual(self.cache.load("k1"), None)
+        self.assertEqual(os.listdir(self.cachedir), [])
+        self.assertEqual(VocabCache(os.path.join(self.cachedir, "none"), "").clear(), 0)
+
+    def testMemoryCache(self):
+        cache = MemoryVocabCache(2, "test 1")
+        self.assertEqual(cache.makeKey("a,b,c\r\n"), self.cache.makeKey("a,b,c\r\n"))
+        vocab = self.readVocab()
+        self.assertEqual(cache.load("k1"), None)
+        self.assertEqual(cache.store("k1", vocab), True)
+        self.assertTrue(cache.load("k1") is vocab)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def testMemoryCacheLRU(self):
+        cache = MemoryVocabCache(2, "test 1")
+        cache.store("k1", "v1")
+        cache.store("k2", "v2")
+        cache.load("k1")
+        cache.store("k3", "v3")
+        self.assertEqual(cache.getCount(), 2)
+        self.assertEqual(cache.load("k2"), None)
+        self.assertEqual(cache.load("k1"), "v1")
+        self.assertEqual(cache.load("k3"), "v3")
+        cache.store("k3", "v3a")
+        self.assertEqual(cache.load("k1"), "v1")
+        self.assertEqual(cache.clear(), 2)
+        self.assertEqual(cache.load("k1"), None)
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testMakeKey"
+            , "testLoadMissing"
+            , "testStoreLoad"
+            , "testLoadCorrupt"
+            , "testStoreNewDirectory"
+            , "testClear"
+            , "testMemoryCache"
+            , "testMemoryCacheLRU"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabCache, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabCache", getTestSuite, sys.argv)
+
+# End.
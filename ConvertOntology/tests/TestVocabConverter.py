@@ -0,0 +1,203 @@
+# $Id: TestVocabConverter.py $
+#
+# Unit testing for the library conversion interface (VocabConverter.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import unittest
+import tempfile
+import shutil
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabConverter import *
+
+class TestVocabConverter(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath  = "resources/"
+        self.converter = Converter()
+        self.csvdata   = self.readResource("TestVocabulary.csv")
+        return
+
+    def tearDown(self):
+        return
+
+    # Helpers
+
+    def readResource(self, name):
+        f = open(self.testpath+name, "rb")
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def assertError(self, errorclass, message, func, *args, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except errorclass, e:
+            self.assertEqual(str(e), message)
+            return e
+        self.fail("%s not raised"%(errorclass.__name__))
+
+    # Tests
+
+    def testConvert(self):
+        for (fmt, name) in [("rdf",       "TestVocabulary.owl"),
+                            ("mediawiki", "TestVocabulary.wiki"),
+                            ("basecamp",  "TestVocabulary.basecamp"),
+                            ("n3",        "TestVocabulary.n3")]:
+            self.assertEqual(self.converter.convert(self.csvdata, fmt), self.readResource(name))
+        self.assertEqual(self.converter.getCache().misses, 1)
+        return
+
+    def testConvertUnicode(self):
+        self.assertEqual(self.converter.convert(self.csvdata.decode("utf-8"), "rdf"),
+                         self.readResource("TestVocabulary.owl"))
+        return
+
+    def testConvertStream(self):
+        out = StringIO.StringIO()
+        ret = self.converter.convertStream(StringIO.StringIO(self.csvdata), "mediawiki", out)
+        self.assertEqual(ret, None)
+        self.assertEqual(out.getvalue(), self.readResource("TestVocabulary.wiki"))
+        self.assertEqual(self.converter.convertStream(StringIO.StringIO(self.csvdata), "basecamp"),
+                         self.readResource("TestVocabulary.basecamp"))
+        return
+
+    def testReadCached(self):
+        (v1, hit1) = self.converter.readCached(self.csvdata)
+        (v2, hit2) = self.converter.readCached(self.csvdata)
+        self.assertEqual((hit1, hit2), (False, True))
+        self.assertTrue(v1 is v2)
+        self.assertEqual(len(v1.getClasses()), 4)
+        uncached = Converter(cachesize=0)
+        self.assertTrue(uncached.read(self.csvdata) is not uncached.read(self.csvdata))
+        return
+
+    def testConvertFileImports(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            # The base file holds the headings and prefixes, the main file the classes
+            split = self.csvdata.index(',"<#>"')
+            def writeFile(name, text):
+                f = open(os.path.join(tmpdir, name), "wb")
+                f.write(text)
+                f.close()
+            writeFile("base.csv", self.csvdata[:split])
+            writeFile("main.csv", self.csvdata[:self.csvdata.index("\n")+1]+
+                                  '"@","import","base.csv",,,,\n'+self.csvdata[split:])
+            main = os.path.join(tmpdir, "main.csv")
+            self.assertEqual(self.converter.convertFile(main, "mediawiki"),
+                             self.converter.convert(self.csvdata, "mediawiki"))
+            self.assertEqual(self.converter.readFile(main)[1], True)
+            # The cached vocabulary depends on the imported content
+            writeFile("base.csv", self.csvdata[:split].replace("<prefix#>", "<changed#>"))
+            (vocab, hit) = self.converter.readFile(main)
+            self.assertEqual((hit, vocab.getClass(1).getUri()), (False, "changed#Class"))
+            self.assertError(VocabularyError, "Imported files cannot be found for CSV "
+                             "content without a file name", self.converter.readCached,
+                             open(main, "rb").read())
+        finally:
+            shutil.rmtree(tmpdir)
+        return
+
+    def testTemplates(self):
+        converter = Converter(templates=[("wiki_prefix", "|| %s || %s ||\n")])
+        out = converter.convert(self.csvdata, "mediawiki")
+        self.assertTrue("|| pre || prefix# ||" in out)
+        self.assertEqual(converter.convert(self.csvdata, "rdf"), self.readResource("TestVocabulary.owl"))
+        self.assertError(TemplateError, "Unknown template 'no_such'",
+                         Converter, templates=[("no_such", "")])
+        e = self.assertError(TemplateError, "Template wiki_prefix must have 2 field(s)",
+                             Converter, templates=[("wiki_prefix", "%s")])
+        self.assertEqual(e.line, None)
+        return
+
+    def testFormatError(self):
+        self.assertError(FormatError, "Unknown output format 'pdf'",
+                         self.converter.convert, self.csvdata, "pdf")
+        return
+
+    def testVocabularyError(self):
+        e = self.assertError(VocabularyError, "line 10: Prefix for 'undef:Class' not defined",
+                             self.converter.convert,
+                             self.csvdata.replace('"pre:Class"', '"undef:Class"'), "rdf")
+        self.assertEqual(e.line, 10)
+        e = self.assertError(VocabularyError,
+                             "line 3: Row does not follow a class or slot that it applies to",
+                             self.converter.read,
+                             '"f","c","p","v"\n"@","prefix","pre:","<prefix#>"\n'
+                             '"+",,"pre:slot1","1 :: pre:type1"\n')
+        self.assertEqual(e.line, 3)
+        self.assertTrue(isinstance(e, ConversionError))
+        # Other failures are not reported as vocabulary errors
+        import ConvertOntology
+        addSlot = ConvertOntology.VocabClass.addSlot
+        def brokenAddSlot(vclass, slot):
+            raise AttributeError("broken")
+        ConvertOntology.VocabClass.addSlot = brokenAddSlot
+        try:
+            self.assertRaises(AttributeError, Converter(cachesize=0).read, self.csvdata)
+        finally:
+            ConvertOntology.VocabClass.addSlot = addSlot
+        return
+
+    def testOutputError(self):
+        data = ('"f","c","p","v"\n"@","prefix","pre:","<prefix#>"\n'
+                '"+","pre:Class","pre:slot1","1 :: <http://example.org/Type>"\n')
+        self.assertError(OutputError, "Cannot write rdf output: No prefix defined to form "
+                         "QName: http://example.org/Type", self.converter.convert, data, "rdf")
+        self.assertError(OutputError, "Cannot write nt output: Relative URI <> in N-Triples "
+                         "output; use --base", self.converter.convert, self.csvdata, "nt")
+        self.assertTrue(Converter(base_uri="http://example.org/").convert(self.csvdata, "nt")
+                        .startswith("<http://example.org/> "))
+        return
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit":
+            [ "testConvert"
+            , "testConvertUnicode"
+            , "testConvertStream"
+            , "testReadCached"
+            , "testConvertFileImports"
+            , "testTemplates"
+            , "testFormatError"
+            , "testVocabularyError"
+            , "testOutputError"
+            ],
+        "component":
+            [
+            ],
+        "integration":
+            [
+            ],
+        "pending":
+            [
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabConverter, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabConverter", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,100 @@
+# $Id: TestVocabLexer.py $
+#
+# Unit testing for vocabulary CSV cell lexer (VocabLexer.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import unittest
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabLexer import *
+
+class TestVocabLexer(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    # Test cases
+
+    def testLexPrefixCell(self):
+        self.assertEqual(lexPrefixCell("pre:"),     "pre")
+        self.assertEqual(lexPrefixCell("  pre:"),   "pre")
+        self.assertEqual(lexPrefixCell("pre"),      "pre")
+
+    def testLexPropertyCell(self):
+        self.assertEqual(lexPropertyCell("pre:prop"),     (False, "pre:prop"))
+        self.assertEqual(lexPropertyCell("^ rdf:type"),   (True,  "rdf:type"))
+        self.assertEqual(lexPropertyCell(" ^rdf:type"),   (True,  "rdf:type"))
+
+    def testLexValueCell(self):
+        self.assertEqual(lexValueCell("1 :: pre:type"),  (VAL_SLOT, 1, 1, "pre:type"))
+        self.assertEqual(lexValueCell("? :: pre:type"),  (VAL_SLOT, 0, 1, "pre:type"))
+        self.assertEqual(lexValueCell("* :: pre:type"),  (VAL_SLOT, 0, sys.maxint, "pre:type"))
+        self.assertEqual(lexValueCell("+::<http://a/>"), (VAL_SLOT, 1, sys.maxint, "<http://a/>"))
+        self.assertEqual(lexValueCell("<= pre:super"),   (VAL_SUBPROP, None, None, "pre:super"))
+        self.assertEqual(lexValueCell("pre:val"),        (VAL_VALUE, None, None, "pre:val"))
+        self.assertEqual(lexValueCell('"some text"'),    (VAL_VALUE, None, None, '"some text"'))
+        self.assertEqual(lexValueCell(""),               (VAL_VALUE, None, None, ""))
+
+    def testLexUriCell(self):
+        self.assertEqual(lexUriCell("pre:local"),       (TOK_QNAME, "pre", "local"))
+        self.assertEqual(lexUriCell("pre:s.s-s"),       (TOK_QNAME, "pre", "s.s-s"))
+        self.assertEqual(lexUriCell("p-p.p:loc"),       (TOK_QNAME, "p-p.p", "loc"))
+        self.assertEqual(lexUriCell("<http://a.b/c>"),  (TOK_URI, "http://a.b/c", None))
+        self.assertEqual(lexUriCell("<#>"),             (TOK_URI, "#", None))
+        self.assertEqual(lexUriCell("some text"),       None)
+
+    def testLexNodeCell(self):
+        self.assertEqual(lexNodeCell("pre:val"),        (TOK_QNAME, "pre", "val"))
+        self.assertEqual(lexNodeCell("pre:s.s-s"),      (TOK_QNAME, "pre", "s.s-s"))
+        self.assertEqual(lexNodeCell("<second>"),       (TOK_URI, "second", None))
+        self.assertEqual(lexNodeCell("value1"),         (TOK_LITERAL, "value1", None))
+        self.assertEqual(lexNodeCell('"label text"'),   (TOK_LITERAL, '"label text"', None))
+        self.assertEqual(lexNodeCell("p-p:loc"),        (TOK_LITERAL, "p-p:loc", None))
+        self.assertEqual(lexNodeCell("http://a.b/"),    (TOK_LITERAL, "http://a.b/", None))
+
+# Assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testLexPrefixCell"
+            , "testLexPropertyCell"
+            , "testLexValueCell"
+            , "testLexUriCell"
+            , "testLexNodeCell"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabLexer, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabLexer", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,257 @@
+# $Id: TestVocabLoader.py $
+#
+# Unit testing for vocabularies split across several files (VocabLoader.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import csv
+import unittest
+import tempfile
+import shutil
+import StringIO
+from xml.dom import minidom
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabLoader import *
+from VocabCache import MemoryVocabCache
+from ConvertOntology import convertOntology, readVocabulary
+from TestConvertOntology import TestOptions
+
+HEADINGS = '"f","c","p","v","label","descr","comment"\n'
+
+# A base vocabulary, two vocabularies that use it, and one that uses both
+VOCAB_FILES = {
+    "base.csv":
+        HEADINGS+
+        '"@","prefix","base:","<http://example.org/base#>",,,\n'
+        '"@","prefix","xsd:","<http://www.w3.org/2001/XMLSchema#>",,,\n'
+        '"@","prefix","rdfs:","<http://www.w3.org/2000/01/rdf-schema#>",,,\n'
+        ',,,,,,\n'
+        '"+","base:Thing",,,"a thing",,\n',
+    "a.csv":
+        HEADINGS+
+        '"@","import","base.csv",,"base vocabulary",,\n'
+        '"@","prefix","a:","<http://example.org/a#>",,,\n'
+        '"+","a:Part",,,"a part",,\n'
+        '"+",,"rdfs:subClassOf","base:Thing",,,\n'
+        '"+",,"a:size","1 :: xsd:integer",,,\n',
+    "sub/b.csv":
+        HEADINGS+
+        '"@","import","../base.csv",,,\n'
+        '"@","prefix","b:","<http://example.org/b#>",,,\n'
+        '"+","b:Widget",,,"a widget",,\n'
+        '"+",,"b:thing","* :: base:Thing",,,\n',
+    "top.csv":
+        HEADINGS+
+        '"@","import","a.csv",,,\n'
+        '"@","import","sub/b.csv",,,\n'
+        '"@","prefix","top:","<http://example.org/top#>",,,\n'
+        '"+","top:Assembly",,,"an assembly",,\n'
+        '"+",,"a:part","+ :: a:Part",,,\n'
+        '"+",,"b:widget","* :: b:Widget",,,\n',
+    }
+
+class TestVocabLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tmpdir, "sub"))
+        for (name, text) in VOCAB_FILES.items():
+            self.writeFile(name, text)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        return
+
+    # Helpers
+
+    def path(self, name):
+        return os.path.normpath(os.path.join(self.tmpdir, name))
+
+    def writeFile(self, name, text):
+        f = open(self.path(name), "wb")
+        f.write(text)
+        f.close()
+        return
+
+    def getClassNames(self, vocab):
+        return [ c.getQNameOrUri() for c in vocab.getClasses() ]
+
+    def convert(self, name, **kwargs):
+        opstr = StringIO.StringIO()
+        options = TestOptions(rdf=True, no_cache=True, inp_file=self.path(name), **kwargs)
+        status = convertOntology(open(self.path(name), "rb"), opstr, options)
+        self.assertEqual(status, 0)
+        return opstr.getvalue()
+
+    # Tests
+
+    def testFindImports(self):
+        self.assertEqual(findImports(VOCAB_FILES["top.csv"]), ["a.csv", "sub/b.csv"])
+        self.assertEqual(findImports(VOCAB_FILES["base.csv"]), [])
+        self.assertEqual(findImports(HEADINGS+'@,import,x.csv\r\n"#","import","y.csv"\n'), ["x.csv"])
+        self.assertEqual(findImports(HEADINGS+',,,"an important class",,,\n'), [])
+        self.assertTrue(fileHasImports(self.path("a.csv")))
+        self.assertFalse(fileHasImports(self.path("base.csv")))
+        return
+
+    def testReadImportRow(self):
+        text  = (HEADINGS+'"@","import","base.csv",,"base vocabulary",,\n'
+                 '"@","prefix","a:","<http://example.org/a#>",,,\n'
+                 '"+","a:Part",,,"a part",,\n')
+        vocab = readVocabulary(csv.reader(StringIO.StringIO(text)))
+        self.assertEqual([ (i.getPath(), i.getLabel()) for i in vocab.getImports() ],
+                         [("base.csv", "base vocabulary")])
+        self.assertEqual(self.getClassNames(vocab), ["a:Part"])
+        return
+
+    def testLoad(self):
+        loader = VocabLoader(workers=1)
+        vocab  = loader.load(self.path("top.csv"))
+        self.assertEqual(self.getClassNames(vocab),
+                         ["base:Thing", "a:Part", "b:Widget", "top:Assembly"])
+        self.assertEqual([ p.getPrefix() for p in vocab.getPrefixes() ],
+                         ["base", "xsd", "rdfs", "a", "b", "top"])
+        self.assertEqual(sorted(vocab.getPrefixIndex().keys()), ["a", "b", "base", "rdfs", "top", "xsd"])
+        self.assertEqual(len([ i for i in vocab.getSequence() if i != None and
+                               i.__class__.__name__ == "VocabHeadings" ]), 1)
+        self.assertEqual(len(vocab.getImports()), 4)
+        self.assertEqual((loader.parsed, loader.cached), (4, 0))
+        slot = vocab.getClasses()[1].getSlots()[0]
+        self.assertEqual(slot.getValTypeXml(), "&xsd;integer")
+        return
+
+    def testLoadParallel(self):
+        vocab1 = VocabLoader(workers=1).load(self.path("top.csv"))
+        vocab2 = VocabLoader(workers=2).load(self.path("top.csv"))
+        self.assertEqual(self.getClassNames(vocab2), self.getClassNames(vocab1))
+        self.assertEqual([ c.getUri() for c in vocab2.getClasses() ],
+                         [ c.getUri() for c in vocab1.getClasses() ])
+        return
+
+    def testLoadCached(self):
+        cache  = MemoryVocabCache(8, "test")
+        loader = VocabLoader(workers=1, cache=cache)
+        loader.load(self.path("a.csv"))
+        self.assertEqual((loader.parsed, loader.cached), (2, 0))
+        loader.load(self.path("sub/b.csv"))
+        self.assertEqual((loader.parsed, loader.cached), (1, 1))
+        vocab = loader.load(self.path("top.csv"))
+        self.assertEqual((loader.parsed, loader.cached), (1, 3))
+        self.assertEqual(len(vocab.getClasses()), 4)
+        # A changed prefix in an imported file means the importer is parsed again
+        self.writeFile("base.csv", VOCAB_FILES["base.csv"].replace("/base#", "/base2#"))
+        vocab = loader.load(self.path("a.csv"))
+        self.assertEqual((loader.parsed, loader.cached), (2, 0))
+        self.assertEqual(vocab.getClasses()[1].getSlots()[0].getValTypeXml(), "&xsd;integer")
+        return
+
+    def testImportErrors(self):
+        self.writeFile("missing.csv", HEADINGS+'"@","import","nofile.csv",,,\n')
+        self.assertRaises(IOError, VocabLoader().load, self.path("missing.csv"))
+        self.writeFile("cycle1.csv", HEADINGS+'"@","import","cycle2.csv",,,\n')
+        self.writeFile("cycle2.csv", HEADINGS+'"@","import","cycle1.csv",,,\n')
+        try:
+            VocabLoader().load(self.path("cycle1.csv"))
+            self.fail("Import cycle not detected")
+        except ValueError, e:
+            self.assertEqual(str(e), "Import cycle: %s -> %s -> %s"%(
+                self.path("cycle1.csv"), self.path("cycle2.csv"), self.path("cycle1.csv")))
+        self.writeFile("bad.csv", HEADINGS+'"@","import","base.csv",,,\n"+","c:Class",,,,,\n')
+        try:
+            VocabLoader().load(self.path("bad.csv"))
+            self.fail("Undefined prefix not reported")
+        except ValueError, e:
+            self.assertEqual(str(e), "%s, line 3: Prefix for 'c:Class' not defined"%(self.path("bad.csv")))
+        return
+
+    def testConvertWithImports(self):
+        # The same as converting the files joined into one, without imports
+        rows   = "".join([ VOCAB_FILES[n].replace(HEADINGS, "") for n in
+                           ("base.csv", "a.csv", "sub/b.csv", "top.csv") ])
+        joined = HEADINGS+"".join([ r+"\n" for r in rows.splitlines() if '"import"' not in r ])
+        self.writeFile("joined.csv", joined)
+        self.assertEqual(self.convert("top.csv"), self.convert("joined.csv"))
+        self.assertEqual(self.convert("top.csv", jobs=2), self.convert("joined.csv"))
+        return
+
+    def testSharedPrefixes(self):
+        self.writeFile("shared.csv", HEADINGS+
+            '"@","import","base.csv",,,\n'
+            '"@","prefix","rdf:","<http://www.w3.org/1999/02/22-rdf-syntax-ns#>",,,\n'
+            '"@","prefix","rdfs:","<http://www.w3.org/2000/01/rdf-schema#>",,,\n'
+            '"@","prefix","owl:","<http://www.w3.org/2002/07/owl#>",,,\n'
+            '"@","prefix","s:","<http://example.org/s#>",,,\n'
+            '"+","s:Shared",,,"a shared class",,\n'
+            '"+",,"rdfs:subClassOf","base:Thing",,,\n')
+        vocab = VocabLoader().load(self.path("shared.csv"))
+        self.assertEqual([ p.getPrefix() for p in vocab.getPrefixes() ],
+                         ["base", "xsd", "rdfs", "rdf", "owl", "s"])
+        rdf = minidom.parseString(self.convert("shared.csv"))
+        self.assertEqual(rdf.documentElement.getAttribute("xmlns:rdfs"),
+                         "http://www.w3.org/2000/01/rdf-schema#")
+        self.assertEqual(len(rdf.getElementsByTagName("rdfs:subClassOf")), 1)
+        return
+
+    def testConflictingPrefixes(self):
+        self.writeFile("ex1.csv", HEADINGS+'"@","prefix","ex:","<http://example.org/one#>",,,\n')
+        self.writeFile("ex2.csv", HEADINGS+'"@","prefix","ex:","<http://example.org/two#>",,,\n')
+        self.writeFile("both.csv", HEADINGS+
+            '"@","import","ex1.csv",,,\n'
+            '"@","import","ex2.csv",,,\n'
+            '"+","ex:Thing",,,,,\n')
+        try:
+            VocabLoader().load(self.path("both.csv"))
+            self.fail("Conflicting prefix declarations not reported")
+        except ValueError, e:
+            self.assertEqual(str(e), "%s: Prefix 'ex:' declared as <http://example.org/two#>, "
+                                     "already declared as <http://example.org/one#>"%(self.path("ex2.csv")))
+        return
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit":
+            [ "testFindImports"
+            , "testReadImportRow"
+            , "testLoad"
+            , "testLoadCached"
+            , "testImportErrors"
+            , "testConflictingPrefixes"
+            ],
+        "component":
+            [ "testLoadParallel"
+            , "testConvertWithImports"
+            , "testSharedPrefixes"
+            ],
+        "integration":
+            [
+            ],
+        "pending":
+            [
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabLoader, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabLoader", getTestSuite, sys.argv)
+
+# End.
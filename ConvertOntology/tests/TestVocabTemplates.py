@@ -0,0 +1,123 @@
+# $Id: TestVocabTemplates.py $
+#
+# Unit testing for compiled output templates (VocabTemplates.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import unittest
+import re
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabTemplates import *
+
+class TestVocabTemplates(unittest.TestCase):
+
+    def setUp(self):
+        return
+
+    def tearDown(self):
+        return
+
+    # Test cases
+
+    def testCountFields(self):
+        self.assertEqual(countFields("abc"), 0)
+        self.assertEqual(countFields("<%s>%s</%s>"), 3)
+        self.assertEqual(countFields("_:b%d 100%%"), 1)
+        self.assertRaises(ValueError, countFields, "%(name)s")
+        self.assertRaises(ValueError, countFields, "100%")
+
+    def testCompileTemplate(self):
+        self.assertEqual(compileTemplate("abc\n")(), "abc\n")
+        self.assertEqual(compileTemplate("100%%")(), "100%")
+        self.assertEqual(compileTemplate("<%s>")("a"), "<a>")
+        self.assertEqual(compileTemplate("<%s>")(("a","b")), "<('a', 'b')>")
+        self.assertEqual(compileTemplate("%s=%d")("a", 1), "a=1")
+
+    def testTemplateSet(self):
+        t = TemplateSet([("x_open", "<%s>"), ("x_close", "</x>\n")])
+        self.assertEqual(t.getNames(), ["x_close", "x_open"])
+        self.assertEqual(t.x_open("a")+t.x_close(), "<a></x>\n")
+        self.assertEqual(t.getText("x_open"), "<%s>")
+        u = t.override([("x_open", "[%s]"), ("y_other", "ignored")])
+        self.assertEqual(u.x_open("a")+u.x_close(), "[a]</x>\n")
+        self.assertEqual(t.x_open("a"), "<a>")
+        self.assertEqual(u.getNames(), ["x_close", "x_open"])
+        self.assertRaises(ValueError, t.override, [("x_close", "</%s>")])
+
+    def testReadTemplates(self):
+        text = ( "Comment line\n"
+                 "@@ a_block\n"
+                 "line 1 %s\n"
+                 "line 2\n"
+                 "\n"
+                 "@@ a_inline\n"
+                 "<td>%s</td>\\\n"
+                 "@@a_empty\n" )
+        t = readTemplates(StringIO.StringIO(text))
+        self.assertEqual(t, [ ("a_block",  "line 1 %s\nline 2\n\n")
+                            , ("a_inline", "<td>%s</td>")
+                            , ("a_empty",  "")
+                            ])
+        self.assertRaises(ValueError, readTemplates, StringIO.StringIO("@@ a_bad\n100%\n"))
+        self.assertRaises(ValueError, readTemplates, StringIO.StringIO("@@ two names\n"))
+
+    def testWriteTemplates(self):
+        t = [ ("a_block", "line 1 %s\r\nline 2\n\n"), ("a_inline", "<td>\n%s</td>"), ("a_empty", "") ]
+        buf = StringIO.StringIO()
+        writeTemplates(t, buf)
+        self.assertEqual(readTemplates(StringIO.StringIO(buf.getvalue())), 
+                         [ ("a_block", "line 1 %s\nline 2\n\n"), t[1], t[2] ])
+
+    def testTemplatesFromClass(self):
+        class C:
+            a_one = "1"
+            a_two = "2"
+            a_re  = re.compile("x")
+            b_one = "3"
+        self.assertEqual(templatesFromClass(C, "a_"), [("a_one", "1"), ("a_two", "2")])
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit": 
+            [ "testCountFields"
+            , "testCompileTemplate"
+            , "testTemplateSet"
+            , "testReadTemplates"
+            , "testWriteTemplates"
+            , "testTemplatesFromClass"
+            ],
+        "component":
+            [ 
+            ],
+        "integration":
+            [ 
+            ],
+        "pending":
+            [ 
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabTemplates, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabTemplates", getTestSuite, sys.argv)
+
+# End.
@@ -0,0 +1,175 @@
+# $Id: TestVocabValidator.py $
+#
+# Unit testing for vocabulary reference validation (VocabValidator.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import csv
+import unittest
+import tempfile
+import shutil
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from VocabValidator import *
+from TestConvertOntology import TestOptions
+
+HEADINGS = '"f","c","p","v","label","descr","comment"\n'
+
+PREFIXES = ( '"@","prefix","rdf:","<http://www.w3.org/1999/02/22-rdf-syntax-ns#>",,,\n'
+             '"@","prefix","rdfs:","<http://www.w3.org/2000/01/rdf-schema#>",,,\n'
+             '"@","prefix","xsd:","<http://www.w3.org/2001/XMLSchema#>",,,\n'
+             '"@","prefix","ex:","<http://example.org/>",,,\n'
+             '"@","prefix","foaf:","<http://xmlns.com/foaf/0.1/>",,,\n' )
+
+# Rows from line 7, which refer only to defined or external terms
+VALID_ROWS = ( '"+","ex:Animal",,,,,\n'
+               '"+",,"ex:name","1 :: xsd:string",,,\n'
+               '"+",,,"<= rdfs:label",,,\n'
+               '"+",,"ex:owner","? :: foaf:Person",,,\n'
+               '"+",,"ex:mother","? :: ex:Animal",,,\n'
+               '"+",,"^ rdf:type","ex:rex",,,\n'
+               '"+",,"^ rdfs:subClassOf","ex:Dog",,,\n'
+               '"+","ex:Dog",,,,,\n'
+               '"+",,"rdfs:subClassOf","ex:Animal",,,\n'
+               '"+",,"rdf:type","<http://www.w3.org/2002/07/owl#Class>",,,\n'
+               '"+",,"ex:nickname","* :: xsd:string",,,\n'
+               '"+",,,"<= ex:name",,,\n'
+               '"+",,,"<= foaf:nick",,,\n' )
+
+class TestVocabValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = None
+        return
+
+    def tearDown(self):
+        if self.tmpdir:
+            shutil.rmtree(self.tmpdir)
+        return
+
+    # Helpers
+
+    def validate(self, rows):
+        return validateVocabulary(csv.reader(StringIO.StringIO(HEADINGS+PREFIXES+rows)))
+
+    def writeFile(self, name, text):
+        if not self.tmpdir:
+            self.tmpdir = tempfile.mkdtemp()
+        path = os.path.join(self.tmpdir, name)
+        f = open(path, "wb")
+        f.write(text)
+        f.close()
+        return path
+
+    # Tests
+
+    def testValidVocabulary(self):
+        self.assertEqual(self.validate(VALID_ROWS), [])
+        return
+
+    def testReferenceProblems(self):
+        rows = ( VALID_ROWS+
+                 '"+","ex:Cat",,,,,\n'
+                 '"+",,"rdfs:subClassOf","ex:Animl",,,\n'
+                 '"+",,"^ rdfs:subClassOf","ex:Kitten",,,\n'
+                 '"+",,"rdfs:subClassOf","""an animal""",,,\n'
+                 '"+",,"ex:age","? :: xsd:integr",,,\n'
+                 '"+",,"ex:prey","* :: ex:Mouse",,,\n'
+                 '"+",,,"<= ex:nmae",,,\n'
+                 '"+",,"ex:food","* :: ex:Mouse",,,\n' )
+        self.assertEqual(self.validate(rows),
+            [ (21, "Superclass ex:Animl is not a defined class")
+            , (22, "Subclass ex:Kitten is not a defined class")
+            , (23, 'Superclass "an animal" is not a URI')
+            , (24, "Slot value type xsd:integr is not a defined class or datatype")
+            , (25, "Slot value type ex:Mouse is not a defined class or datatype")
+            , (26, "Superproperty ex:nmae is not a defined property")
+            , (27, "Slot value type ex:Mouse is not a defined class or datatype")
+            ])
+        return
+
+    def testUnreadableRows(self):
+        rows = ( '"+",,"ex:early","1 :: ex:Animal",,,\n'
+                 + VALID_ROWS +
+                 '"+","nope:Cat",,,,,\n'
+                 '"+",,"ex:size","1 :: nope:Size",,,\n'
+                 '"+",,"ex:colour","1 :: ex:Colour",,,\n' )
+        self.assertEqual(self.validate(rows),
+            [ (7,  "Row does not follow a class or slot that it applies to")
+            , (21, "Prefix for 'nope:Cat' not defined")
+            , (22, "Prefix for 'nope:Size' not defined")
+            , (23, "Slot value type ex:Colour is not a defined class or datatype")
+            ])
+        return
+
+    def testValidateOntology(self):
+        path  = self.writeFile("vocab.csv", HEADINGS+PREFIXES+VALID_ROWS+'"+",,"ex:age","? :: ex:Age",,,\n')
+        opstr = StringIO.StringIO()
+        status = validateOntology(open(path, "rb"), opstr, TestOptions(inp_file=path))
+        self.assertEqual(status, 1)
+        self.assertEqual(opstr.getvalue(),
+            "%s:20: Slot value type ex:Age is not a defined class or datatype\n"%(path))
+        opstr = StringIO.StringIO()
+        status = validateOntology(StringIO.StringIO(HEADINGS+PREFIXES+VALID_ROWS), opstr,
+                                  TestOptions(inp_file=""))
+        self.assertEqual((status, opstr.getvalue()), (0, ""))
+        return
+
+    def testValidateWithImports(self):
+        self.writeFile("base.csv", HEADINGS+PREFIXES+VALID_ROWS)
+        path  = self.writeFile("top.csv", HEADINGS+
+            '"@","import","base.csv",,,,\n'
+            '"+","ex:Puppy",,,,,\n'
+            '"+",,"rdfs:subClassOf","ex:Dog",,,\n'
+            '"+",,"ex:toy","* :: ex:Bone",,,\n'
+            '"+",,,"<= ex:nickname",,,\n')
+        opstr = StringIO.StringIO()
+        status = validateOntology(open(path, "rb"), opstr, TestOptions(inp_file=path, no_cache=True))
+        self.assertEqual(status, 1)
+        self.assertEqual(opstr.getvalue(),
+            "%s:5: Slot value type ex:Bone is not a defined class or datatype\n"%(path))
+        return
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit":
+            [ "testValidVocabulary"
+            , "testReferenceProblems"
+            , "testUnreadableRows"
+            ],
+        "component":
+            [ "testValidateOntology"
+            , "testValidateWithImports"
+            ],
+        "integration":
+            [
+            ],
+        "pending":
+            [
+            ]
+        }
+    return TestUtils.getTestSuite(TestVocabValidator, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestVocabValidator", getTestSuite, sys.argv)
+
+# End.
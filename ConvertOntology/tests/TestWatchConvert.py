@@ -0,0 +1,248 @@
+# $Id: TestWatchConvert.py $
+#
+# Unit testing for watched conversion of a vocabulary file (WatchConvert.py)
+# See http://pyunit.sourceforge.net/pyunit.html
+#
+
+import sys
+import os
+import csv
+import unittest
+import tempfile
+import shutil
+import StringIO
+
+sys.path.append("..")
+sys.path.append("../..")
+from WatchConvert import *
+from TestConvertOntology import TestOptions
+
+HEADINGS = '"f","c","p","v","label","descr","comment"\n'
+
+class TestWatchConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.testpath = "resources/"
+        self.tmpdir   = tempfile.mkdtemp()
+        self.csvpath  = os.path.join(self.tmpdir, "vocab.csv")
+        self.owlpath  = os.path.join(self.tmpdir, "vocab.owl")
+        self.wikipath = os.path.join(self.tmpdir, "vocab.wiki")
+        shutil.copy(self.testpath+"TestVocabulary.csv", self.csvpath)
+        self.options  = TestOptions(rdf=True, formats=[("mediawiki", self.wikipath)],
+                                    out_file=self.owlpath)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        return
+
+    # Helpers
+
+    def readFile(self, path):
+        f = open(path, "rb")
+        try:
+            return f.read()
+        finally:
+            f.close()
+
+    def writeCsv(self, text, path=None):
+        f = open(path or self.csvpath, "wb")
+        f.write(text)
+        f.close()
+        return
+
+    def readVocab(self, text, previous=None):
+        return readVocabulary(csv.reader(StringIO.StringIO(text)), WarmVocabulary(previous))
+
+    # Tests
+
+    def testWatchOptions(self):
+        o = watchOptions(self.options)
+        self.assertEqual(o.formats, [("rdf", self.owlpath), ("mediawiki", self.wikipath)])
+        self.assertEqual(o.rdf, False)
+        self.assertEqual(self.options.rdf, True)
+        return
+
+    def testWarmVocabulary(self):
+        text  = self.readFile(self.csvpath)
+        v1    = self.readVocab(text)
+        self.assertEqual(v1.reused, 0)
+        v2    = self.readVocab(text, v1)
+        self.assertEqual(v2.reused, v2.getInternedCount())
+        self.assertTrue(v2.internUri("pre:Class") is v1.internUri("pre:Class"))
+        self.assertEqual(v2.getClass(1).getUri(), "prefix#Class")
+        return
+
+    def testWarmVocabularyPrefixChanged(self):
+        text  = self.readFile(self.csvpath)
+        v1    = self.readVocab(text)
+        v2    = self.readVocab(text.replace("<prefix#>", "<changed#>"), v1)
+        self.assertTrue(0 < v2.reused < v2.getInternedCount())
+        self.assertEqual(v2.getClass(1).getUri(), "changed#Class")
+        self.assertEqual(v2.internNode('"""label text"""').getValue(), '"""label text"""')
+        return
+
+    def testWarmVocabularyPrefixUndefined(self):
+        v1 = self.readVocab(self.readFile(self.csvpath))
+        self.assertRaises(ValueError, self.readVocab,
+                          '"f","c","p","v","label","descr","comment"\n,"pre:Class",,,,,\n', v1)
+        return
+
+    def testBlockReader(self):
+        text  = self.readFile(self.csvpath)
+        v1    = WarmVocabulary()
+        r1    = BlockReader(csv.reader(StringIO.StringIO(text)), v1)
+        readVocabulary(r1, v1)
+        self.assertEqual(r1.reused, 0)
+        self.assertEqual(len(r1.blocks), 4)
+        v2    = WarmVocabulary(v1)
+        r2    = BlockReader(csv.reader(StringIO.StringIO(text)), v2, r1.blocks)
+        readVocabulary(r2, v2)
+        self.assertEqual(r2.reused, 4)
+        self.assertEqual(r2.line_num, 24)
+        self.assertEqual(len(v2.getSequence()), len(v1.getSequence()))
+        for (c1, c2) in zip(v1.getClasses(), v2.getClasses()):
+            self.assertTrue(c1 is c2)
+        self.assertTrue(v2.getPrefix(2) is not v1.getPrefix(2))
+        return
+
+    def testBlockReaderChanged(self):
+        text  = self.readFile(self.csvpath)
+        v1    = WarmVocabulary()
+        r1    = BlockReader(csv.reader(StringIO.StringIO(text)), v1)
+        readVocabulary(r1, v1)
+        v2    = WarmVocabulary(v1)
+        r2    = BlockReader(csv.reader(StringIO.StringIO(text.replace("a type", "the type"))),
+                            v2, r1.blocks)
+        readVocabulary(r2, v2)
+        self.assertEqual(r2.reused, 3)
+        self.assertTrue(v2.getClass(2) is not v1.getClass(2))
+        self.assertEqual(v2.getClass(2).getLabel(), "the type")
+        v3    = WarmVocabulary(v2)
+        r3    = BlockReader(csv.reader(StringIO.StringIO(text.replace("<prefix#>", "<changed#>"))),
+                            v3, r2.blocks)
+        readVocabulary(r3, v3)
+        self.assertEqual(r3.reused, 0)
+        self.assertEqual(v3.getClass(1).getUri(), "changed#Class")
+        return
+
+    def testConvert(self):
+        report  = StringIO.StringIO()
+        watcher = VocabWatcher(self.csvpath, self.options, report)
+        self.assertEqual(watcher.convert(), 0)
+        self.assertEqual(self.readFile(self.owlpath), self.readFile(self.testpath+"TestVocabulary.owl"))
+        self.assertEqual(self.readFile(self.wikipath), self.readFile(self.testpath+"TestVocabulary.wiki"))
+        self.assertTrue("converted in" in report.getvalue())
+        os.remove(self.owlpath)
+        self.assertEqual(watcher.convert(), 0)
+        self.assertFalse(os.path.exists(self.owlpath))
+        self.assertTrue(report.getvalue().endswith(": unchanged\n"))
+        return
+
+    def testConvertError(self):
+        report  = StringIO.StringIO()
+        watcher = VocabWatcher(self.csvpath, self.options, report)
+        self.assertEqual(watcher.convert(), 0)
+        vocab   = watcher.getVocabulary()
+        self.writeCsv('"f","c","p","v","label","descr","comment"\n,"undef:Class",,,,,\n')
+        self.assertEqual(watcher.convert(), 1)
+        self.assertTrue("conversion failed: ValueError: Expected <uri>, got qname 'undef:Class'"
+                        in report.getvalue())
+        self.assertTrue(watcher.getVocabulary() is vocab)
+        return
+
+    def testPoll(self):
+        report  = StringIO.StringIO()
+        watcher = VocabWatcher(self.csvpath, self.options, report)
+        self.assertEqual(watcher.poll(), 0)
+        self.assertEqual(watcher.poll(), None)
+        self.writeCsv(self.readFile(self.csvpath).replace("a class", "the class"))
+        self.assertEqual(watcher.poll(), 0)
+        self.assertTrue("the class" in self.readFile(self.wikipath))
+        last = report.getvalue().splitlines()[-1]
+        self.assertTrue("after change" in last)
+        self.assertTrue("reused 3 of 4 classes" in last)
+        return
+
+    def testPollMissing(self):
+        watcher = VocabWatcher(os.path.join(self.tmpdir, "missing.csv"), self.options)
+        self.assertEqual(watcher.poll(), None)
+        return
+
+    def testPollImports(self):
+        # Imported files are read with the watched file, and watched too
+        basepath = os.path.join(self.tmpdir, "base.csv")
+        self.writeCsv(HEADINGS+'"@","prefix","ex:","<http://example.org/>",,,\n'
+                      '"+","ex:Base",,,"a base class",,\n', basepath)
+        self.writeCsv(HEADINGS+'"@","import","base.csv",,,,\n"+","ex:Main",,,"main class",,\n')
+        report  = StringIO.StringIO()
+        watcher = VocabWatcher(self.csvpath, self.options, report)
+        self.assertEqual(watcher.poll(), 0)
+        self.assertTrue("parsed 2 of 2 files" in report.getvalue())
+        wiki = self.readFile(self.wikipath)
+        self.assertTrue("a base class" in wiki and "main class" in wiki)
+        self.assertEqual(watcher.poll(), None)
+        self.writeCsv(self.readFile(basepath).replace("a base class", "the base class"), basepath)
+        self.assertEqual(watcher.poll(), 0)
+        self.assertTrue("parsed 1 of 2 files" in report.getvalue().splitlines()[-1])
+        self.assertTrue("the base class" in self.readFile(self.wikipath))
+        os.remove(basepath)
+        self.assertEqual(watcher.poll(), 1)
+        self.assertTrue("read failed: Cannot read %s, imported by %s"%(basepath, self.csvpath)
+                        in report.getvalue())
+        return
+
+    def testWatch(self):
+        report  = StringIO.StringIO()
+        watcher = VocabWatcher(self.csvpath, self.options, report)
+        self.assertEqual(watcher.watch(interval=0.01, polls=3), 0)
+        self.assertEqual(report.getvalue().count("converted in"), 1)
+        self.assertEqual(self.readFile(self.owlpath), self.readFile(self.testpath+"TestVocabulary.owl"))
+        return
+
+# Code to assemble test suite
+
+from MiscLib import TestUtils
+
+def getTestSuite(select="unit"):
+    """
+    Get test suite
+
+    select  is one of the following:
+            "unit"      return suite of unit tests only
+            "component" return suite of unit and component tests
+            "all"       return suite of unit, component and integration tests
+            "pending"   return suite of pending tests
+            name        a single named test to be run
+    """
+    testdict = {
+        "unit":
+            [ "testWatchOptions"
+            , "testWarmVocabulary"
+            , "testWarmVocabularyPrefixChanged"
+            , "testWarmVocabularyPrefixUndefined"
+            , "testBlockReader"
+            , "testBlockReaderChanged"
+            , "testConvert"
+            , "testConvertError"
+            , "testPoll"
+            , "testPollMissing"
+            , "testPollImports"
+            ],
+        "component":
+            [ "testWatch"
+            ],
+        "integration":
+            [
+            ],
+        "pending":
+            [
+            ]
+        }
+    return TestUtils.getTestSuite(TestWatchConvert, testdict, select=select)
+
+# Run unit tests directly from command line
+if __name__ == "__main__":
+    TestUtils.runTests("TestWatchConvert", getTestSuite, sys.argv)
+
+# End.